@@ -0,0 +1,110 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure Platform.call_function and call_function_async calls/sec against a local keep-alive HTTP server.
+
+Usage: PYTHONPATH=. python hack/benchmarks/call_function.py
+"""
+
+import asyncio
+import http.client
+import http.server
+import threading
+import time
+
+import nuclio_sdk
+
+DURATION = 3
+CONCURRENCY = 32
+
+
+class _EchoRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(name, platform, event):
+    num_calls = 0
+    deadline = time.monotonic() + DURATION
+    while time.monotonic() < deadline:
+        platform.call_function("my-function", event)
+        num_calls += 1
+    print("{0:>16}: {1:>8.0f} calls/s".format(name, num_calls / DURATION))
+
+
+async def run_async(name, platform, event):
+    num_calls = 0
+    deadline = time.monotonic() + DURATION
+
+    async def _call_functions():
+        nonlocal num_calls
+        while time.monotonic() < deadline:
+            await platform.call_function_async("my-function", event)
+            num_calls += 1
+
+    await asyncio.gather(*[_call_functions() for _ in range(CONCURRENCY)])
+    platform.close_connections()
+    print("{0:>16}: {1:>8.0f} calls/s".format(name, num_calls / DURATION))
+
+
+def main():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _EchoRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def _connection_provider(url, timeout=None):
+        return http.client.HTTPConnection(
+            "127.0.0.1", server.server_address[1], timeout=timeout
+        )
+
+    def _async_connection_provider(url):
+        return nuclio_sdk.async_connection.AsyncConnection(
+            "127.0.0.1:{0}".format(server.server_address[1])
+        )
+
+    event = nuclio_sdk.Event(body={"key": "value"}, method="POST")
+    for name, kwargs in [
+        ("no keep-alive", {"connection_pool_size": 0}),
+        ("keep-alive pool", {}),
+    ]:
+        platform = nuclio_sdk.Platform(
+            "local", connection_provider=_connection_provider, **kwargs
+        )
+        run(name, platform, event)
+        platform.close_connections()
+
+    platform = nuclio_sdk.Platform(
+        "local", async_connection_provider=_async_connection_provider
+    )
+    asyncio.run(
+        run_async("async x{0}".format(CONCURRENCY), platform, event),
+    )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
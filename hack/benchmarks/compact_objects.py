@@ -0,0 +1,100 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare memory footprint, construction time and attribute access time of Event / Response and their compact variants.
+
+Usage: PYTHONPATH=. python hack/benchmarks/compact_objects.py
+"""
+
+import timeit
+import tracemalloc
+
+import nuclio_sdk
+
+NUM_OBJECTS = 10000
+
+
+def measure_footprint(factory):
+    tracemalloc.start()
+    objects = [factory(index) for index in range(NUM_OBJECTS)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size / NUM_OBJECTS
+
+
+def compile_event(event_class, trigger_info_class):
+    def _factory(index):
+        return event_class(
+            body=b"body",
+            content_type="text/plain",
+            trigger=trigger_info_class("kafka-cluster", "my-trigger"),
+            _id=index,
+            offset=index,
+            shard_id=0,
+        )
+
+    return _factory
+
+
+def compile_response(response_class):
+    def _factory(index):
+        return response_class(body="body", event_id=index)
+
+    return _factory
+
+
+def main():
+    cases = [
+        ("Event", compile_event(nuclio_sdk.Event, nuclio_sdk.TriggerInfo)),
+        (
+            "CompactEvent",
+            compile_event(nuclio_sdk.CompactEvent, nuclio_sdk.CompactTriggerInfo),
+        ),
+        ("Response", compile_response(nuclio_sdk.Response)),
+        ("CompactResponse", compile_response(nuclio_sdk.CompactResponse)),
+    ]
+
+    for name, factory in cases:
+        print(
+            "{0:>16}: {1:>6.0f} bytes per instance".format(
+                name, measure_footprint(factory)
+            )
+        )
+
+    for name, factory in cases:
+        construction_time = timeit.timeit(lambda: factory(0), number=NUM_OBJECTS * 10)
+        print(
+            "{0:>16}: {1:>6.0f} ns per construction".format(
+                name, construction_time * 1e9 / (NUM_OBJECTS * 10)
+            )
+        )
+
+    for name, factory in cases[:2]:
+        event = factory(0)
+        access_time = timeit.timeit(
+            "event.body; event.offset; event.shard_id; event.trigger.kind",
+            globals={"event": event},
+            number=1000000,
+        )
+        print(
+            "{0:>16}: {1:>6.0f} ns per 4 attribute reads".format(
+                name, access_time * 1000
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare msgpack event deserializer kinds on a typical stream event (as already parsed by msgpack).
+
+Usage: PYTHONPATH=. python hack/benchmarks/event_deserialization.py
+"""
+
+import timeit
+
+import nuclio_sdk
+
+NUMBER = 100000
+
+
+def compile_parsed_event(raw):
+    parsed_event = {
+        "body": b"some-body",
+        "content_type": "text/plain",
+        "trigger": {"kind": "kafka-cluster", "name": "my-trigger"},
+        "fields": {},
+        "headers": {"Header-{0}".format(index): "value" for index in range(10)},
+        "id": "a3c1b8e2-0d5e-4f7b-9a51-2b0e3f1c9d77",
+        "method": "POST",
+        "path": "my-topic",
+        "size": 9,
+        "timestamp": 1640995200,
+        "url": "",
+        "shard_id": 3,
+        "num_shards": 12,
+        "type": "",
+        "type_version": "",
+        "version": "",
+        "offset": 1337,
+        "topic": "my-topic",
+    }
+    if raw:
+        return _encode_keys(parsed_event)
+    return parsed_event
+
+
+def _encode_keys(value):
+    if isinstance(value, dict):
+        return {_encode_keys(key): _encode_keys(item) for key, item in value.items()}
+    if isinstance(value, str):
+        return value.encode()
+    return value
+
+
+def main():
+    kinds = nuclio_sdk.EventDeserializerKinds
+    for kind, raw in [
+        (kinds.msgpack, False),
+        (kinds.msgpack_compiled, False),
+        (kinds.msgpack_compact, False),
+        (kinds.msgpack_lazy, False),
+        (kinds.msgpack_raw, True),
+        (kinds.msgpack_raw_compiled, True),
+        (kinds.msgpack_raw_compact, True),
+        (kinds.msgpack_raw_lazy, True),
+    ]:
+        parsed_event = compile_parsed_event(raw)
+
+        def _deserialize_and_read_body():
+            return nuclio_sdk.Event.deserialize(parsed_event, kind).body
+
+        elapsed = timeit.timeit(_deserialize_and_read_body, number=NUMBER)
+        print(
+            "{0:>22}: {1:>6.2f} us per event".format(
+                kind.name, elapsed * 1000000 / NUMBER
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Measure the cost of creating qualified offsets and their explicit ack messages.
+
+Usage: PYTHONPATH=. python hack/benchmarks/explicit_ack.py
+"""
+
+import json
+import timeit
+
+import nuclio_sdk
+
+NUM_CALLS = 500000
+
+
+def measure(name, func):
+    duration = timeit.timeit(func, number=NUM_CALLS)
+    print("{0:>40}: {1:>8.0f} ns/call".format(name, duration / NUM_CALLS * 1e9))
+
+
+def main():
+    event = nuclio_sdk.Event(topic="my-topic", shard_id=3, offset=123456)
+    qualified_offset = nuclio_sdk.QualifiedOffset.from_event(event)
+
+    measure(
+        "QualifiedOffset.from_event",
+        lambda: nuclio_sdk.QualifiedOffset.from_event(event),
+    )
+    measure("Event.compile_explicit_ack_message", event.compile_explicit_ack_message)
+    measure(
+        "compile + json encode (uncached)",
+        lambda: json.dumps(
+            nuclio_sdk.QualifiedOffset.from_event(event).compile_explicit_ack_message()
+        ).encode(),
+    )
+    measure(
+        "cached compile_explicit_ack_message",
+        qualified_offset.compile_explicit_ack_message,
+    )
+
+
+if __name__ == "__main__":
+    main()
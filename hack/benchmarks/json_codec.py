@@ -0,0 +1,74 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare JSON codec throughput for typical event body sizes.
+
+Usage: PYTHONPATH=. python hack/benchmarks/json_codec.py
+"""
+
+import json
+import timeit
+
+import nuclio_sdk.json_codec
+
+
+def compile_payload(num_items):
+    return {
+        "id": "a3c1b8e2-0d5e-4f7b-9a51-2b0e3f1c9d77",
+        "items": [
+            {
+                "index": index,
+                "name": "item-{0}".format(index),
+                "price": index * 1.5,
+                "tags": ["tag-a", "tag-b"],
+                "available": index % 2 == 0,
+                "discount": None,
+            }
+            for index in range(num_items)
+        ],
+    }
+
+
+def main():
+    codecs = []
+    for codec_class in [
+        nuclio_sdk.json_codec.JSONCodec,
+        nuclio_sdk.json_codec.OrjsonCodec,
+        nuclio_sdk.json_codec.UjsonCodec,
+        nuclio_sdk.json_codec.RapidjsonCodec,
+    ]:
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            print("{0}: not installed".format(codec_class.name))
+
+    for num_items in [1, 100, 10000]:
+        payload = compile_payload(num_items)
+        encoded = json.dumps(payload).encode()
+        number = max(10, 100000 // num_items)
+        print("\npayload size: {0} bytes".format(len(encoded)))
+
+        for codec in codecs:
+            loads_time = timeit.timeit(lambda: codec.loads(encoded), number=number)
+            dumps_time = timeit.timeit(lambda: codec.dumps(payload), number=number)
+            print(
+                "{0:>10}: loads {1:>12.0f} ops/s, dumps {2:>12.0f} ops/s".format(
+                    codec.name, number / loads_time, number / dumps_time
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
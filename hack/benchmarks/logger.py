@@ -0,0 +1,147 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Measure the per call cost of Logger calls, JSONFormatter records/sec and log control message batching.
+
+Usage: PYTHONPATH=. python hack/benchmarks/logger.py
+"""
+
+import io
+import logging
+import os
+import socket
+import threading
+import timeit
+
+import nuclio_sdk
+import nuclio_sdk.logger
+
+NUM_CALLS = 200000
+
+
+def measure(name, func):
+    duration = timeit.timeit(func, number=NUM_CALLS)
+    print("{0:>40}: {1:>8.0f} ns/call".format(name, duration / NUM_CALLS * 1e9))
+
+
+def measure_formatter():
+    formatter = nuclio_sdk.logger.JSONFormatter()
+    epoch_nanos_formatter = nuclio_sdk.logger.JSONFormatter(epoch_nanos=True)
+    record = logging.LogRecord("benchmark", logging.INFO, "", 0, "Message", (), None)
+    setattr(
+        record,
+        "with",
+        {"worker_id": 1, "event_id": "a1b2c3", "duration": 0.25, "tags": ["a", "b"]},
+    )
+    nan_record = logging.makeLogRecord(record.__dict__)
+    setattr(nan_record, "with", {"value": float("nan")})
+
+    for name, func in [
+        ("format", lambda: formatter.format(record)),
+        (
+            "format (custom encoder only)",
+            lambda: formatter._json_encoder.encode(
+                formatter._get_formatted_record_dict(record)
+            ),
+        ),
+        ("format NaN (fallback)", lambda: formatter.format(nan_record)),
+        ("format epoch nanos", lambda: epoch_nanos_formatter.format(record)),
+        ("formatTime", lambda: formatter.formatTime(record)),
+        (
+            "formatTime (logging.Formatter)",
+            lambda: logging.Formatter.formatTime(formatter, record),
+        ),
+    ]:
+        duration = timeit.timeit(func, number=NUM_CALLS)
+        print("{0:>40}: {1:>8.0f} records/s".format(name, NUM_CALLS / duration))
+
+
+class _ControlMessageHandler(logging.Handler):
+    """
+    One control message (and write) per record
+    """
+
+    def __init__(self, fd):
+        super(_ControlMessageHandler, self).__init__()
+        self._fd = fd
+
+    def emit(self, record):
+        message = self.formatter.format_to_log_control_message(record)
+        os.write(self._fd, message.encode() + b"\n")
+
+
+def measure_control_messages():
+
+    # stand in for the processor, reading control messages off a unix socket
+    writer_socket, reader_socket = socket.socketpair()
+    threading.Thread(
+        target=lambda: [None for _ in iter(lambda: reader_socket.recv(65536), b"")],
+        daemon=True,
+    ).start()
+    fd = writer_socket.fileno()
+    logger = nuclio_sdk.Logger(logging.DEBUG, "benchmark_control_messages")
+
+    handler = _ControlMessageHandler(fd)
+    handler.setFormatter(nuclio_sdk.logger.JSONFormatter())
+    logger._logger.addHandler(handler)
+    measure("message per record", lambda: logger.info_with("Message", key="value"))
+    logger._logger.removeHandler(handler)
+
+    logger.set_log_batch_handler(
+        "default",
+        lambda message: os.write(fd, message.encode() + b"\n"),
+        nuclio_sdk.logger.JSONFormatter(),
+    )
+    measure("batched", lambda: logger.info_with("Message", key="value"))
+    logger.flush()
+    writer_socket.close()
+
+
+def main():
+    logger = nuclio_sdk.Logger(logging.INFO, "benchmark")
+    logger.set_handler("default", io.StringIO(), nuclio_sdk.logger.JSONFormatter())
+    logger.bind(worker_id=1)
+
+    state = {"key": list(range(100))}
+
+    print("suppressed (debug, logger at info level)")
+    measure("debug", lambda: logger.debug("Message"))
+    measure("debug_with", lambda: logger.debug_with("Message", key="value"))
+    measure(
+        "debug_with lazy value",
+        lambda: logger.debug_with(
+            "Message", state=nuclio_sdk.logger.LazyValue(lambda: repr(state))
+        ),
+    )
+    measure(
+        "without level check (previous behavior)",
+        lambda: logger._update_bound_vars_and_log(
+            logging.DEBUG, "Message", key="value"
+        ),
+    )
+
+    print("emitted")
+    measure("info_with", lambda: logger.info_with("Message", key="value"))
+
+    print("JSONFormatter")
+    measure_formatter()
+
+    print("log control messages")
+    measure_control_messages()
+
+
+if __name__ == "__main__":
+    main()
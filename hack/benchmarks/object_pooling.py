@@ -0,0 +1,114 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare an invocation's event and response handling (deserializing an already parsed message, then
+building the response dict) with and without recycling - in time, and in bytes allocated per
+invocation (the peak traced by tracemalloc above what was allocated before the invocation).
+
+Usage: PYTHONPATH=. python hack/benchmarks/object_pooling.py
+"""
+
+import json
+import timeit
+import tracemalloc
+
+import nuclio_sdk
+
+NUMBER = 100000
+
+# invocations traced by tracemalloc, which slows them down
+NUMBER_TRACED = 1000
+
+
+def compile_parsed_event():
+    return {
+        b"body": b"some-body",
+        b"content_type": b"text/plain",
+        b"trigger": {b"kind": b"kafka-cluster", b"name": b"my-trigger"},
+        b"fields": {},
+        b"headers": {b"X-Header": b"value"},
+        b"id": b"a3c1b8e2-0d5e-4f7b-9a51-2b0e3f1c9d77",
+        b"method": b"POST",
+        b"path": b"my-topic",
+        b"size": 9,
+        b"timestamp": 1640995200,
+        b"url": b"",
+        b"shard_id": 3,
+        b"num_shards": 12,
+        b"type": b"",
+        b"type_version": b"",
+        b"version": b"",
+        b"offset": 1337,
+        b"topic": b"my-topic",
+    }
+
+
+def measure_allocated_bytes(invoke):
+    # warm up pools and caches
+    invoke()
+
+    allocated_bytes = 0
+    tracemalloc.start()
+    try:
+        for _ in range(NUMBER_TRACED):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            invoke()
+            _, peak = tracemalloc.get_traced_memory()
+            allocated_bytes += peak - current
+    finally:
+        tracemalloc.stop()
+    return allocated_bytes / NUMBER_TRACED
+
+
+def main():
+    kinds = nuclio_sdk.EventDeserializerKinds
+    parsed_event = compile_parsed_event()
+    parsed_batch = [compile_parsed_event() for _ in range(10)]
+
+    for name, kind, recycle_response in [
+        ("msgpack_raw", kinds.msgpack_raw, False),
+        ("msgpack_raw_compiled", kinds.msgpack_raw_compiled, False),
+        ("msgpack_raw_recycled", kinds.msgpack_raw_recycled, True),
+    ]:
+        response = None
+
+        def _invoke():
+            nonlocal response
+            event = nuclio_sdk.Event.deserialize(parsed_event, kind)
+            response = nuclio_sdk.Response.from_entrypoint_output(
+                json.dumps,
+                event.body,
+                response=response if recycle_response else None,
+            )
+
+        def _invoke_batch():
+            for event in nuclio_sdk.Event.deserialize(parsed_batch, kind):
+                event.body
+
+        for case, invoke in [("event", _invoke), ("batch of 10", _invoke_batch)]:
+            elapsed = timeit.timeit(invoke, number=NUMBER)
+            print(
+                "{0:>22} ({1:>11}): {2:>6.2f} us, {3:>6.0f} bytes allocated per invocation".format(
+                    name,
+                    case,
+                    elapsed * 1000000 / NUMBER,
+                    measure_allocated_bytes(invoke),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare base64 and raw binary response bodies, from handler output to a framed response
+(msgpack when installed, json otherwise - for which raw bodies are not applicable).
+
+Usage: PYTHONPATH=. python hack/benchmarks/response_body_encoding.py
+"""
+
+import json
+import os
+import timeit
+
+import nuclio_sdk
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def main():
+    payloads = [
+        ("protobuf (1KB)", os.urandom(1024)),
+        ("image (256KB)", os.urandom(256 * 1024)),
+        ("image (4MB)", os.urandom(4 * 1024 * 1024)),
+    ]
+    encodings = ["base64"]
+    if msgpack:
+        frame = msgpack.packb
+        encodings.append("raw")
+    else:
+        print("msgpack not installed, framing as json (base64 only)")
+        frame = json.dumps
+
+    for name, payload in payloads:
+        number = max(10, 10000 * 1024 // len(payload))
+        print("\n{0}".format(name))
+        for binary_body_encoding in encodings:
+
+            def _respond():
+                return frame(
+                    nuclio_sdk.Response.from_entrypoint_output(
+                        json.dumps, payload, binary_body_encoding=binary_body_encoding
+                    )
+                )
+
+            elapsed = timeit.timeit(_respond, number=number)
+            print(
+                "{0:>8}: {1:>10.0f} responses/s, {2:>8.1f} MB/s, {3} bytes framed".format(
+                    binary_body_encoding,
+                    number / elapsed,
+                    number * len(payload) / elapsed / 1024 / 1024,
+                    len(_respond()),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -14,8 +14,15 @@
 
 from nuclio_sdk.logger import Logger
 from nuclio_sdk.context import Context
-from nuclio_sdk.event import Event, TriggerInfo, EventDeserializerKinds
+from nuclio_sdk.event import (
+    Event,
+    TriggerInfo,
+    CompactEvent,
+    CompactTriggerInfo,
+    EventDeserializerKinds,
+)
 from nuclio_sdk.platform import Platform
-from nuclio_sdk.response import Response
-from nuclio_sdk.exceptions import ExceptionWithResponse
+from nuclio_sdk.response import Response, CompactResponse
+from nuclio_sdk.exceptions import ExceptionWithResponse, CircuitOpenError
+from nuclio_sdk.call_policy import RetryPolicy
 from nuclio_sdk.qualified_offset import QualifiedOffset
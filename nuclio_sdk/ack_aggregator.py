@@ -0,0 +1,148 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+
+class AckAggregator(object):
+    """
+    Coalesces explicit acks into a single control message, holding the highest acked offset per
+    (topic, partition):
+    {"kind": "streamMessageAckBatch", "attributes": {"acks": [{"topic", "partition", "offset"}, ...]}}
+    Acks are sent once max_batch_size acks were added, max_batch_delay seconds after the first of
+    them, or on flush. Acks whose send failed are kept pending, for the next flush to send.
+    Bound to the event loop it is first used in
+    """
+
+    def __init__(self, send, max_batch_size=100, max_batch_delay=0.05):
+        """
+        :param send: coroutine function called with each control message
+        :param max_batch_size: maximum number of acks to coalesce
+        :param max_batch_delay: maximum seconds an ack waits to be sent
+        """
+        self._send = send
+        self._max_batch_size = max_batch_size
+        self._max_batch_delay = max_batch_delay
+        self._loop = None
+        self._flush_handle = None
+
+        # flushes scheduled by flush_soon, referenced until done
+        self._flush_tasks = set()
+
+        # (topic, partition) -> highest offset, and the number of acks it coalesces
+        self._pending_offsets = {}
+        self._num_pending_acks = 0
+
+    @property
+    def num_pending_acks(self):
+        return self._num_pending_acks
+
+    async def add(self, qualified_offset):
+        key = (qualified_offset.topic, qualified_offset.partition)
+        pending_offset = self._pending_offsets.get(key)
+        if pending_offset is None or qualified_offset.offset > pending_offset:
+            self._pending_offsets[key] = qualified_offset.offset
+        self._num_pending_acks += 1
+
+        if self._num_pending_acks >= self._max_batch_size:
+            await self.flush()
+        elif self._flush_handle is None:
+            self._loop = asyncio.get_running_loop()
+            self._flush_handle = self._loop.call_later(
+                self._max_batch_delay, self.flush_soon
+            )
+
+    async def flush(self):
+        """
+        Send the pending acks
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending_offsets:
+            return
+
+        pending_offsets, self._pending_offsets = self._pending_offsets, {}
+        num_pending_acks, self._num_pending_acks = self._num_pending_acks, 0
+        try:
+            await self._send(self.compile_ack_batch_message(pending_offsets))
+        except BaseException:
+            self._restore_pending_offsets(pending_offsets, num_pending_acks)
+            raise
+
+    def flush_soon(self):
+        """
+        Schedule a flush on the aggregator's event loop. Safe to call from any thread (e.g. from
+        a signal hook). A failed flush is reported to the event loop's exception handler
+
+        :return: the flush task when called from the event loop, a concurrent.futures.Future of the
+                 flush when called from another thread, or None if there is no event loop to flush on
+        """
+        if self._loop is None:
+            return None
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            flush_task = self._loop.create_task(self.flush())
+            self._flush_tasks.add(flush_task)
+            flush_task.add_done_callback(self._flush_tasks.discard)
+            flush_task.add_done_callback(self._report_flush_error)
+            return flush_task
+
+        flush = self.flush()
+        try:
+            flush_future = asyncio.run_coroutine_threadsafe(flush, self._loop)
+        except RuntimeError:
+            # event loop closed, there's no one to send the acks to
+            flush.close()
+            return None
+        flush_future.add_done_callback(self._report_flush_error)
+        return flush_future
+
+    def _report_flush_error(self, flush_future):
+        if flush_future.cancelled() or flush_future.exception() is None:
+            return
+        self._loop.call_exception_handler(
+            {
+                "message": "Failed sending explicit acks",
+                "exception": flush_future.exception(),
+            }
+        )
+
+    def _restore_pending_offsets(self, pending_offsets, num_pending_acks):
+        for key, offset in pending_offsets.items():
+            pending_offset = self._pending_offsets.get(key)
+            if pending_offset is None or offset > pending_offset:
+                self._pending_offsets[key] = offset
+        self._num_pending_acks += num_pending_acks
+
+    @staticmethod
+    def compile_ack_batch_message(offsets):
+        """
+        :param offsets: dict of (topic, partition) -> offset
+        """
+        return {
+            "kind": "streamMessageAckBatch",
+            "attributes": {
+                "acks": [
+                    {"topic": topic, "partition": partition, "offset": offset}
+                    for (topic, partition), offset in offsets.items()
+                ]
+            },
+        }
@@ -0,0 +1,175 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import http.client
+import re
+
+# validation of request lines and headers, as done by http.client
+_contains_disallowed_method_char = re.compile(r"[\x00-\x1f]").search
+_contains_disallowed_path_char = re.compile(r"[\x00-\x20\x7f]").search
+_is_legal_header_name = re.compile(r"[^:\s][^:\r\n]*").fullmatch
+_is_illegal_header_value = re.compile(r"\n(?![ \t])|\r(?![ \t\n])").search
+
+
+class AsyncResponse(object):
+    def __init__(self, status, headers, body, will_close):
+        self.status = status
+        self.body = body
+
+        # whether the peer is closing the connection after this response
+        self.will_close = will_close
+
+        # list of (name, value) tuples, like http.client.HTTPResponse.getheaders()
+        self._headers = headers
+
+    def getheaders(self):
+        return self._headers
+
+
+class AsyncConnection(object):
+    """
+    Minimal asyncio HTTP/1.1 client connection, supporting keep-alive and
+    content-length / chunked / read-until-close response bodies
+    """
+
+    def __init__(self, url):
+        """
+        :param url: host[:port] to connect to (defaults to port 80)
+        """
+        host, separator, port = url.rpartition(":")
+        if separator and port.isdigit():
+            self.host, self.port = host, int(port)
+        else:
+            self.host, self.port = url, 80
+        self._reader = None
+        self._writer = None
+
+    async def request(self, method, path, body=None, headers=None):
+        """
+        Send a request and read its response. Like http.client, raises ValueError on a method, path
+        or header which would be invalid on the wire
+
+        :return: an AsyncResponse
+        """
+        if _contains_disallowed_method_char(method):
+            raise ValueError("Invalid method {0!r}".format(method))
+        if _contains_disallowed_path_char(path):
+            raise ValueError("Invalid path {0!r}".format(path))
+
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        body = body or b""
+
+        head = ["{0} {1} HTTP/1.1".format(method, path)]
+        request_headers = {
+            "Host": "{0}:{1}".format(self.host, self.port),
+            **(headers or {}),
+            "Content-Length": str(len(body)),
+        }
+        for name, value in request_headers.items():
+            value = str(value)
+            if not _is_legal_header_name(name):
+                raise ValueError("Invalid header name {0!r}".format(name))
+            if _is_illegal_header_value(value):
+                raise ValueError("Invalid header value {0!r}".format(value))
+            head.append("{0}: {1}".format(name, value))
+        head.append("\r\n")
+
+        self._writer.write("\r\n".join(head).encode("latin-1") + body)
+        await self._writer.drain()
+
+        try:
+            return await self._read_response(method)
+        except asyncio.IncompleteReadError as exc:
+            # the peer closed the connection mid response, raise what http.client would
+            raise http.client.IncompleteRead(exc.partial, exc.expected) from exc
+
+    def close(self):
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except RuntimeError:
+                # event loop already closed, the transport is gone anyway
+                pass
+        self._reader = self._writer = None
+
+    async def _read_response(self, method):
+
+        # skip informational (1xx) responses
+        while True:
+            status_line = await self._reader.readline()
+            if not status_line:
+                raise http.client.RemoteDisconnected(
+                    "Remote end closed connection without response"
+                )
+            status_line_parts = status_line.decode("latin-1").split(None, 2)
+            try:
+                version, status = status_line_parts[0], int(status_line_parts[1])
+            except (IndexError, ValueError):
+                raise http.client.BadStatusLine(status_line)
+            headers = await self._read_headers()
+            if status >= 200:
+                break
+
+        lowercase_headers = {name.lower(): value for name, value in headers}
+        connection_header = lowercase_headers.get("connection", "").lower()
+        will_close = connection_header == "close" or (
+            version == "HTTP/1.0" and connection_header != "keep-alive"
+        )
+
+        if method == "HEAD" or status in (204, 304):
+            body = b""
+        elif lowercase_headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await self._read_chunked_body()
+        elif "content-length" in lowercase_headers:
+            body = await self._reader.readexactly(
+                int(lowercase_headers["content-length"])
+            )
+        else:
+            # body is delimited by the peer closing the connection
+            body = await self._reader.read()
+            will_close = True
+
+        return AsyncResponse(status, headers, body, will_close)
+
+    async def _read_headers(self):
+        headers = []
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers.append((name.strip(), value.strip()))
+
+    async def _read_chunked_body(self):
+        chunks = []
+        while True:
+            size_line = await self._reader.readline()
+            chunk_size = int(size_line.split(b";", 1)[0], 16)
+            if chunk_size == 0:
+
+                # trailers are ignored
+                await self._read_headers()
+                return b"".join(chunks)
+
+            chunks.append(await self._reader.readexactly(chunk_size))
+
+            # chunk data is followed by CRLF
+            await self._reader.readexactly(2)
@@ -0,0 +1,223 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import collections
+import http.client
+import random
+import threading
+import time
+
+import nuclio_sdk.exceptions
+
+# errors of a failed attempt (connection refused / reset, timeouts, malformed responses)
+call_errors = (OSError, http.client.HTTPException, asyncio.TimeoutError)
+
+# errors raised before an attempt reaches its target (e.g. an invalid header), not counted against it
+client_errors = (ValueError,)
+
+
+class RetryPolicy(object):
+    """
+    Retry failed calls with exponential backoff (with jitter). A call failed if it raised one
+    of call_errors or responded with one of retry_on_status
+    """
+
+    def __init__(
+        self,
+        max_attempts=3,
+        backoff=0.05,
+        max_backoff=1.0,
+        retry_on_status=(502, 503, 504),
+    ):
+        """
+        :param max_attempts: maximum number of attempts, including the first one
+        :param backoff: seconds to wait before the first retry, doubled for each retry after it
+        :param max_backoff: maximum seconds to wait between attempts
+        :param retry_on_status: response status codes to retry on
+        """
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_on_status = frozenset(retry_on_status)
+
+    def get_delay(self, attempt):
+        """
+        :param attempt: index of the attempt that failed, starting at 0
+        :return: seconds to wait before the next attempt
+        """
+        delay = min(self.max_backoff, self.backoff * (2**attempt))
+
+        # spread out retries of concurrent callers
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker(object):
+    """
+    Fails calls towards a target fast once failure_threshold consecutive attempts failed. After
+    reset_timeout seconds a single probe attempt is let through - its success closes the circuit,
+    its failure keeps it open for another reset_timeout. A probe whose outcome was not recorded
+    within reset_timeout is considered lost, and another one is let through. Thread safe
+    """
+
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+    # response status codes counted as failures, along with call_errors
+    failure_status = frozenset((502, 503, 504))
+
+    def __init__(self, target, failure_threshold=5, reset_timeout=10):
+        self.target = target
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.closed
+        self._num_failures = 0
+        self._opened_at = 0
+        self._probed_at = 0
+        self._lock = threading.Lock()
+
+    def check(self):
+        """
+        Raise CircuitOpenError if an attempt should not be made
+        """
+        if self.state == self.closed:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.open:
+                probe = now - self._opened_at >= self.reset_timeout
+            elif self.state == self.half_open:
+                probe = now - self._probed_at >= self.reset_timeout
+            else:
+                return
+
+            if probe:
+                # let this attempt probe the target
+                self.state = self.half_open
+                self._probed_at = now
+                return
+
+        raise nuclio_sdk.exceptions.CircuitOpenError(self.target)
+
+    def record_success(self):
+        if self.state == self.closed and not self._num_failures:
+            return
+
+        with self._lock:
+            self._num_failures = 0
+            self.state = self.closed
+
+    def record_failure(self):
+        with self._lock:
+            self._num_failures += 1
+            threshold_reached = self._num_failures >= self.failure_threshold
+            if threshold_reached or self.state == self.half_open:
+                self.state = self.open
+                self._opened_at = time.monotonic()
+
+    def release_probe(self):
+        """
+        Let another attempt probe the target right away, as the probe did not reach it
+        """
+        with self._lock:
+            if self.state == self.half_open:
+                self._probed_at = time.monotonic() - self.reset_timeout
+
+
+class CallAttempts(object):
+    """
+    Bookkeeping of the attempts of a single call - retries (see RetryPolicy) and circuit breaking (see
+    CircuitBreaker). Shared by the blocking and async calls, which only differ in how they wait and attempt
+    """
+
+    def __init__(self, retry_policy=None, circuit_breaker=None):
+        self.max_attempts = retry_policy.max_attempts if retry_policy else 1
+        self._retry_policy = retry_policy
+        self._circuit_breaker = circuit_breaker
+
+    def get_delay(self, attempt_index):
+        """
+        :param attempt_index: index of the attempt about to be made (a retry), starting at 0
+        :return: seconds to wait before making it
+        """
+        return self._retry_policy.get_delay(attempt_index - 1)
+
+    def check(self):
+        """
+        Raise CircuitOpenError if an attempt should not be made
+        """
+        if self._circuit_breaker is not None:
+            self._circuit_breaker.check()
+
+    def record_error(self, exc, attempt_index):
+        """
+        Count an attempt which raised exc
+
+        :return: whether to retry, rather than raise exc
+        """
+        if isinstance(exc, client_errors):
+            if self._circuit_breaker is not None:
+                self._circuit_breaker.release_probe()
+            return False
+
+        # any other error (or cancellation) ends the attempt too - a half open circuit must not keep
+        # waiting for its probe
+        if self._circuit_breaker is not None:
+            self._circuit_breaker.record_failure()
+        return isinstance(exc, call_errors) and attempt_index < self.max_attempts - 1
+
+    def record_status(self, status, attempt_index):
+        """
+        Count an attempt which got a response with status
+
+        :return: whether to retry, rather than return the response
+        """
+        if self._circuit_breaker is not None:
+            if status in self._circuit_breaker.failure_status:
+                self._circuit_breaker.record_failure()
+            else:
+                self._circuit_breaker.record_success()
+        if self._retry_policy is None or attempt_index == self.max_attempts - 1:
+            return False
+        return status in self._retry_policy.retry_on_status
+
+
+class LatencyTracker(object):
+    """
+    Latencies of the most recent successful attempts towards a target, for hedging. Thread safe
+    """
+
+    def __init__(self, window_size=100, min_samples=20):
+        self._latencies = collections.deque(maxlen=window_size)
+        self._min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def record(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+
+    def get_percentile(self, percentile):
+        """
+        :param percentile: 0-100
+        :return: the latency at the given percentile, or None before min_samples were recorded
+        """
+        with self._lock:
+            if len(self._latencies) < self._min_samples:
+                return None
+            latencies = sorted(self._latencies)
+
+        index = min(len(latencies) - 1, int(len(latencies) * percentile / 100))
+        return latencies[index]
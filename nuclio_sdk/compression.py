@@ -0,0 +1,73 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _compress_zstd(data):
+    return zstandard.ZstdCompressor().compress(data)
+
+
+def _decompress_zstd(data):
+    # a decompression object handles frames that don't declare their content size
+    return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+# content encoding -> (compress, decompress), in order of preference
+_codecs = {
+    "gzip": (gzip.compress, gzip.decompress),
+    "deflate": (zlib.compress, zlib.decompress),
+}
+
+if zstandard is not None:
+    _codecs = {"zstd": (_compress_zstd, _decompress_zstd), **_codecs}
+
+# value of the Accept-Encoding header, advertising everything we can decode
+accept_encoding = ", ".join(_codecs)
+
+
+def get_encodings():
+    """
+    :return: list of supported content encodings, in order of preference
+    """
+    return list(_codecs)
+
+
+def compress(encoding, data):
+    """
+    Compress data with a content encoding (see get_encodings)
+    """
+    try:
+        compressor = _codecs[encoding][0]
+    except KeyError:
+        raise ValueError("Unsupported content encoding: {0}".format(encoding))
+    return compressor(data)
+
+
+def decompress(encoding, data):
+    """
+    Decompress data according to a Content-Encoding header value. Identity and unknown
+    encodings are returned as is
+    """
+    try:
+        decompressor = _codecs[encoding.strip().lower()][1]
+    except KeyError:
+        return data
+    return decompressor(data)
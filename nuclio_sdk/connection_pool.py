@@ -0,0 +1,96 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import threading
+import time
+
+
+class ConnectionPool(object):
+    """
+    Keep-alive connections towards a single target, reused across calls. Thread safe.
+    At most max_size idle connections are kept, each for at most idle_timeout seconds
+    """
+
+    def __init__(self, connection_factory, max_size=8, idle_timeout=30):
+        """
+        :param connection_factory: creates a new (not yet connected) connection, called with no arguments
+        :param max_size: maximum number of idle connections to keep (0 disables pooling)
+        :param idle_timeout: seconds after which an idle connection is evicted
+        """
+        self._connection_factory = connection_factory
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+
+        # (connection, released at) - oldest first
+        self._idle_connections = collections.deque()
+
+    def acquire(self):
+        """
+        Get an idle connection, or create one if none is available
+
+        :return: a tuple of (connection, whether it was reused)
+        """
+        connection = None
+        expired_connections = []
+        expired_before = time.monotonic() - self._idle_timeout
+
+        with self._lock:
+            while (
+                self._idle_connections and self._idle_connections[0][1] < expired_before
+            ):
+                expired_connections.append(self._idle_connections.popleft()[0])
+
+            # most recently used connection is the least likely to have been closed by the peer
+            if self._idle_connections:
+                connection = self._idle_connections.pop()[0]
+
+        for expired_connection in expired_connections:
+            expired_connection.close()
+
+        if connection is None:
+            return self.connect(), False
+        return connection, True
+
+    def connect(self):
+        """
+        Create a new connection, bypassing idle ones
+        """
+        return self._connection_factory()
+
+    def release(self, connection):
+        """
+        Return a connection whose response was fully read to the pool
+        """
+        with self._lock:
+            if len(self._idle_connections) < self._max_size:
+                self._idle_connections.append((connection, time.monotonic()))
+                return
+
+        connection.close()
+
+    def close(self):
+        """
+        Close all idle connections
+        """
+        with self._lock:
+            idle_connections = list(self._idle_connections)
+            self._idle_connections.clear()
+
+        for connection, _ in idle_connections:
+            connection.close()
+
+    def __len__(self):
+        return len(self._idle_connections)
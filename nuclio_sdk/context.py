@@ -56,3 +56,32 @@ class Context(object):
             self._logger.set(logger)
         else:
             self._logger = logger
+
+    def track_event(self, event):
+        """
+        Register an event as being processed for the duration of a with block, so that the platform's
+        drain waits for it (see Platform.track_event)
+
+        :param event: the event being processed
+        """
+        return self.platform.track_event(event)
+
+    async def call_function_async(
+        self, function_name, event, timeout=None, service_name_override=None
+    ):
+        """
+        Call another function without blocking the event loop, allowing an async handler to have
+        many in-flight calls (e.g. with asyncio.gather)
+
+        :param function_name: the name of the function to call
+        :param event: the event to send the function
+        :param timeout: seconds to wait for the response (None waits forever)
+        :param service_name_override: call this service rather than the function's default one
+        :return: the function's Response
+        """
+        return await self.platform.call_function_async(
+            function_name,
+            event,
+            timeout=timeout,
+            service_name_override=service_name_override,
+        )
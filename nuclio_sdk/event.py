@@ -12,13 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import array
+import collections.abc
 import enum
 import base64
 import sys
-import json
 import datetime
 
 import nuclio_sdk
+import nuclio_sdk.json_codec
+import nuclio_sdk.qualified_offset
 
 
 class _EventDeserializer(object):
@@ -28,7 +31,11 @@ class _EventDeserializer(object):
     @staticmethod
     def _try_deserialize_json(body):
         try:
-            return json.loads(body.decode("utf-8"))
+            # codecs taking bytes (e.g. orjson) parse them natively, sparing an intermediate decoded copy of the
+            # body. others, the standard library included, decode internally - no worse than decoding here
+            if isinstance(body, (bytes, bytearray)):
+                return nuclio_sdk.json_codec.loads(body)
+            return nuclio_sdk.json_codec.loads(body.decode("utf-8"))
         except Exception as exc:
             # newline to force flush
             # NOTE: processor runs sdk with `-u` which means stderr is unbuffered which needs manual flushing
@@ -38,11 +45,12 @@ class _EventDeserializer(object):
         return body
 
     @staticmethod
-    def _from_parsed_data(parsed_data, body):
-        trigger = TriggerInfo(
+    def _from_parsed_data(parsed_data, body, event_class=None):
+        event_class = event_class or Event
+        trigger = event_class._trigger_info_class(
             parsed_data["trigger"]["kind"], parsed_data["trigger"]["name"]
         )
-        return Event(
+        return event_class(
             body=body,
             content_type=parsed_data["content_type"],
             trigger=trigger,
@@ -64,11 +72,12 @@ class _EventDeserializer(object):
         )
 
     @staticmethod
-    def _from_parsed_data_bytes(parsed_data, body):
-        trigger = TriggerInfo(
+    def _from_parsed_data_bytes(parsed_data, body, event_class=None):
+        event_class = event_class or Event
+        trigger = event_class._trigger_info_class(
             parsed_data[b"trigger"][b"kind"], parsed_data[b"trigger"][b"name"]
         )
-        return Event(
+        return event_class(
             body=body,
             content_type=parsed_data[b"content_type"],
             trigger=trigger,
@@ -101,23 +110,81 @@ class _EventDeserializer(object):
 
 
 class _EventDeserializerMsgPack(_EventDeserializer):
-    def __init__(self, raw=False):
+    def __init__(
+        self,
+        raw=False,
+        lazy=False,
+        columnar=False,
+        compact=False,
+        compiled=False,
+        recycle=False,
+    ):
+        """
+        :param raw: whether the message was parsed without decoding strings (keys and values are bytes)
+        :param lazy: resolve event attributes on first access rather than upfront
+        :param columnar: deserialize batches into an EventBatch (implies lazy)
+        :param compact: deserialize into CompactEvent (ignored when lazy or columnar). Decodes through compiled
+                        functions, as these skip building the keyword arguments of the constructor
+        :param compiled: decode through functions generated per message shape (ignored when lazy or columnar)
+        :param recycle: decode into pooled events, reused by the next deserialize call (implies compiled,
+                        ignored when lazy or columnar). See _RecyclingEventDecoder for the rules handlers follow
+        """
+        self._event_class = CompactEvent if compact else Event
+
         # return the concrete function that handled raw/decoded event messages
         # pre-assign to avoid if/else during event processing
-        self._from_msgpack_handler = (
-            self._from_msgpack_raw if raw else self._from_msgpack_decoded
-        )
+        if lazy or columnar:
+            if raw:
+                self._lazy_event_resolvers = _lazy_event_resolvers_raw
+                self._event_batch_keys = _event_batch_keys_raw
+            else:
+                self._lazy_event_resolvers = _lazy_event_resolvers_decoded
+                self._event_batch_keys = _event_batch_keys_decoded
+            self._from_msgpack_handler = (
+                self._from_msgpack_columnar if columnar else self._from_msgpack_lazy
+            )
+        elif recycle:
+            self._event_decoder = _RecyclingEventDecoder(self._event_class, raw=raw)
+            self._from_msgpack_handler = self._from_msgpack_recycled
+        elif compiled or compact:
+            self._event_decoder = _CompiledEventDecoder(self._event_class, raw=raw)
+            self._from_msgpack_handler = self._from_msgpack_compiled
+        elif raw:
+            self._from_msgpack_handler = self._from_msgpack_raw
+        else:
+            self._from_msgpack_handler = self._from_msgpack_decoded
 
     def deserialize(self, event_message):
         return self._from_msgpack_handler(event_message)
 
+    def _from_msgpack_lazy(self, parsed_data):
+        def _decode_single_event(single_event_data):
+            return LazyEvent(single_event_data, self._lazy_event_resolvers)
+
+        return self.decode_single_or_list_event(parsed_data, _decode_single_event)
+
+    def _from_msgpack_columnar(self, parsed_data):
+        if isinstance(parsed_data, list):
+            return EventBatch(
+                parsed_data, self._lazy_event_resolvers, self._event_batch_keys
+            )
+        return LazyEvent(parsed_data, self._lazy_event_resolvers)
+
+    def _from_msgpack_compiled(self, parsed_data):
+        return self.decode_single_or_list_event(parsed_data, self._event_decoder.decode)
+
+    def _from_msgpack_recycled(self, parsed_data):
+        if isinstance(parsed_data, list):
+            return self._event_decoder.decode_batch(parsed_data)
+        return self._event_decoder.decode(parsed_data)
+
     def _from_msgpack_raw(self, parsed_data):
         def _decode_single_event(single_event_data):
             event_body = single_event_data[b"body"]
             if single_event_data[b"content_type"] == b"application/json":
                 event_body = _EventDeserializer._try_deserialize_json(event_body)
             return _EventDeserializer._from_parsed_data_bytes(
-                single_event_data, event_body
+                single_event_data, event_body, self._event_class
             )
 
         return self.decode_single_or_list_event(parsed_data, _decode_single_event)
@@ -127,14 +194,16 @@ class _EventDeserializerMsgPack(_EventDeserializer):
             event_body = single_event_data["body"]
             if single_event_data["content_type"] == "application/json":
                 event_body = _EventDeserializer._try_deserialize_json(event_body)
-            return _EventDeserializer._from_parsed_data(single_event_data, event_body)
+            return _EventDeserializer._from_parsed_data(
+                single_event_data, event_body, self._event_class
+            )
 
         return self.decode_single_or_list_event(parsed_data, _decode_single_event)
 
 
 class _EventDeserializerJSON(_EventDeserializer):
     def deserialize(self, event_message):
-        parsed_data = json.loads(event_message)
+        parsed_data = nuclio_sdk.json_codec.loads(event_message)
 
         def _deserialize_single_event(single_event):
             body = single_event["body"]
@@ -147,10 +216,261 @@ class _EventDeserializerJSON(_EventDeserializer):
         return self.decode_single_or_list_event(parsed_data, _deserialize_single_event)
 
 
-class EventDeserializerKinds(enum.Enum):
-    msgpack = _EventDeserializerMsgPack(raw=False)
-    msgpack_raw = _EventDeserializerMsgPack(raw=True)
-    json = _EventDeserializerJSON()
+class _CompiledEventDecoder(object):
+    """
+    Decodes parsed event messages through functions generated (and cached) per message shape - the
+    tuple of message keys. Each function is straight-line code with the message keys, optional key
+    handling and defaults baked in, assigning attributes directly rather than going through __init__
+    """
+
+    # message shapes seen by a deserializer are few (one per trigger kind), guard against unbounded growth
+    max_cached_decoders = 64
+
+    def __init__(self, event_class, raw=False, recycle=False):
+        """
+        :param recycle: generate functions decoding into a given event and trigger info (see decode_into)
+        """
+        self._event_class = event_class
+        self._encode_key = (lambda key: key.encode()) if raw else (lambda key: key)
+        self._recycle = recycle
+        self._decoders = {}
+
+    def decode(self, parsed_data):
+        return self._get_decoder(parsed_data)(parsed_data)
+
+    def decode_into(self, parsed_data, event, trigger_info):
+        """
+        Decode into an existing event, setting its trigger to the (existing) trigger info. Every
+        attribute set by __init__ is overwritten
+        """
+        return self._get_decoder(parsed_data)(parsed_data, event, trigger_info)
+
+    def _get_decoder(self, parsed_data):
+        shape = tuple(parsed_data)
+        try:
+            return self._decoders[shape]
+        except KeyError:
+            if len(self._decoders) >= self.max_cached_decoders:
+                self._decoders.clear()
+            decoder = self._decoders[shape] = self._compile_decoder(shape)
+            return decoder
+
+    def _compile_decoder(self, shape):
+        def _key(key):
+            return repr(self._encode_key(key))
+
+        lines = [
+            (
+                "def decode(parsed_data, event, trigger_info):"
+                if self._recycle
+                else "def decode(parsed_data):"
+            ),
+            "    body = parsed_data[{0}]".format(_key("body")),
+            "    content_type = parsed_data[{0}]".format(_key("content_type")),
+            "    if content_type == {0}:".format(_key("application/json")),
+            "        body = try_deserialize_json(body)",
+        ]
+
+        # optional keys are resolved now, once per shape
+        offset = "parsed_data[{0}] or 0".format(_key("offset"))
+        topic = "parsed_data[{0}]".format(_key("topic"))
+        if self._encode_key("offset") not in shape:
+            offset = "0"
+        if self._encode_key("topic") not in shape:
+            topic = "None"
+
+        lines.append("    trigger = parsed_data[{0}]".format(_key("trigger")))
+        if self._recycle:
+            lines += [
+                "    trigger_info.kind = trigger[{0}]".format(_key("kind")),
+                "    trigger_info.name = trigger[{0}]".format(_key("name")),
+            ]
+        else:
+            lines += [
+                "    event = new_event(event_class)",
+                "    trigger_info = trigger_info_class(trigger[{0}], trigger[{1}])".format(
+                    _key("kind"), _key("name")
+                ),
+            ]
+
+        lines += [
+            "    event.body = body",
+            "    event.content_type = content_type",
+            "    event.trigger = trigger_info",
+            "    event.fields = parsed_data[{0}] or {{}}".format(_key("fields")),
+            "    event.headers = parsed_data[{0}] or {{}}".format(_key("headers")),
+            "    event.id = parsed_data[{0}]".format(_key("id")),
+            "    event.method = parsed_data[{0}]".format(_key("method")),
+            "    event.path = parsed_data[{0}] or '/'".format(_key("path")),
+            "    event.size = parsed_data[{0}]".format(_key("size")),
+            "    event.timestamp = utcfromtimestamp(parsed_data[{0}])".format(
+                _key("timestamp")
+            ),
+            "    event.url = parsed_data[{0}]".format(_key("url")),
+            "    event.shard_id = parsed_data[{0}]".format(_key("shard_id")),
+            "    event.num_shards = parsed_data[{0}]".format(_key("num_shards")),
+            "    event.type = parsed_data[{0}]".format(_key("type")),
+            "    event.type_version = parsed_data[{0}]".format(_key("type_version")),
+            "    event.version = parsed_data[{0}]".format(_key("version")),
+            "    event.last_in_batch = False",
+            "    event.offset = {0}".format(offset),
+            "    event.topic = {0}".format(topic),
+        ]
+
+        # initialized like __init__ does (which is skipped), recycled events also drop the cache of their
+        # previous message this way
+        lines.append("    event._headers_index = None")
+        lines.append("    return event")
+
+        namespace = {
+            "try_deserialize_json": _EventDeserializer._try_deserialize_json,
+            "new_event": object.__new__,
+            "event_class": self._event_class,
+            "trigger_info_class": self._event_class._trigger_info_class,
+            "utcfromtimestamp": datetime.datetime.utcfromtimestamp,
+        }
+        exec("\n".join(lines), namespace)
+        return namespace["decode"]
+
+
+class _RecyclingEventDecoder(object):
+    """
+    Decodes parsed event messages into pooled events (and trigger infos), sparing their allocation per
+    invocation. A single event message is always decoded into the same event, a batch into the first
+    events of the pool (and the same list). Rules for handlers:
+
+    - the event (or batch) is only valid until the next message is deserialized, which overwrites it.
+      A handler keeping data past its invocation must keep the attributes it needs (e.g. event.body),
+      not the event or its trigger
+    - handlers must not process events concurrently (e.g. async handlers with more than one event
+      in flight), as the pool is per deserializer - that is, per worker process
+    - attributes set on an event by a handler, other than those set by __init__, are kept
+    """
+
+    def __init__(self, event_class, raw=False):
+        self._event_class = event_class
+        self._compiled_event_decoder = _CompiledEventDecoder(
+            event_class, raw=raw, recycle=True
+        )
+
+        # (event, trigger info) tuples, grown to the largest batch seen
+        self._pooled_events = []
+        self._batch = []
+
+    def decode(self, parsed_data):
+        return self._decode_pooled(parsed_data, 0)
+
+    def decode_batch(self, parsed_data):
+        batch = self._batch
+        num_events = len(parsed_data)
+        del batch[num_events:]
+        for index, single_event_data in enumerate(parsed_data):
+            event = self._decode_pooled(single_event_data, index)
+            if index < len(batch):
+                batch[index] = event
+            else:
+                batch.append(event)
+        return batch
+
+    def _decode_pooled(self, parsed_data, index):
+        try:
+            event, trigger_info = self._pooled_events[index]
+        except IndexError:
+            event = self._event_class()
+            trigger_info = event.trigger
+            self._pooled_events.append((event, trigger_info))
+        return self._compiled_event_decoder.decode_into(
+            parsed_data, event, trigger_info
+        )
+
+
+def _compile_lazy_event_resolvers(encode_key):
+    """
+    Map each event attribute to a function resolving it from a parsed event message.
+    encode_key converts a message key to its parsed form (str for decoded messages, bytes for raw)
+    """
+    body_key = encode_key("body")
+    content_type_key = encode_key("content_type")
+    trigger_key = encode_key("trigger")
+    trigger_kind_key = encode_key("kind")
+    trigger_name_key = encode_key("name")
+    fields_key = encode_key("fields")
+    headers_key = encode_key("headers")
+    path_key = encode_key("path")
+    timestamp_key = encode_key("timestamp")
+    offset_key = encode_key("offset")
+    topic_key = encode_key("topic")
+    json_content_type = encode_key("application/json")
+
+    def _resolve_body(parsed_data):
+        body = parsed_data[body_key]
+        if parsed_data[content_type_key] == json_content_type:
+            body = _EventDeserializer._try_deserialize_json(body)
+        return body
+
+    def _resolve_trigger(parsed_data):
+        trigger = parsed_data[trigger_key]
+        return TriggerInfo(trigger[trigger_kind_key], trigger[trigger_name_key])
+
+    def _resolve_timestamp(parsed_data):
+        return datetime.datetime.utcfromtimestamp(parsed_data[timestamp_key])
+
+    def _resolve_key(key):
+        encoded_key = encode_key(key)
+        return lambda parsed_data: parsed_data[encoded_key]
+
+    return {
+        "body": _resolve_body,
+        "content_type": _resolve_key("content_type"),
+        "trigger": _resolve_trigger,
+        "fields": lambda parsed_data: parsed_data[fields_key] or {},
+        "headers": lambda parsed_data: parsed_data[headers_key] or {},
+        "id": _resolve_key("id"),
+        "method": _resolve_key("method"),
+        "path": lambda parsed_data: parsed_data[path_key] or "/",
+        "size": _resolve_key("size"),
+        "timestamp": _resolve_timestamp,
+        "url": _resolve_key("url"),
+        "shard_id": _resolve_key("shard_id"),
+        "num_shards": _resolve_key("num_shards"),
+        "type": _resolve_key("type"),
+        "type_version": _resolve_key("type_version"),
+        "version": _resolve_key("version"),
+        "last_in_batch": lambda parsed_data: False,
+        "offset": lambda parsed_data: parsed_data.get(offset_key) or 0,
+        "topic": lambda parsed_data: parsed_data.get(topic_key),
+    }
+
+
+class _LazyEventResolvers(dict):
+    """
+    Resolvers of a module level table. The resolvers are closures, which cannot be pickled, so the table
+    pickles as a reference to its module level name (keeping pickled lazy events lazy)
+    """
+
+    def __init__(self, name, resolvers):
+        super(_LazyEventResolvers, self).__init__(resolvers)
+        self._name = name
+
+    def __reduce__(self):
+        return _get_lazy_event_resolvers, (self._name,)
+
+
+def _get_lazy_event_resolvers(name):
+    return globals()[name]
+
+
+_lazy_event_resolvers_decoded = _LazyEventResolvers(
+    "_lazy_event_resolvers_decoded", _compile_lazy_event_resolvers(lambda key: key)
+)
+_lazy_event_resolvers_raw = _LazyEventResolvers(
+    "_lazy_event_resolvers_raw",
+    _compile_lazy_event_resolvers(lambda key: key.encode()),
+)
+
+# message keys of the EventBatch columns (id, offset, shard_id, timestamp, body)
+_event_batch_keys_decoded = ("id", "offset", "shard_id", "timestamp", "body")
+_event_batch_keys_raw = tuple(key.encode() for key in _event_batch_keys_decoded)
 
 
 class TriggerInfo(object):
@@ -159,7 +479,55 @@ class TriggerInfo(object):
         self.name = name
 
 
-class Event(object):
+class CompactTriggerInfo(object):
+    """
+    TriggerInfo without a per-instance __dict__
+    """
+
+    __slots__ = ("kind", "name")
+
+    def __init__(self, kind="", name=""):
+        self.kind = kind
+        self.name = name
+
+
+class _CaseInsensitiveHeaders(collections.abc.Mapping):
+    """
+    Read-only view of event headers over an index of lowercase header name to header key
+    """
+
+    __slots__ = ("_headers", "_index")
+
+    def __init__(self, headers, index):
+        self._headers = headers
+        self._index = index
+
+    def __getitem__(self, header_key):
+        if isinstance(header_key, bytes):
+            header_key = header_key.decode("latin-1")
+        return self._headers[self._index[header_key.lower()]]
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class _EventBase(object):
+    """
+    Behavior shared by Event and CompactEvent, which differ in how attributes are stored
+    """
+
+    __slots__ = ()
+
+    # (headers, number of headers, index of lowercase header name to header key, headers_ci) - see get_header.
+    # set by __init__, the class level default serves events skipping it (LazyEvent)
+    _headers_index = None
+
     def __init__(
         self,
         body=None,
@@ -184,7 +552,7 @@ class Event(object):
     ):
         self.body = body
         self.content_type = content_type
-        self.trigger = trigger or TriggerInfo()
+        self.trigger = trigger or self._trigger_info_class()
         self.fields = fields or {}
         self.headers = headers or {}
         self.id = _id
@@ -201,13 +569,10 @@ class Event(object):
         self.last_in_batch = last_in_batch or False
         self.offset = offset or 0
         self.topic = topic
+        self._headers_index = None
 
     def to_json(self):
-        obj = {}
-        for field_name, field_value in vars(self).items():
-            # exclude private fields
-            if not field_name.startswith("_"):
-                obj[field_name] = field_value
+        obj = self._get_public_fields()
         obj["trigger"] = {
             "kind": self.trigger.kind,
             "name": self.trigger.name,
@@ -217,15 +582,86 @@ class Event(object):
         if isinstance(self.timestamp, datetime.datetime):
             obj["timestamp"] = str(self.timestamp)
 
-        if isinstance(obj["body"], bytes):
+        if isinstance(obj["body"], (bytes, bytearray, memoryview)):
             obj["body"] = base64.b64encode(obj["body"]).decode("ascii")
 
-        return json.dumps(obj, default=str)
+        return nuclio_sdk.json_codec.dumps(obj, default=str)
 
     def get_header(self, header_key):
-        for key, value in self.headers.items():
-            if key.lower() == header_key.lower():
-                return value
+        if isinstance(header_key, bytes):
+            header_key = header_key.decode("latin-1")
+        lowercase_header_key = header_key.lower()
+
+        headers_index = self._get_headers_index()
+        key = headers_index[2].get(lowercase_header_key)
+        if key is None:
+            return None
+        try:
+            return headers_index[0][key]
+        except KeyError:
+            # removed since the index was built
+            headers_index = self._index_headers(self.headers)
+            key = headers_index[2].get(lowercase_header_key)
+            return None if key is None else headers_index[0][key]
+
+    @property
+    def headers_ci(self):
+        """
+        Read-only case-insensitive view of the headers, keyed by lowercase str (bytes keys are decoded).
+        Shares the index of get_header, values are read live
+        """
+        return self._get_headers_index()[3]
+
+    def _get_headers_index(self):
+        # the index maps to header keys rather than values, so values changed in place are read live. it is
+        # rebuilt when the headers are replaced, added or removed. a header swapped for another in place (same
+        # number of headers) is noticed once the swapped out one is looked up
+        headers = self.headers
+        headers_index = self._headers_index
+        if headers_index is not None and headers_index[0] is headers:
+            if headers_index[1] == len(headers):
+                return headers_index
+        return self._index_headers(headers)
+
+    def _index_headers(self, headers):
+        index = self._compile_headers_index(headers)
+        headers_index = (
+            headers,
+            len(headers),
+            index,
+            _CaseInsensitiveHeaders(headers, index),
+        )
+        self._headers_index = headers_index
+        return headers_index
+
+    @staticmethod
+    def _compile_headers_index(headers):
+        index = {}
+        for key in headers:
+            lowercase_key = key.decode("latin-1") if isinstance(key, bytes) else key
+
+            # first occurrence wins, as with a linear scan
+            index.setdefault(lowercase_key.lower(), key)
+        return index
+
+    def compile_explicit_ack_message(self):
+        """
+        Return json of offset data
+        """
+        # topic resolving like QualifiedOffset.from_event, without creating one
+        return nuclio_sdk.qualified_offset.compile_explicit_ack_message(
+            self.topic if self.topic else self.path, self.shard_id, self.offset
+        )
+
+    def _get_public_fields(self):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return self.to_json()
+
+
+class Event(_EventBase):
+    _trigger_info_class = TriggerInfo
 
     @staticmethod
     def from_msgpack(data):
@@ -246,19 +682,175 @@ class Event(object):
         return Event.deserialize(data, kind=EventDeserializerKinds.json)
 
     @classmethod
-    def deserialize(cls, data, kind=EventDeserializerKinds.msgpack_raw):
+    def deserialize(cls, data, kind=None):
         """
-        Deserialize event message
+        Deserialize event message (defaults to EventDeserializerKinds.msgpack_raw)
         """
+        kind = kind or EventDeserializerKinds.msgpack_raw
         return kind.value.deserialize(data)
 
-    def compile_explicit_ack_message(self):
-        """
-        Return json of offset data
-        """
-        return nuclio_sdk.QualifiedOffset.from_event(
-            self
-        ).compile_explicit_ack_message()
+    def _get_public_fields(self):
+        obj = {}
+        for field_name, field_value in vars(self).items():
+            # exclude private fields
+            if not field_name.startswith("_"):
+                obj[field_name] = field_value
+        return obj
+
+
+class CompactEvent(_EventBase):
+    """
+    Event without a per-instance __dict__, for workloads holding many events at once (batching, async
+    handlers). Takes less memory and has faster attribute access, but arbitrary attributes cannot be set
+    """
+
+    __slots__ = (
+        "body",
+        "content_type",
+        "trigger",
+        "fields",
+        "headers",
+        "id",
+        "method",
+        "path",
+        "size",
+        "timestamp",
+        "url",
+        "shard_id",
+        "num_shards",
+        "type",
+        "type_version",
+        "version",
+        "last_in_batch",
+        "offset",
+        "topic",
+        "_headers_index",
+    )
+
+    _trigger_info_class = CompactTriggerInfo
+
+    def _get_public_fields(self):
+        return {
+            field_name: getattr(self, field_name)
+            for field_name in self.__slots__
+            if not field_name.startswith("_")
+        }
+
+
+class LazyEvent(Event):
+    """
+    Event wrapping a parsed event message, resolving (and caching) each attribute on first access.
+    Handlers touching only a few attributes (e.g. body and a header) skip building the rest
+    """
+
+    def __init__(self, parsed_data, resolvers):
+        # do not call Event.__init__ - attributes are resolved on demand by __getattr__
+        self._parsed_data = parsed_data
+        self._resolvers = resolvers
+
+    def __getattr__(self, name):
+        # private attributes are never resolved (also avoids recursion while the object is being built)
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            resolver = self._resolvers[name]
+        except KeyError:
+            raise AttributeError(
+                "'{0}' object has no attribute '{1}'".format(
+                    self.__class__.__name__, name
+                )
+            )
+
+        # cache on the instance, subsequent accesses will not reach __getattr__
+        value = resolver(self._parsed_data)
+        setattr(self, name, value)
+        return value
+
+    def to_json(self):
+        self._resolve_all()
+        return super(LazyEvent, self).to_json()
+
+    def _resolve_all(self):
+        for name in self._resolvers:
+            getattr(self, name)
+
+
+class EventBatch(collections.abc.Sequence):
+    """
+    Columnar view over a batch of parsed event messages. The commonly scanned attributes are
+    extracted in a single pass into columns (ids, offsets, shard_ids, timestamps, bodies), while
+    per-item events (LazyEvent) are only built when indexed or iterated, then cached
+    """
+
+    def __init__(self, parsed_data, resolvers, keys):
+        self._parsed_data = parsed_data
+        self._resolvers = resolvers
+        self._events = [None] * len(parsed_data)
+
+        id_key, offset_key, shard_id_key, timestamp_key, body_key = keys
+        ids = []
+        offsets = []
+        shard_ids = []
+        timestamps = []
+        bodies = []
+        for single_event_data in parsed_data:
+            ids.append(single_event_data[id_key])
+            offsets.append(single_event_data.get(offset_key) or 0)
+            shard_ids.append(single_event_data[shard_id_key])
+            timestamps.append(single_event_data[timestamp_key])
+            bodies.append(single_event_data[body_key])
+
+        self.ids = ids
+        self.offsets = self._compact_column("q", offsets)
+        self.shard_ids = self._compact_column("q", shard_ids)
+
+        # seconds since epoch, Event.timestamp holds the equivalent datetime
+        self.timestamps = self._compact_column("d", timestamps)
+
+        # raw (undecoded) bodies as they arrived in the message
+        self.bodies = bodies
+
+    def __len__(self):
+        return len(self._events)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[item_index] for item_index in range(*index.indices(len(self)))]
+
+        event = self._events[index]
+        if event is None:
+            event = self._events[index] = LazyEvent(
+                self._parsed_data[index], self._resolvers
+            )
+        return event
+
+    def __iter__(self):
+        for index in range(len(self._events)):
+            yield self[index]
 
     def __repr__(self):
-        return self.to_json()
+        return "[{0}]".format(", ".join(repr(event) for event in self))
+
+    @staticmethod
+    def _compact_column(typecode, values):
+        try:
+            return array.array(typecode, values)
+        except (TypeError, OverflowError):
+            # not all numeric (e.g. missing shard ids) - keep as is
+            return values
+
+
+class EventDeserializerKinds(enum.Enum):
+    msgpack = _EventDeserializerMsgPack(raw=False)
+    msgpack_raw = _EventDeserializerMsgPack(raw=True)
+    msgpack_lazy = _EventDeserializerMsgPack(raw=False, lazy=True)
+    msgpack_raw_lazy = _EventDeserializerMsgPack(raw=True, lazy=True)
+    msgpack_columnar = _EventDeserializerMsgPack(raw=False, columnar=True)
+    msgpack_raw_columnar = _EventDeserializerMsgPack(raw=True, columnar=True)
+    msgpack_compact = _EventDeserializerMsgPack(raw=False, compact=True)
+    msgpack_raw_compact = _EventDeserializerMsgPack(raw=True, compact=True)
+    msgpack_compiled = _EventDeserializerMsgPack(raw=False, compiled=True)
+    msgpack_raw_compiled = _EventDeserializerMsgPack(raw=True, compiled=True)
+    msgpack_recycled = _EventDeserializerMsgPack(raw=False, recycle=True)
+    msgpack_raw_recycled = _EventDeserializerMsgPack(raw=True, recycle=True)
+    json = _EventDeserializerJSON()
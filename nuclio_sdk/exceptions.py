@@ -30,3 +30,15 @@ class ExceptionWithResponse(IOError):
     @property
     def content_type(self):
         return self._content_type
+
+
+class CircuitOpenError(IOError):
+    def __init__(self, target):
+        super(CircuitOpenError, self).__init__(
+            "Circuit breaker of {0} is open".format(target)
+        )
+        self._target = target
+
+    @property
+    def target(self):
+        return self._target
@@ -0,0 +1,84 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import itertools
+import threading
+import time
+
+
+class InFlightRegistry(object):
+    """
+    Events being processed, so a drain (stream rebalance) can wait for them rather than have them
+    reprocessed by the partitions' next owner. Thread safe
+    """
+
+    def __init__(self):
+        # token -> (event, registered at)
+        self._events = {}
+        self._tokens = itertools.count()
+        self._num_completed = 0
+        self._lock = threading.Lock()
+
+    def register(self, event):
+        """
+        :return: a token to unregister the event with
+        """
+        with self._lock:
+            token = next(self._tokens)
+            self._events[token] = (event, time.monotonic())
+        return token
+
+    def unregister(self, token):
+        with self._lock:
+            del self._events[token]
+            self._num_completed += 1
+
+    @contextlib.contextmanager
+    def track(self, event):
+        """
+        Register the event for the duration of the with block
+        """
+        token = self.register(event)
+        try:
+            yield event
+        finally:
+            self.unregister(token)
+
+    def get_events(self):
+        """
+        :return: list of the events in flight, oldest first
+        """
+        with self._lock:
+            return [event for event, _ in self._events.values()]
+
+    def get_stats(self):
+        """
+        :return: dict of the number of events in flight, the age in seconds of the oldest of them and the
+                 number of events completed so far
+        """
+        with self._lock:
+            registered_at = [
+                event_registered_at for _, event_registered_at in self._events.values()
+            ]
+            num_completed = self._num_completed
+
+        return {
+            "in_flight": len(registered_at),
+            "oldest_age": time.monotonic() - min(registered_at) if registered_at else 0,
+            "completed": num_completed,
+        }
+
+    def __len__(self):
+        return len(self._events)
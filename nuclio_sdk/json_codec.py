@@ -0,0 +1,242 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import json
+
+# environment variable forcing a specific codec (e.g. "json" to disable fast backends)
+CODEC_ENV_VAR = "NUCLIO_SDK_JSON_CODEC"
+
+
+class JSONCodec(object):
+    """
+    Standard library codec. Also defines the semantics all other codecs must follow:
+    - NaN / Infinity / -Infinity are encoded as the NaN / Infinity / -Infinity literals and accepted when decoding
+    - bytes, datetime and other non json-native values are handed to `default`, or raise TypeError without it
+    - dumps returns str (whitespace may differ between codecs)
+    """
+
+    name = "json"
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj, default=None):
+        return json.dumps(obj, default=default)
+
+
+class _FastJSONCodec(JSONCodec):
+    """
+    Base for third party codecs. Anything the backend rejects is handed over to the standard
+    library, so edge cases (NaN literals, non-str keys, big ints, ...) behave exactly like JSONCodec
+    """
+
+    def loads(self, data):
+        try:
+            return self._loads(data)
+        except (TypeError, ValueError):
+            return json.loads(data)
+
+    def dumps(self, obj, default=None):
+        try:
+            return self._dumps(obj, default)
+        except (TypeError, ValueError, OverflowError):
+            return json.dumps(obj, default=default)
+
+    def _loads(self, data):
+        raise NotImplementedError
+
+    def _dumps(self, obj, default):
+        raise NotImplementedError
+
+
+class OrjsonCodec(_FastJSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+
+        # let datetime / subclasses / dataclasses reach `default` like they do with the standard library
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_SUBCLASS
+        self._options = options | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def _loads(self, data):
+        return self._orjson.loads(data)
+
+    def _dumps(self, obj, default):
+        encoded = self._orjson.dumps(obj, default=default, option=self._options)
+
+        # orjson silently encodes NaN / Infinity as null. re-encode in that case so the
+        # literals are kept (payloads carrying actual nulls only pay for a scan of the object)
+        if b"null" in encoded and _contains_non_finite_float(obj):
+            return json.dumps(obj, default=default)
+        return encoded.decode("utf-8")
+
+
+def _contains_non_finite_float(obj):
+    """
+    Whether obj holds a NaN / Infinity float, or a value which is not json-native (it may be a float
+    subclass, or be handed to `default` which may return one). Recursive, objects orjson encoded are
+    at most 255 levels deep
+    """
+    obj_type = type(obj)
+    if obj_type is dict:
+        values = obj.values()
+    elif obj_type is list or obj_type is tuple:
+        values = obj
+    else:
+        values = (obj,)
+
+    for value in values:
+        value_type = type(value)
+        if value_type is str or value is None or value_type is int:
+            continue
+        if value_type is float:
+            # NaN - NaN and Infinity - Infinity are NaN
+            if value - value != 0:
+                return True
+        elif value_type is dict or value_type is list or value_type is tuple:
+            if _contains_non_finite_float(value):
+                return True
+        elif value_type is not bool:
+            return True
+    return False
+
+
+class UjsonCodec(_FastJSONCodec):
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+
+        self._ujson = ujson
+
+    def _loads(self, data):
+        return self._ujson.loads(data)
+
+    def _dumps(self, obj, default):
+        return self._ujson.dumps(
+            obj,
+            ensure_ascii=False,
+            reject_bytes=True,
+            allow_nan=True,
+            default=default,
+        )
+
+
+class RapidjsonCodec(_FastJSONCodec):
+    name = "rapidjson"
+
+    def __init__(self):
+        import rapidjson
+
+        self._rapidjson = rapidjson
+
+    def _loads(self, data):
+        return self._rapidjson.loads(data, number_mode=self._rapidjson.NM_NAN)
+
+    def _dumps(self, obj, default):
+        return self._rapidjson.dumps(
+            obj,
+            ensure_ascii=False,
+            default=default,
+            number_mode=self._rapidjson.NM_NAN,
+            bytes_mode=self._rapidjson.BM_NONE,
+        )
+
+
+# registered codecs by name, in auto detection preference order
+_codec_classes = {
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+    RapidjsonCodec.name: RapidjsonCodec,
+    JSONCodec.name: JSONCodec,
+}
+
+# the selected codec, and its bound methods for the hot path
+codec = None
+loads = None
+dumps = None
+
+
+def register_codec(codec_class):
+    """
+    Register a codec class (constructed without arguments, exposing name, loads and dumps).
+    Registered codecs take precedence over the built in ones when auto detecting
+
+    :param codec_class: the codec class to register
+    """
+    global _codec_classes
+    _codec_classes = {codec_class.name: codec_class, **_codec_classes}
+
+
+def use_codec(name=None):
+    """
+    Select the codec used by the SDK. If no name is given, pick the first available codec,
+    honoring the NUCLIO_SDK_JSON_CODEC environment variable
+
+    :param name: name of a registered codec
+    :return: the selected codec
+    """
+    global codec, loads, dumps
+
+    name = name or os.environ.get(CODEC_ENV_VAR)
+    if name:
+        if name not in _codec_classes:
+            raise ValueError(
+                "Unknown JSON codec {0}, expected one of {1}".format(
+                    name, ", ".join(_codec_classes)
+                )
+            )
+        codec = _codec_classes[name]()
+    else:
+        codec = _detect_codec()
+
+    loads = codec.loads
+    dumps = codec.dumps
+    return codec
+
+
+def _detect_codec():
+    for codec_class in _codec_classes.values():
+        try:
+            candidate = codec_class()
+            _verify_codec(candidate)
+            return candidate
+        except Exception:
+            # not installed, or does not behave as expected (e.g. outdated version)
+            continue
+    return JSONCodec()
+
+
+def _verify_codec(candidate):
+
+    # make sure the backend itself works, rather than everything silently falling back to the standard library
+    if isinstance(candidate, _FastJSONCodec):
+        candidate._loads(candidate._dumps({"key": [1, "value"]}, None))
+
+    nan_obj = candidate.loads(candidate.dumps({"nan": float("nan")}))
+    if nan_obj["nan"] == nan_obj["nan"]:
+        raise ValueError("Codec {0} does not keep NaN values".format(candidate.name))
+    try:
+        candidate.dumps(b"bytes")
+    except TypeError:
+        pass
+    else:
+        raise ValueError("Codec {0} serializes bytes".format(candidate.name))
+
+
+use_codec()
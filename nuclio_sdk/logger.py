@@ -12,40 +12,100 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import logging
+import queue
+import threading
+import time
+import traceback
 
 import nuclio_sdk.json_encoder
 
 
-class JSONFormatter(logging.Formatter):
-    def __init__(self):
-        super(JSONFormatter, self).__init__()
+class _TimeCachingFormatter(logging.Formatter):
+    """
+    Formats record times like logging.Formatter, reusing the formatted second across records
+    and only appending milliseconds. With epoch_nanos, times are nanoseconds since the epoch
+    (as int) rather than strings
+    """
+
+    def __init__(self, epoch_nanos=False):
+        super(_TimeCachingFormatter, self).__init__()
+        self._epoch_nanos = epoch_nanos
+
+        # (second, formatted second) - a single attribute, so threads always see a matching pair
+        self._formatted_second = (None, None)
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt is not None:
+            return super(_TimeCachingFormatter, self).formatTime(record, datefmt)
+
+        second = int(record.created)
+        cached_second, formatted_second = self._formatted_second
+        if second != cached_second:
+            formatted_second = time.strftime(
+                self.default_time_format, self.converter(record.created)
+            )
+            self._formatted_second = (second, formatted_second)
+
+        return self.default_msec_format % (formatted_second, record.msecs)
+
+    def _format_datetime(self, record):
+        if self._epoch_nanos:
+            return int(record.created * 1e9)
+        return self.formatTime(record, self.datefmt)
+
+
+class JSONFormatter(_TimeCachingFormatter):
+    def __init__(self, epoch_nanos=False):
+        super(JSONFormatter, self).__init__(epoch_nanos)
 
         self._json_encoder = nuclio_sdk.json_encoder.Encoder()
 
+        # C accelerated, for the common case of records without NaN / Infinity values (which
+        # the custom encoder logs as strings rather than raising)
+        self._fast_json_encoder = json.JSONEncoder(
+            allow_nan=False, default=self._json_encoder.default
+        )
+
     def format(self, record):
         record_fields = self._get_formatted_record_dict(record)
-        return self._json_encoder.encode(record_fields)
+        return self._encode(record_fields)
 
     def format_to_log_control_message(self, record):
         record_fields = {
             "kind": "log",
             "attributes": self._get_formatted_record_dict(record),
         }
-        return self._json_encoder.encode(record_fields)
+        return self._encode(record_fields)
+
+    @staticmethod
+    def format_to_log_batch_control_message(formatted_records):
+        """
+        Return a single control message of records already formatted with format()
+        """
+        return '{"kind": "logBatch", "attributes": {"logs": [%s]}}' % ", ".join(
+            formatted_records
+        )
+
+    def _encode(self, record_fields):
+        try:
+            return self._fast_json_encoder.encode(record_fields)
+        except ValueError:
+            return self._json_encoder.encode(record_fields)
 
     def _get_formatted_record_dict(self, record):
         return {
-            "datetime": self.formatTime(record, self.datefmt),
+            "datetime": self._format_datetime(record),
             "level": record.levelname.lower(),
             "message": record.getMessage(),
             "with": getattr(record, "with", {}),
         }
 
 
-class HumanReadableFormatter(logging.Formatter):
-    def __init__(self):
-        super(HumanReadableFormatter, self).__init__()
+class HumanReadableFormatter(_TimeCachingFormatter):
+    def __init__(self, epoch_nanos=False):
+        super(HumanReadableFormatter, self).__init__(epoch_nanos)
 
     def format(self, record):
         record_with = getattr(record, "with", {})
@@ -55,68 +115,403 @@ class HumanReadableFormatter(logging.Formatter):
             more = ""
 
         return "Python> {0} [{1}] {2}{3}".format(
-            self.formatTime(record, self.datefmt),
+            self._format_datetime(record),
             record.levelname.lower(),
             record.getMessage(),
             more,
         )
 
 
+class BackgroundStreamHandler(logging.StreamHandler):
+    """
+    Stream handler which hands records over to a writer thread through a bounded queue, taking
+    I/O off the logging thread. The writer writes and flushes the stream once per batch of queued
+    records.
+    Records are formatted as they are emitted (like logging.handlers.QueueHandler.prepare), so
+    later changes to logged values don't show and logged objects are never read by the writer.
+    When the queue is full, records are dropped (counted in num_dropped) or, with the "block"
+    overflow policy, the logging thread waits for room
+    """
+
+    def __init__(self, stream=None, max_queue_size=10000, overflow_policy="drop"):
+        super(BackgroundStreamHandler, self).__init__(stream)
+        if overflow_policy not in ("drop", "block"):
+            raise ValueError("Unsupported overflow policy: {0}".format(overflow_policy))
+
+        self.num_dropped = 0
+        self._block = overflow_policy == "block"
+        self._queue = queue.Queue(max_queue_size)
+        self._writer_thread = threading.Thread(
+            target=self._write_records, name="nuclio-log-writer", daemon=True
+        )
+        self._writer_thread.start()
+
+    def emit(self, record):
+        try:
+            formatted_record = self.format(record) + self.terminator
+        except Exception:
+            self.handleError(record)
+            return
+
+        try:
+            self._queue.put(formatted_record, block=self._block)
+        except queue.Full:
+            self.num_dropped += 1
+
+    def flush(self, timeout=None):
+        """
+        Wait for the records queued so far to be written
+
+        :param timeout: seconds to wait (None waits forever)
+        :return: whether all records were written
+        """
+        if not self._writer_thread.is_alive():
+            return True
+
+        flushed = threading.Event()
+        try:
+            self._queue.put(flushed, timeout=timeout)
+        except queue.Full:
+            return False
+        return flushed.wait(timeout)
+
+    def close(self):
+        if self._writer_thread.is_alive():
+            self._queue.put(None)
+            self._writer_thread.join()
+        super(BackgroundStreamHandler, self).close()
+
+    def _write_records(self):
+        while True:
+
+            # formatted records, flush events and None (closed) - write everything queued so far
+            # at once, flushing the stream once
+            items = [self._queue.get()]
+            while not self._queue.empty():
+                items.append(self._queue.get_nowait())
+
+            formatted_records = [item for item in items if isinstance(item, str)]
+            try:
+                if formatted_records:
+                    self.stream.write("".join(formatted_records))
+                self.stream.flush()
+            except Exception:
+                # like logging.Handler.handleError, without a single record to point at
+                if logging.raiseExceptions:
+                    traceback.print_exc()
+
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+            if None in items:
+                return
+
+
+class LogBatchHandler(logging.Handler):
+    """
+    Coalesces records into {"kind": "logBatch"} control messages (see
+    JSONFormatter.format_to_log_batch_control_message), passed to send. A batch is sent once it
+    holds max_batch_size records, max_batch_delay seconds after its first record, or on flush (e.g.
+    at the end of each event, see Logger.flush).
+    Records are formatted as they are emitted, so later changes to logged values don't show
+    """
+
+    def __init__(
+        self, send, max_batch_size=100, max_batch_delay=0.1, send_lock=None, loop=None
+    ):
+        """
+        :param send: called with each encoded control message, from the logging thread or - for
+                     batches sent after max_batch_delay - a background thread, unless loop is given
+        :param max_batch_size: maximum number of records per control message
+        :param max_batch_delay: maximum seconds a record waits to be sent
+        :param send_lock: held while calling send, for a send writing to a channel other threads
+                          write to as well (must be reentrant if send may log through this handler)
+        :param loop: event loop owning the channel - batches sent after max_batch_delay are handed to
+                     it (and sent from its thread) rather than sent from the background thread
+        """
+        super(LogBatchHandler, self).__init__()
+        self._send = send
+        self._max_batch_size = max_batch_size
+        self._max_batch_delay = max_batch_delay
+        self._loop = loop
+        self._batch = []
+        self._batch_started_at = 0
+        self._closed = False
+
+        # serializes sends, keeping batches in order. send is called without holding _batch_lock,
+        # so records logged by send (or by other threads meanwhile) don't deadlock
+        self._send_lock = send_lock or threading.RLock()
+
+        # not the handler's lock, which logging.shutdown holds while closing the handler
+        self._batch_lock = threading.Lock()
+        self._batch_started = threading.Condition(self._batch_lock)
+        self._sender_thread = threading.Thread(
+            target=self._send_delayed_batches,
+            name="nuclio-log-batch-sender",
+            daemon=True,
+        )
+        self._sender_thread.start()
+
+    def setFormatter(self, fmt):
+        self.verify_formatter(fmt)
+        super(LogBatchHandler, self).setFormatter(fmt)
+
+    @staticmethod
+    def verify_formatter(formatter):
+        """
+        Raise ValueError if formatter cannot encode log batches (e.g. a HumanReadableFormatter)
+        """
+        if not hasattr(formatter, "format_to_log_batch_control_message"):
+            raise ValueError(
+                "Log batches require a formatter encoding them (e.g. JSONFormatter), got: {0}".format(
+                    type(formatter).__name__
+                )
+            )
+
+    def emit(self, record):
+        try:
+            formatted_record = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+
+        with self._batch_lock:
+            self._batch.append(formatted_record)
+            batch_full = len(self._batch) >= self._max_batch_size
+            if len(self._batch) == 1:
+                self._batch_started_at = time.monotonic()
+                self._batch_started.notify()
+
+        if batch_full:
+            self._send_batch()
+
+    def flush(self):
+        self._send_batch()
+
+    def close(self):
+        with self._batch_lock:
+            self._closed = True
+            self._batch_started.notify()
+        self._sender_thread.join()
+        self._send_batch()
+        super(LogBatchHandler, self).close()
+
+    def _send_batch(self):
+        with self._send_lock:
+            with self._batch_lock:
+                batch, self._batch = self._batch, []
+            if not batch:
+                return
+
+            try:
+                self._send(self.formatter.format_to_log_batch_control_message(batch))
+            except Exception:
+                # like logging.Handler.handleError, without a single record to point at
+                if logging.raiseExceptions:
+                    traceback.print_exc()
+
+    def _send_delayed_batches(self):
+        while self._wait_for_delayed_batch():
+            if self._loop is None:
+                self._send_batch()
+                continue
+
+            try:
+                self._loop.call_soon_threadsafe(self.flush)
+            except RuntimeError:
+                # loop closed, nothing left to send the batches from
+                return
+
+    def _wait_for_delayed_batch(self):
+        """
+        Wait until the current batch is due
+
+        :return: False once the handler is closed
+        """
+        with self._batch_lock:
+            while not self._closed:
+                if not self._batch:
+                    self._batch_started.wait()
+                    continue
+
+                # batch may be sent (and another one started) while waiting - check again after
+                remaining = (
+                    self._batch_started_at + self._max_batch_delay - time.monotonic()
+                )
+                if remaining > 0:
+                    self._batch_started.wait(remaining)
+                    continue
+
+                # until the batch is sent (by the loop), it's due again only after another delay
+                self._batch_started_at = time.monotonic()
+                return True
+            return False
+
+
+class LazyValue(object):
+    """
+    Wraps a callable computing a value to log, called only if the record is emitted (e.g.
+    logger.debug_with("Got state", state=LazyValue(lambda: expensive_dump(state))))
+    """
+
+    __slots__ = ("_callable",)
+
+    def __init__(self, callable_):
+        self._callable = callable_
+
+    def __call__(self):
+        return self._callable()
+
+
 class Logger(object):
     def __init__(self, level, name="nuclio_sdk"):
         self._logger = logging.getLogger(name)
         self._logger.setLevel(level)
         self._bound_variables = {}
 
-    def set_handler(self, handler_name, file, formatter):
+    def set_handler(
+        self,
+        handler_name,
+        file,
+        formatter,
+        background=False,
+        max_queue_size=10000,
+        overflow_policy="drop",
+    ):
+        """
+        Set a handler writing log records to a file
 
-        # check if there's a handler by this name
-        for handler in self._logger.handlers:
-            if handler.name == handler_name:
-                self._logger.removeHandler(handler)
-                break
+        :param handler_name: replaces the handler by this name, if any
+        :param file: the file (stream) to write to
+        :param formatter: formats the records
+        :param background: format and write records from a writer thread (see BackgroundStreamHandler).
+                           flush before exiting (e.g. with Platform.add_signal_hook(logger.flush))
+        :param max_queue_size: maximum number of records waiting to be written in the background
+        :param overflow_policy: "drop" or "block" when the background queue is full
+        """
 
         # create a stream handler from the file
-        stream_handler = logging.StreamHandler(file)
-        stream_handler.name = handler_name
+        if background:
+            stream_handler = BackgroundStreamHandler(
+                file, max_queue_size=max_queue_size, overflow_policy=overflow_policy
+            )
+        else:
+            stream_handler = logging.StreamHandler(file)
 
-        # set the formatter
-        stream_handler.setFormatter(formatter)
+        self._replace_handler(handler_name, stream_handler, formatter)
 
-        # add the handler to the logger
-        self._logger.addHandler(stream_handler)
+    def set_log_batch_handler(
+        self,
+        handler_name,
+        send,
+        formatter,
+        max_batch_size=100,
+        max_batch_delay=0.1,
+        send_lock=None,
+        loop=None,
+    ):
+        """
+        Set a handler sending log records in batches, as control messages (see LogBatchHandler)
+
+        :param handler_name: replaces the handler by this name, if any
+        :param send: called with each encoded control message
+        :param formatter: a JSONFormatter
+        :param max_batch_size: maximum number of records per control message
+        :param max_batch_delay: maximum seconds a record waits to be sent
+        :param send_lock: held while calling send (see LogBatchHandler)
+        :param loop: event loop to send delayed batches from (see LogBatchHandler)
+        """
+
+        # before starting the handler's sender thread
+        LogBatchHandler.verify_formatter(formatter)
+
+        self._replace_handler(
+            handler_name,
+            LogBatchHandler(
+                send,
+                max_batch_size=max_batch_size,
+                max_batch_delay=max_batch_delay,
+                send_lock=send_lock,
+                loop=loop,
+            ),
+            formatter,
+        )
 
     def debug(self, message, *args):
-        self._update_bound_vars_and_log(logging.DEBUG, message, *args)
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._update_bound_vars_and_log(logging.DEBUG, message, *args)
 
     def info(self, message, *args):
-        self._update_bound_vars_and_log(logging.INFO, message, *args)
+        if self._logger.isEnabledFor(logging.INFO):
+            self._update_bound_vars_and_log(logging.INFO, message, *args)
 
     def warn(self, message, *args):
-        self._update_bound_vars_and_log(logging.WARNING, message, *args)
+        if self._logger.isEnabledFor(logging.WARNING):
+            self._update_bound_vars_and_log(logging.WARNING, message, *args)
 
     def error(self, message, *args):
-        self._update_bound_vars_and_log(logging.ERROR, message, *args)
+        if self._logger.isEnabledFor(logging.ERROR):
+            self._update_bound_vars_and_log(logging.ERROR, message, *args)
 
     def debug_with(self, message, *args, **kw_args):
-        self._update_bound_vars_and_log(logging.DEBUG, message, *args, **kw_args)
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._update_bound_vars_and_log(logging.DEBUG, message, *args, **kw_args)
 
     def info_with(self, message, *args, **kw_args):
-        self._update_bound_vars_and_log(logging.INFO, message, *args, **kw_args)
+        if self._logger.isEnabledFor(logging.INFO):
+            self._update_bound_vars_and_log(logging.INFO, message, *args, **kw_args)
 
     def warn_with(self, message, *args, **kw_args):
-        self._update_bound_vars_and_log(logging.WARNING, message, *args, **kw_args)
+        if self._logger.isEnabledFor(logging.WARNING):
+            self._update_bound_vars_and_log(logging.WARNING, message, *args, **kw_args)
 
     def error_with(self, message, *args, **kw_args):
-        self._update_bound_vars_and_log(logging.ERROR, message, *args, **kw_args)
+        if self._logger.isEnabledFor(logging.ERROR):
+            self._update_bound_vars_and_log(logging.ERROR, message, *args, **kw_args)
 
     def bind(self, **kw_args):
         self._bound_variables.update(kw_args)
 
+    def flush(self, timeout=None):
+        """
+        Wait for records written in the background to reach their files, and send pending log batches
+
+        :param timeout: seconds to wait per handler (None waits forever)
+        """
+        for handler in self._logger.handlers:
+            if isinstance(handler, BackgroundStreamHandler):
+                handler.flush(timeout)
+            else:
+                handler.flush()
+
+    def _replace_handler(self, handler_name, new_handler, formatter):
+
+        # check if there's a handler by this name
+        for handler in self._logger.handlers:
+            if handler.name == handler_name:
+                self._logger.removeHandler(handler)
+                handler.close()
+                break
+
+        new_handler.name = handler_name
+
+        # set the formatter
+        new_handler.setFormatter(formatter)
+
+        # add the handler to the logger
+        self._logger.addHandler(new_handler)
+
     def _update_bound_vars_and_log(self, level, message, *args, **kw_args):
         kw_args.update(self._bound_variables)
 
         if len(kw_args) != 0:
+
+            # evaluate lazy values now that the record is known to be emitted
+            for key, value in kw_args.items():
+                if isinstance(value, LazyValue):
+                    kw_args[key] = value()
+
             self._logger._log(level, message, args, extra={"with": kw_args})
             return
 
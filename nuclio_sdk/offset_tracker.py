@@ -0,0 +1,94 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import threading
+
+import nuclio_sdk.qualified_offset
+
+
+class _PartitionOffsets(object):
+    __slots__ = ("started", "in_flight")
+
+    def __init__(self):
+        # offsets in the order they started (the partition's order) - up to the last one not
+        # completed, and those of them not completed
+        self.started = collections.deque()
+        self.in_flight = set()
+
+
+class OffsetTracker(object):
+    """
+    Tracks offsets of stream partitions processed concurrently, so only the low watermark - the
+    highest offset all offsets up to which completed - is acked. Offsets of a partition must be
+    started in the partition's order, and may complete in any order. Thread safe
+    """
+
+    def __init__(self):
+        self._partitions = {}
+        self._lock = threading.Lock()
+
+    @property
+    def num_in_flight(self):
+        """
+        Number of offsets started and not yet completed
+        """
+        with self._lock:
+            return sum(
+                len(partition_offsets.in_flight)
+                for partition_offsets in self._partitions.values()
+            )
+
+    def start(self, qualified_offset):
+        """
+        Register an offset whose processing started
+        """
+        key = (qualified_offset.topic, qualified_offset.partition)
+        with self._lock:
+            try:
+                partition_offsets = self._partitions[key]
+            except KeyError:
+                partition_offsets = self._partitions[key] = _PartitionOffsets()
+            partition_offsets.started.append(qualified_offset.offset)
+            partition_offsets.in_flight.add(qualified_offset.offset)
+
+    def complete(self, qualified_offset):
+        """
+        Register an offset whose processing completed
+
+        :return: the partition's new low watermark to ack (a QualifiedOffset), or None if it didn't advance
+        """
+        key = (qualified_offset.topic, qualified_offset.partition)
+        offset = qualified_offset.offset
+        with self._lock:
+            partition_offsets = self._partitions.get(key)
+            if partition_offsets is None or offset not in partition_offsets.in_flight:
+                raise ValueError(
+                    "Offset {0} of {1} is not in flight".format(offset, key)
+                )
+
+            partition_offsets.in_flight.remove(offset)
+            started = partition_offsets.started
+            if started[0] != offset:
+                return None
+
+            # the oldest offset completed - advance past it and the completed offsets following it
+            watermark = started.popleft()
+            while started and started[0] not in partition_offsets.in_flight:
+                watermark = started.popleft()
+
+            if not started:
+                del self._partitions[key]
+
+        return nuclio_sdk.qualified_offset.QualifiedOffset(key[0], key[1], watermark)
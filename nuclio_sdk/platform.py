@@ -12,31 +12,134 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
+import asyncio
+import concurrent.futures
+import functools
 import http.client
+import inspect
+import threading
+import time
 
 import nuclio_sdk
+import nuclio_sdk.ack_aggregator
+import nuclio_sdk.async_connection
+import nuclio_sdk.call_policy
+import nuclio_sdk.compression
+import nuclio_sdk.connection_pool
 import nuclio_sdk.helpers
+import nuclio_sdk.in_flight_registry
+import nuclio_sdk.json_codec
+import nuclio_sdk.offset_tracker
+
+# errors of a pooled connection closed by the peer while idle
+_stale_connection_errors = (
+    http.client.RemoteDisconnected,
+    ConnectionResetError,
+    BrokenPipeError,
+)
 
 
 class Platform(object):
+
+    # maximum number of (function, service override) call plans to keep
+    max_cached_call_plans = 1024
+
+    # maximum number of threads running hedged call_function attempts
+    max_hedging_workers = 32
+
     def __init__(
         self,
         kind,
         namespace="default",
         connection_provider=None,
         on_control_callback=None,
+        connection_pool_size=8,
+        connection_idle_timeout=30,
+        async_connection_provider=None,
+        compression=None,
+        compression_min_size=1024,
+        retry_policy=None,
+        hedge_percentile=None,
+        circuit_breaker_failure_threshold=None,
+        circuit_breaker_reset_timeout=10,
+        explicit_ack_batch_size=None,
+        explicit_ack_batch_delay=0.05,
     ):
         self.kind = kind
+
+        # content encoding of request bodies of at least compression_min_size bytes (None disables compression)
+        encodings = nuclio_sdk.compression.get_encodings()
+        if compression is not None and compression not in encodings:
+            raise ValueError("Unsupported compression: {0}".format(compression))
+        self._compression = compression
+        self._compression_min_size = compression_min_size
+
+        # function url and base headers per (function name, service name override)
+        self._call_plans = {}
         self.namespace = namespace
 
-        # connection_provider is used for unit testing
+        # connection_provider and async_connection_provider are used for unit testing
         self._connection_provider = connection_provider or http.client.HTTPConnection
+        self._async_connection_provider = (
+            async_connection_provider or nuclio_sdk.async_connection.AsyncConnection
+        )
+
+        # keep-alive connections per function url (pool size of 0 disables keep-alive)
+        self._connection_pool_size = connection_pool_size
+        self._connection_idle_timeout = connection_idle_timeout
+        self._connection_pools = {}
+        self._connection_pools_lock = threading.Lock()
+
+        # same, for call_function_async. (event loop, connection pool) per function url
+        self._async_connection_pools = {}
+
+        # defaults of the call options (see call_function)
+        self._retry_policy = retry_policy
+        self._hedge_percentile = hedge_percentile
+
+        # per function url (a failure threshold of None disables circuit breaking)
+        self._circuit_breaking = circuit_breaker_failure_threshold is not None
+        self._circuit_breaker_failure_threshold = circuit_breaker_failure_threshold
+        self._circuit_breaker_reset_timeout = circuit_breaker_reset_timeout
+        self._circuit_breakers = {}
+        self._latency_trackers = {}
+        self._hedging_executor = None
 
         self._control_callback = on_control_callback
         self._termination_callback = None
         self._drain_callback = None
 
+        # called after the termination / drain callback, per callback type
+        self._signal_hooks = {"termination": [], "drain": []}
+
+        # offsets of events processed concurrently, acked in order (see track_offset)
+        self._offset_tracker = nuclio_sdk.offset_tracker.OffsetTracker()
+
+        # events being processed, waited for on drain (see track_event)
+        self._in_flight_registry = nuclio_sdk.in_flight_registry.InFlightRegistry()
+
+        # coalesce explicit acks (a batch size of None sends each ack as is)
+        self._ack_aggregator = None
+        if explicit_ack_batch_size is not None:
+            self._ack_aggregator = nuclio_sdk.ack_aggregator.AckAggregator(
+                self._send_control_message,
+                max_batch_size=explicit_ack_batch_size,
+                max_batch_delay=explicit_ack_batch_delay,
+            )
+            for callback_type in self._signal_hooks:
+                self.add_signal_hook(self._ack_aggregator.flush_soon, callback_type)
+
+    @property
+    def namespace(self):
+        return self._namespace
+
+    @namespace.setter
+    def namespace(self, namespace):
+        self._namespace = namespace
+
+        # function urls are derived from the namespace
+        self._call_plans.clear()
+
     async def explicit_ack(self, qualified_offset):
         """
         Notifying the processor to ack on a qualified offset
@@ -44,7 +147,107 @@ class Platform(object):
         :param qualified_offset: the qualified offset to ack
         :type qualified_offset: QualifiedOffset
         """
-        message = qualified_offset.compile_explicit_ack_message()
+        if self._ack_aggregator is not None:
+            await self._ack_aggregator.add(qualified_offset)
+            return
+
+        await self._send_control_message(
+            qualified_offset.compile_explicit_ack_message()
+        )
+
+    def track_offset(self, qualified_offset):
+        """
+        Register the offset of an event whose processing started, for handlers processing events of a
+        partition concurrently. Once done, call complete_offset rather than explicit_ack - acking the
+        offset directly would commit past events still in flight.
+        Offsets of a partition must be tracked in the order they are received
+
+        :param qualified_offset: the qualified offset of the event
+        :type qualified_offset: QualifiedOffset
+        """
+        self._offset_tracker.start(qualified_offset)
+
+    async def complete_offset(self, qualified_offset):
+        """
+        Mark a tracked offset done, and ack the highest offset of its partition all offsets up to
+        which are done (if it advanced)
+
+        :param qualified_offset: the qualified offset passed to track_offset
+        :type qualified_offset: QualifiedOffset
+        """
+        low_watermark = self._offset_tracker.complete(qualified_offset)
+        if low_watermark is not None:
+            await self.explicit_ack(low_watermark)
+
+    def track_event(self, event):
+        """
+        Register an event as being processed for the duration of a with block, so that drain waits for it.
+        Meant to wrap each handler invocation:
+
+            with platform.track_event(event):
+                response = handler(context, event)
+
+        :param event: the event being processed
+        :type event: Event
+        """
+        return self._in_flight_registry.track(event)
+
+    def get_in_flight_stats(self):
+        """
+        :return: dict of the number of events in flight (see track_event), the age in seconds of the oldest
+                 of them, the number of events completed so far and the number of offsets in flight (see
+                 track_offset)
+        """
+        in_flight_stats = self._in_flight_registry.get_stats()
+        in_flight_stats["offsets_in_flight"] = self._offset_tracker.num_in_flight
+        return in_flight_stats
+
+    async def drain(self, timeout=None, poll_interval=0.01):
+        """
+        Wait for the events in flight (see track_event) and the tracked offsets (see track_offset) to
+        complete, then send the explicit acks held for coalescing - so that once the partitions are
+        rebalanced, their next owner resumes after the processed events rather than reprocessing them.
+        Call from the drain callback (see set_drain_callback)
+
+        :param timeout: seconds to wait for the work in flight (None waits forever)
+        :param poll_interval: seconds between checks of the work in flight
+        :return: dict of the in flight stats after the drain (see get_in_flight_stats), plus whether all work
+                 completed ("drained"), the numbers of events and offsets in flight when the drain started
+                 ("in_flight_at_start", "offsets_in_flight_at_start") and the seconds waited ("wait_duration")
+        """
+        started_at = time.monotonic()
+        in_flight_stats_at_start = self.get_in_flight_stats()
+
+        while self._has_work_in_flight():
+            if timeout is not None and time.monotonic() - started_at >= timeout:
+                break
+            await asyncio.sleep(poll_interval)
+
+        wait_duration = time.monotonic() - started_at
+        await self.flush_explicit_acks()
+
+        in_flight_stats = self.get_in_flight_stats()
+        in_flight_stats.update(
+            drained=not self._has_work_in_flight(),
+            in_flight_at_start=in_flight_stats_at_start["in_flight"],
+            offsets_in_flight_at_start=in_flight_stats_at_start["offsets_in_flight"],
+            wait_duration=wait_duration,
+        )
+        return in_flight_stats
+
+    def _has_work_in_flight(self):
+        return (
+            len(self._in_flight_registry) > 0 or self._offset_tracker.num_in_flight > 0
+        )
+
+    async def flush_explicit_acks(self):
+        """
+        Send explicit acks held for coalescing (see explicit_ack_batch_size)
+        """
+        if self._ack_aggregator is not None:
+            await self._ack_aggregator.flush()
+
+    async def _send_control_message(self, message):
         if self._control_callback:
             await self._control_callback(message)
         else:
@@ -72,67 +275,577 @@ class Platform(object):
         """
         self._termination_callback = callback
 
+    def add_signal_hook(self, hook, callback_type="termination"):
+        """
+        Register a hook to be called when the platform is terminating or draining, after the
+        termination / drain callback. Unlike the callbacks, hooks accumulate rather than replace
+        each other (e.g. flushing a background log handler, see Logger.flush).
+        When called, the hook will be called with zero arguments. A hook may return an awaitable (or a
+        concurrent.futures.Future), awaited before the signal handling completes
+
+        :param hook: the hook to call
+        :param callback_type: "termination" or "drain"
+        """
+        self._signal_hooks[callback_type].append(hook)
+
     def call_function(
-        self, function_name, event, node=None, timeout=None, service_name_override=None
+        self,
+        function_name,
+        event,
+        node=None,
+        timeout=None,
+        service_name_override=None,
+        retry_policy=None,
+        hedge_percentile=None,
+    ):
+        """
+        Call another function and wait for its response
+
+        :param function_name: the name of the function to call
+        :param event: the event to send the function
+        :param node: unused
+        :param timeout: seconds to wait for the response of each attempt (None waits forever)
+        :param service_name_override: call this service rather than the function's default one
+        :param retry_policy: a call_policy.RetryPolicy for failed attempts (defaults to the platform's)
+        :param hedge_percentile: if an attempt takes longer than this percentile (0-100) of the function's
+                                 recent latencies, send a second one and use whichever responds first
+                                 (defaults to the platform's)
+        :return: the function's Response
+        """
+        url, base_headers = self._get_call_plan(function_name, service_name_override)
+        body, headers = self._compile_request(base_headers, event)
+        attempt = functools.partial(
+            self._attempt, url, timeout, event.method, event.path, body, headers
+        )
+
+        retry_policy = retry_policy or self._retry_policy
+        hedge_percentile = hedge_percentile or self._hedge_percentile
+        if not (retry_policy or hedge_percentile or self._circuit_breaking):
+            return self._compile_response(*attempt())
+
+        return self._compile_response(
+            *self._call_with_policies(url, attempt, retry_policy, hedge_percentile)
+        )
+
+    async def call_function_async(
+        self,
+        function_name,
+        event,
+        node=None,
+        timeout=None,
+        service_name_override=None,
+        retry_policy=None,
+        hedge_percentile=None,
     ):
-        # get connection from provider
-        connection = self._connection_provider(
-            self._get_function_url(function_name, service_name_override),
+        """
+        Like call_function, without blocking the event loop. Concurrent calls each use their own
+        connection, returned to a keep-alive pool (per event loop) once done
+        """
+        url, base_headers = self._get_call_plan(function_name, service_name_override)
+        body, headers = self._compile_request(base_headers, event)
+        attempt = functools.partial(
+            self._attempt_async, url, timeout, event.method, event.path, body, headers
+        )
+
+        retry_policy = retry_policy or self._retry_policy
+        hedge_percentile = hedge_percentile or self._hedge_percentile
+        if not (retry_policy or hedge_percentile or self._circuit_breaking):
+            return self._compile_response(*await attempt())
+
+        return self._compile_response(
+            *await self._call_with_policies_async(
+                url, attempt, retry_policy, hedge_percentile
+            )
+        )
+
+    def call_functions(self, calls, max_concurrency=16, timeout=None, **call_options):
+        """
+        Call several functions concurrently, from a pool of threads
+
+        :param calls: list of (function name, event) tuples
+        :param max_concurrency: maximum number of in-flight calls
+        :param timeout: seconds each call may take from its start, retries included (None waits forever).
+                        A call past it is reported as a TimeoutError and left to complete in the background
+        :param call_options: passed to call_function (e.g. retry_policy)
+        :return: list of results, in the order of calls. each is the function's Response, or the
+                 exception raised by its call
+        """
+        calls = list(calls)
+        if not calls:
+            return []
+
+        # a call's deadline counts from its start rather than from its submission to the pool
+        started_at = [None] * len(calls)
+        started = [threading.Event() for _ in calls]
+
+        def _call_function(index):
+            started_at[index] = time.monotonic()
+            started[index].set()
+            function_name, event = calls[index]
+            return self.call_function(
+                function_name, event, timeout=timeout, **call_options
+            )
+
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(max_concurrency, len(calls))
+        )
+        try:
+            futures = [
+                executor.submit(_call_function, index) for index in range(len(calls))
+            ]
+            results = []
+            for index, future in enumerate(futures):
+                try:
+                    if timeout is None:
+                        results.append(future.result())
+                    else:
+                        started[index].wait()
+                        deadline = started_at[index] + timeout
+                        results.append(
+                            future.result(max(deadline - time.monotonic(), 0))
+                        )
+                except concurrent.futures.TimeoutError:
+                    results.append(
+                        TimeoutError(
+                            "Call to {0} timed out after {1} seconds".format(
+                                calls[index][0], timeout
+                            )
+                        )
+                    )
+                except Exception as exc:
+                    results.append(exc)
+            return results
+        finally:
+            # don't wait for calls past their deadline
+            executor.shutdown(wait=False)
+
+    def map_function(
+        self, function_name, events, max_concurrency=16, timeout=None, **call_options
+    ):
+        """
+        Call a function with each of the events concurrently (see call_functions)
+        """
+        return self.call_functions(
+            [(function_name, event) for event in events],
+            max_concurrency=max_concurrency,
             timeout=timeout,
+            **call_options
         )
 
+    async def call_functions_async(
+        self, calls, max_concurrency=16, timeout=None, **call_options
+    ):
+        """
+        Like call_functions, running the calls concurrently on the event loop. A call past its timeout is
+        cancelled, and reported as an asyncio.TimeoutError
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _call_function(function_name, event):
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self.call_function_async(
+                            function_name, event, timeout=timeout, **call_options
+                        ),
+                        timeout,
+                    )
+                except Exception as exc:
+                    return exc
+
+        return list(
+            await asyncio.gather(
+                *[
+                    _call_function(function_name, event)
+                    for function_name, event in calls
+                ]
+            )
+        )
+
+    async def map_function_async(
+        self, function_name, events, max_concurrency=16, timeout=None, **call_options
+    ):
+        """
+        Like map_function, running the calls concurrently on the event loop
+        """
+        return await self.call_functions_async(
+            [(function_name, event) for event in events],
+            max_concurrency=max_concurrency,
+            timeout=timeout,
+            **call_options
+        )
+
+    def _get_call_plan(self, function_name, service_name_override=None):
+        try:
+            return self._call_plans[(function_name, service_name_override)]
+        except KeyError:
+            if len(self._call_plans) >= self.max_cached_call_plans:
+                self._call_plans.clear()
+
+            # use the name of the function to indicate the target (unless the event's headers override it)
+            # this is needed to cold start a function in case it was scaled to zero
+            base_headers = {"X-Nuclio-Target": function_name}
+
+            # with compression enabled, responses may be compressed too
+            if self._compression is not None:
+                base_headers["Accept-Encoding"] = nuclio_sdk.compression.accept_encoding
+
+            call_plan = (
+                self._get_function_url(function_name, service_name_override),
+                base_headers,
+            )
+            self._call_plans[(function_name, service_name_override)] = call_plan
+            return call_plan
+
+    def _compile_request(self, base_headers, event):
+
         # if the user passes a dict as a body, assume json serialization. otherwise take content type from
         # body or use plain text
         if isinstance(event.body, dict):
-            body = json.dumps(event.body)
+            body = nuclio_sdk.json_codec.dumps(event.body)
             content_type = "application/json"
         else:
             body = event.body
             content_type = event.content_type or "text/plain"
 
-        # use the headers from the event or default to empty dict
-        headers = event.headers or {}
-        headers["Content-Type"] = content_type
+        # send text as utf-8 (rather than http.client's latin-1, which cannot encode all json codec outputs)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
 
-        # if no override header, use the name of the function to indicate the target
-        # this is needed to cold start a function in case it was scaled to zero
-        headers["X-Nuclio-Target"] = event.headers.get("X-Nuclio-Target", function_name)
+        # a new dict - the event's headers are left untouched
+        headers = base_headers.copy()
+        if event.headers:
+            headers.update(event.headers)
 
-        # let http client determine that
-        headers.pop("Content-Length", None)
+            # let http client determine that
+            headers.pop("Content-Length", None)
 
-        try:
-            connection.request(event.method, event.path, body=body, headers=headers)
+        headers["Content-Type"] = content_type
 
-            # get response from connection
-            response = connection.getresponse()
+        if self._compression is not None and self._should_compress(body):
+            body = nuclio_sdk.compression.compress(self._compression, body)
+            headers["Content-Encoding"] = self._compression
 
-            # read the body
-            response_body = response.read()
-        finally:
-            connection.close()
+        return body, headers
+
+    def _should_compress(self, body):
+        if not isinstance(body, (bytes, bytearray, memoryview)):
+            return False
+        return len(body) >= self._compression_min_size
+
+    @staticmethod
+    def _compile_response(status, headers, body):
 
         # header dict
         response_headers = {}
 
         # get response headers as lowercase
-        for name, value in response.getheaders():
+        for name, value in headers:
             response_headers[name.lower()] = value
 
         # if content type exists, use it
         response_content_type = response_headers.get("content-type", "text/plain")
 
+        # decompress before parsing. the headers then describe the decoded body, so that forwarding them
+        # does not have it decoded again
+        if "content-encoding" in response_headers:
+            body = nuclio_sdk.compression.decompress(
+                response_headers.pop("content-encoding"), body
+            )
+            response_headers.pop("content-length", None)
+
         # if content type is json, go ahead and do parsing here. if it explodes, don't blow up
         if response_content_type == "application/json":
-            response_body = json.loads(response_body)
+            body = nuclio_sdk.json_codec.loads(body)
 
         return nuclio_sdk.Response(
             headers=response_headers,
-            body=response_body,
+            body=body,
             content_type=response_content_type,
-            status_code=response.status,
+            status_code=status,
         )
 
+    def close_connections(self):
+        """
+        Close all idle keep-alive connections
+        """
+        with self._connection_pools_lock:
+            connection_pools = list(self._connection_pools.values())
+            self._connection_pools.clear()
+
+        for connection_pool in connection_pools:
+            connection_pool.close()
+
+        async_connection_pools = list(self._async_connection_pools.values())
+        self._async_connection_pools.clear()
+        for _, connection_pool in async_connection_pools:
+            connection_pool.close()
+
+    def _get_connection_pool(self, url):
+        try:
+            return self._connection_pools[url]
+        except KeyError:
+            with self._connection_pools_lock:
+                if url not in self._connection_pools:
+                    self._connection_pools[url] = (
+                        nuclio_sdk.connection_pool.ConnectionPool(
+                            lambda: self._connection_provider(url),
+                            max_size=self._connection_pool_size,
+                            idle_timeout=self._connection_idle_timeout,
+                        )
+                    )
+                return self._connection_pools[url]
+
+    def _get_async_connection_pool(self, url):
+        loop = asyncio.get_running_loop()
+        pool_loop, connection_pool = self._async_connection_pools.get(url, (None, None))
+
+        # connections are bound to the event loop that created them
+        if pool_loop is not loop:
+            if connection_pool is not None:
+                connection_pool.close()
+            connection_pool = nuclio_sdk.connection_pool.ConnectionPool(
+                lambda: self._async_connection_provider(url),
+                max_size=self._connection_pool_size,
+                idle_timeout=self._connection_idle_timeout,
+            )
+            self._async_connection_pools[url] = (loop, connection_pool)
+        return connection_pool
+
+    def _attempt(self, url, timeout, method, path, body, headers):
+        response, response_body = self._send_request(
+            self._get_connection_pool(url), timeout, method, path, body, headers
+        )
+        return response.status, response.getheaders(), response_body
+
+    async def _attempt_async(self, url, timeout, method, path, body, headers):
+        response = await asyncio.wait_for(
+            self._send_request_async(
+                self._get_async_connection_pool(url), method, path, body, headers
+            ),
+            timeout,
+        )
+        return response.status, response.getheaders(), response.body
+
+    def _call_with_policies(self, url, attempt, retry_policy, hedge_percentile):
+        call_attempts = nuclio_sdk.call_policy.CallAttempts(
+            retry_policy, self._get_circuit_breaker(url)
+        )
+        attempt = self._get_hedged_attempt(
+            url, attempt, hedge_percentile, self._hedge, self._timed
+        )
+
+        for attempt_index in range(call_attempts.max_attempts):
+            if attempt_index:
+                time.sleep(call_attempts.get_delay(attempt_index))
+            call_attempts.check()
+            try:
+                result = attempt()
+            except BaseException as exc:
+                if call_attempts.record_error(exc, attempt_index):
+                    continue
+                raise
+            if not call_attempts.record_status(result[0], attempt_index):
+                return result
+
+    async def _call_with_policies_async(
+        self, url, attempt, retry_policy, hedge_percentile
+    ):
+        call_attempts = nuclio_sdk.call_policy.CallAttempts(
+            retry_policy, self._get_circuit_breaker(url)
+        )
+        attempt = self._get_hedged_attempt(
+            url, attempt, hedge_percentile, self._hedge_async, self._timed_async
+        )
+
+        for attempt_index in range(call_attempts.max_attempts):
+            if attempt_index:
+                await asyncio.sleep(call_attempts.get_delay(attempt_index))
+            call_attempts.check()
+            try:
+                result = await attempt()
+            except BaseException as exc:
+                if call_attempts.record_error(exc, attempt_index):
+                    continue
+                raise
+            if not call_attempts.record_status(result[0], attempt_index):
+                return result
+
+    def _get_hedged_attempt(self, url, attempt, hedge_percentile, hedge, timed):
+        """
+        Wrap attempt to hedge it (see _hedge / _hedge_async), after the recent latencies of url
+        """
+        if not hedge_percentile:
+            return attempt
+
+        latency_tracker = self._get_latency_tracker(url)
+        timed_attempt = functools.partial(timed, attempt, latency_tracker)
+        return lambda: hedge(
+            timed_attempt, latency_tracker.get_percentile(hedge_percentile)
+        )
+
+    def _hedge(self, attempt, hedge_delay):
+        if hedge_delay is None:
+            return attempt()
+
+        executor = self._get_hedging_executor()
+        futures = [executor.submit(attempt)]
+        done, _ = concurrent.futures.wait(futures, timeout=hedge_delay)
+        if not done:
+            futures.append(executor.submit(attempt))
+
+        # first successful attempt wins. the other one completes in the background
+        error = None
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                return future.result()
+            except nuclio_sdk.call_policy.call_errors as exc:
+                error = exc
+        raise error
+
+    @staticmethod
+    async def _hedge_async(attempt, hedge_delay):
+        if hedge_delay is None:
+            return await attempt()
+
+        tasks = [asyncio.ensure_future(attempt())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                tasks.append(asyncio.ensure_future(attempt()))
+
+            # first successful attempt wins
+            error = None
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    return await next_done
+                except nuclio_sdk.call_policy.call_errors as exc:
+                    error = exc
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _timed(attempt, latency_tracker):
+        started_at = time.monotonic()
+        result = attempt()
+        latency_tracker.record(time.monotonic() - started_at)
+        return result
+
+    @staticmethod
+    async def _timed_async(attempt, latency_tracker):
+        started_at = time.monotonic()
+        result = await attempt()
+        latency_tracker.record(time.monotonic() - started_at)
+        return result
+
+    def _get_circuit_breaker(self, url):
+        if not self._circuit_breaking:
+            return None
+        try:
+            return self._circuit_breakers[url]
+        except KeyError:
+            return self._circuit_breakers.setdefault(
+                url,
+                nuclio_sdk.call_policy.CircuitBreaker(
+                    url,
+                    failure_threshold=self._circuit_breaker_failure_threshold,
+                    reset_timeout=self._circuit_breaker_reset_timeout,
+                ),
+            )
+
+    def _get_latency_tracker(self, url):
+        try:
+            return self._latency_trackers[url]
+        except KeyError:
+            return self._latency_trackers.setdefault(
+                url, nuclio_sdk.call_policy.LatencyTracker()
+            )
+
+    def _get_hedging_executor(self):
+        if self._hedging_executor is None:
+            with self._connection_pools_lock:
+                if self._hedging_executor is None:
+                    self._hedging_executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.max_hedging_workers
+                    )
+        return self._hedging_executor
+
+    def _send_request(self, connection_pool, timeout, method, path, body, headers):
+        connection, reused = connection_pool.acquire()
+        try:
+            response, response_body = self._request(
+                connection, timeout, method, path, body, headers
+            )
+        except _stale_connection_errors as exc:
+            connection = self._reconnect_stale(connection_pool, reused, exc)
+            response, response_body = self._request(
+                connection, timeout, method, path, body, headers
+            )
+
+        self._release_connection(connection_pool, connection, response)
+        return response, response_body
+
+    async def _send_request_async(self, connection_pool, method, path, body, headers):
+        connection, reused = connection_pool.acquire()
+        try:
+            response = await self._request_async(
+                connection, method, path, body, headers
+            )
+        except _stale_connection_errors as exc:
+            connection = self._reconnect_stale(connection_pool, reused, exc)
+            response = await self._request_async(
+                connection, method, path, body, headers
+            )
+
+        self._release_connection(connection_pool, connection, response)
+        return response
+
+    @staticmethod
+    def _reconnect_stale(connection_pool, reused, exc):
+        if not reused:
+            raise exc
+
+        # the pooled connection was closed by the peer while idle, retry once on a new one
+        return connection_pool.connect()
+
+    @staticmethod
+    def _release_connection(connection_pool, connection, response):
+
+        # keep the connection for the next call, unless the peer is closing it
+        if response.will_close:
+            connection.close()
+        else:
+            connection_pool.release(connection)
+
+    @staticmethod
+    async def _request_async(connection, method, path, body, headers):
+        try:
+            return await connection.request(method, path, body=body, headers=headers)
+        except BaseException:
+            # including cancellation (e.g. timeout) - the connection state is unknown
+            connection.close()
+            raise
+
+    @staticmethod
+    def _request(connection, timeout, method, path, body, headers):
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+
+        try:
+            connection.request(method, path, body=body, headers=headers)
+
+            # get response from connection
+            response = connection.getresponse()
+
+            # read the body
+            return response, response.read()
+        except Exception:
+            connection.close()
+            raise
+
     def _get_function_url(self, function_name, service_name_override=None):
         # local envs prefix namespace
         if self.kind == "local":
@@ -146,11 +859,51 @@ class Platform(object):
     def _on_signal(self, callback_type="termination"):
         """
         When a signal is received, call the termination/drain callback as a hook before exiting
-        If not set, the callback will be a no-op
+        If not set, the callback will be a no-op. The signal hooks are called after the callback - for
+        an async callback, the returned coroutine calls them once the callback completes.
+        If the callback or any of the hooks returned an awaitable (e.g. the flush of pending explicit
+        acks), a coroutine awaiting them is returned, for the caller to await before exiting
 
         :arg callback_type:str - callback type, can be "termination" or "drain"
         """
+        result = None
         if callback_type == "termination" and self._termination_callback:
-            return self._termination_callback()
+            result = self._termination_callback()
         elif callback_type == "drain" and self._drain_callback:
-            return self._drain_callback()
+            result = self._drain_callback()
+
+        if inspect.isawaitable(result):
+            return self._call_signal_hooks_after(result, callback_type)
+
+        hook_results = self._call_signal_hooks(callback_type)
+        if hook_results:
+            return self._await_signal_hooks(result, hook_results)
+        return result
+
+    async def _call_signal_hooks_after(self, awaitable, callback_type):
+        try:
+            result = await awaitable
+        finally:
+            hook_results = self._call_signal_hooks(callback_type)
+        return await self._await_signal_hooks(result, hook_results)
+
+    @staticmethod
+    async def _await_signal_hooks(result, hook_results):
+        for hook_result in hook_results:
+            if isinstance(hook_result, concurrent.futures.Future):
+                hook_result = asyncio.wrap_future(hook_result)
+            await hook_result
+        return result
+
+    def _call_signal_hooks(self, callback_type):
+        """
+        :return: list of the awaitable results of the hooks
+        """
+        hook_results = []
+        for hook in self._signal_hooks.get(callback_type, []):
+            hook_result = hook()
+            if inspect.isawaitable(hook_result) or isinstance(
+                hook_result, concurrent.futures.Future
+            ):
+                hook_results.append(hook_result)
+        return hook_results
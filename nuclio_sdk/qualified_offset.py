@@ -12,12 +12,49 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
 
+# maximum number of topics to intern (topics resolved from event paths may be unbounded)
+max_interned_topics = 1024
+
+# topic -> topic (a single instance per topic)
+_topics = {}
+
+# sets attributes of the (otherwise immutable) QualifiedOffset
+_setattr = object.__setattr__
+
+
+@functools.total_ordering
 class QualifiedOffset(object):
+    """
+    An immutable (topic, partition, offset) value, hashable and ordered like the tuple
+    """
+
+    __slots__ = (
+        "topic",
+        "partition",
+        "offset",
+        # the ack message is compiled on first use (unset slot until then)
+        "_explicit_ack_message",
+    )
+
     def __init__(self, topic, partition, offset):
-        self.topic = topic
-        self.partition = partition
-        self.offset = offset
+        try:
+            topic = _topics[topic]
+        except (KeyError, TypeError):
+            topic = _intern_topic(topic)
+        _setattr(self, "topic", topic)
+        _setattr(self, "partition", partition)
+        _setattr(self, "offset", offset)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("QualifiedOffset is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("QualifiedOffset is immutable")
+
+    def __reduce__(self):
+        return QualifiedOffset, (self.topic, self.partition, self.offset)
 
     @staticmethod
     def from_event(event):
@@ -27,13 +64,68 @@ class QualifiedOffset(object):
 
     def compile_explicit_ack_message(self):
         """
-        Return a stream ack message with json of offset data
+        Return a stream ack message with json of offset data. The message is cached - don't modify it
         """
-        return {
-            "kind": "streamMessageAck",
-            "attributes": {
-                "topic": self.topic,
-                "partition": self.partition,
-                "offset": self.offset,
-            },
-        }
+        try:
+            return self._explicit_ack_message
+        except AttributeError:
+            explicit_ack_message = compile_explicit_ack_message(
+                self.topic, self.partition, self.offset
+            )
+            _setattr(self, "_explicit_ack_message", explicit_ack_message)
+            return explicit_ack_message
+
+    def __iter__(self):
+        return iter((self.topic, self.partition, self.offset))
+
+    def __eq__(self, other):
+        if not isinstance(other, QualifiedOffset):
+            return NotImplemented
+        return (self.topic, self.partition, self.offset) == (
+            other.topic,
+            other.partition,
+            other.offset,
+        )
+
+    def __lt__(self, other):
+        if not isinstance(other, QualifiedOffset):
+            return NotImplemented
+        return (self.topic, self.partition, self.offset) < (
+            other.topic,
+            other.partition,
+            other.offset,
+        )
+
+    def __hash__(self):
+        return hash((self.topic, self.partition, self.offset))
+
+    def __repr__(self):
+        return "QualifiedOffset(topic={0!r}, partition={1!r}, offset={2!r})".format(
+            self.topic, self.partition, self.offset
+        )
+
+
+def compile_explicit_ack_message(topic, partition, offset):
+    """
+    Return a stream ack message with json of offset data
+    """
+    return {
+        "kind": "streamMessageAck",
+        "attributes": {
+            "topic": topic,
+            "partition": partition,
+            "offset": offset,
+        },
+    }
+
+
+def _intern_topic(topic):
+    try:
+        return _topics[topic]
+    except KeyError:
+        if len(_topics) < max_interned_topics:
+            _topics[topic] = topic
+        return topic
+    except TypeError:
+        # unhashable, not interned
+        return topic
@@ -13,10 +13,18 @@
 # limitations under the License.
 
 import base64
-import json
+import collections.abc
 
+import nuclio_sdk.json_codec
+
+
+class _ResponseBase(object):
+    """
+    Behavior shared by Response and CompactResponse, which differ in how attributes are stored
+    """
+
+    __slots__ = ()
 
-class Response(object):
     def __init__(
         self, headers=None, body=None, content_type=None, status_code=200, event_id=None
     ):
@@ -30,7 +38,7 @@ class Response(object):
 
     def __repr__(self):
         cls = self.__class__.__name__
-        items = self.__dict__.items()
+        items = self._get_fields().items()
         args = ("{}={!r}".format(key, value) for key, value in items)
         return "{}({})".format(cls, ", ".join(args))
 
@@ -40,14 +48,62 @@ class Response(object):
         """
         self.headers["x-nuclio-stream-no-ack"] = True
 
+    def _get_fields(self):
+        raise NotImplementedError
+
+
+class CompactResponse(_ResponseBase):
+    """
+    Response without a per-instance __dict__, for handlers keeping many responses alive at once
+    """
+
+    __slots__ = ("headers", "body", "status_code", "content_type", "event_id")
+
+    def _get_fields(self):
+        return {field_name: getattr(self, field_name) for field_name in self.__slots__}
+
+
+class Response(_ResponseBase):
+
+    # size of the chunks read from file-like streamed bodies
+    stream_chunk_size = 64 * 1024
+
+    # how bytes bodies are carried in the response dict - "base64" (str) or "raw" (bytes, untouched),
+    # the latter suits binary framings (e.g. msgpack). can be set per function (e.g. in init_context)
+    binary_body_encoding = "base64"
+
+    def _get_fields(self):
+        return self.__dict__
+
     @staticmethod
-    def from_entrypoint_output(json_encoder, handler_output):
+    def from_entrypoint_output(
+        json_encoder, handler_output, binary_body_encoding=None, response=None
+    ):
         """
         Given a handler output's type, generates a response towards the
-        processor
+        processor.
+
+        binary_body_encoding overrides Response.binary_body_encoding for this response.
+
+        Bodies given as a (sync or async) iterator/generator or a file-like object are streamed: the
+        response body is then an iterator (async iterator, respectively) of chunk dicts, each with its
+        own "body" and "body_encoding", and the response "body_encoding" is "chunked". Streamed
+        file-like objects are read in stream_chunk_size pieces and closed once exhausted
+
+        response recycles a response dict (one returned previously) rather than allocating one per call. It
+        is reset and returned, so the caller must be done with it (i.e. have serialized it) beforehand
         """
 
-        response = Response.empty_response()
+        binary_body_encoding = binary_body_encoding or Response.binary_body_encoding
+        if binary_body_encoding not in _binary_body_encodings:
+            raise ValueError(
+                "Unsupported binary body encoding: {0}".format(binary_body_encoding)
+            )
+
+        if response is None:
+            response = Response.empty_response()
+        else:
+            Response.reset_response(response)
 
         # if the type of the output is a string, just return that and 200
         if isinstance(handler_output, str):
@@ -57,8 +113,9 @@ class Response(object):
         elif isinstance(handler_output, tuple) and len(handler_output) == 2:
             response["status_code"] = handler_output[0]
 
-            if isinstance(handler_output[1], str):
-                response["body"] = handler_output[1]
+            body = handler_output[1]
+            if isinstance(body, str) or Response._is_stream(body):
+                response["body"] = body
             else:
                 response["body"] = json_encoder(handler_output[1])
                 response["content_type"] = "application/json"
@@ -69,9 +126,9 @@ class Response(object):
             response["body"] = json_encoder(handler_output)
 
         # if it's a response object, populate the response
-        elif isinstance(handler_output, Response):
+        elif isinstance(handler_output, _ResponseBase):
             if isinstance(handler_output.body, dict):
-                response["body"] = json.dumps(handler_output.body)
+                response["body"] = nuclio_sdk.json_codec.dumps(handler_output.body)
                 response["content_type"] = "application/json"
             else:
                 response["body"] = handler_output.body
@@ -83,7 +140,10 @@ class Response(object):
         else:
             response["body"] = handler_output
 
-        Response._ensure_str_body(response)
+        if Response._is_stream(response["body"]):
+            Response._ensure_chunked_body(response, binary_body_encoding)
+        else:
+            Response._ensure_str_body(response, binary_body_encoding)
 
         return response
 
@@ -98,10 +158,79 @@ class Response(object):
         }
 
     @staticmethod
-    def _ensure_str_body(response):
-        if isinstance(response["body"], bytes):
+    def reset_response(response):
+        """
+        Reset a response dict to the state of empty_response, for reuse
+        """
+        if response.keys() != _empty_response_keys:
+            response.clear()
+        response["body"] = ""
+        response["content_type"] = "text/plain"
+        response["headers"] = {}
+        response["status_code"] = 200
+        response["body_encoding"] = "text"
+
+    @staticmethod
+    def _ensure_str_body(response, binary_body_encoding="base64"):
+        if isinstance(response["body"], (bytes, bytearray, memoryview)):
+            if binary_body_encoding == "raw":
+                response["body_encoding"] = "raw"
+                return
             response["body"] = base64.b64encode(response["body"]).decode("ascii")
             response["body_encoding"] = "base64"
 
         if response["body_encoding"] == "text":
             response["body"] = str(response["body"])
+
+    @staticmethod
+    def _is_stream(body):
+        return hasattr(body, "read") or isinstance(
+            body, (collections.abc.Iterator, collections.abc.AsyncIterator)
+        )
+
+    @staticmethod
+    def _ensure_chunked_body(response, binary_body_encoding="base64"):
+        body = response["body"]
+        if hasattr(body, "read"):
+            response["body"] = Response._encode_chunks(
+                Response._read_chunks(body, Response.stream_chunk_size),
+                binary_body_encoding,
+            )
+        elif isinstance(body, collections.abc.AsyncIterator):
+            response["body"] = Response._encode_async_chunks(body, binary_body_encoding)
+        else:
+            response["body"] = Response._encode_chunks(body, binary_body_encoding)
+        response["body_encoding"] = "chunked"
+
+    @staticmethod
+    def _read_chunks(file, chunk_size):
+        try:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            file.close()
+
+    @staticmethod
+    def _encode_chunks(chunks, binary_body_encoding):
+        for chunk in chunks:
+            yield Response._encode_chunk(chunk, binary_body_encoding)
+
+    @staticmethod
+    async def _encode_async_chunks(chunks, binary_body_encoding):
+        async for chunk in chunks:
+            yield Response._encode_chunk(chunk, binary_body_encoding)
+
+    @staticmethod
+    def _encode_chunk(chunk, binary_body_encoding):
+        encoded_chunk = {"body": chunk, "body_encoding": "text"}
+        Response._ensure_str_body(encoded_chunk, binary_body_encoding)
+        return encoded_chunk
+
+
+_empty_response_keys = frozenset(Response.empty_response())
+
+# values of Response.binary_body_encoding
+_binary_body_encodings = frozenset(("base64", "raw"))
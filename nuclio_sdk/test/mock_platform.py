@@ -18,6 +18,7 @@ import unittest.mock
 
 import nuclio_sdk
 import nuclio_sdk.helpers
+import nuclio_sdk.in_flight_registry
 
 
 class Platform(object):
@@ -29,6 +30,7 @@ class Platform(object):
 
         self._handler_contexts = {}
         self._call_function_mock = unittest.mock.MagicMock()
+        self._in_flight_registry = nuclio_sdk.in_flight_registry.InFlightRegistry()
         self._kind = "test"
 
         # for tests that need a context
@@ -46,12 +48,101 @@ class Platform(object):
         return handler(context, event)
 
     def call_function(
-        self, name, event, node=None, timeout=None, service_name_override=None
+        self,
+        name,
+        event,
+        node=None,
+        timeout=None,
+        service_name_override=None,
+        retry_policy=None,
+        hedge_percentile=None,
     ):
         return self._call_function_mock(
             name, event, node, timeout, service_name_override
         )
 
+    async def call_function_async(
+        self,
+        name,
+        event,
+        node=None,
+        timeout=None,
+        service_name_override=None,
+        retry_policy=None,
+        hedge_percentile=None,
+    ):
+        return self._call_function_mock(
+            name, event, node, timeout, service_name_override
+        )
+
+    def call_functions(self, calls, max_concurrency=16, timeout=None, **call_options):
+        results = []
+        for function_name, event in calls:
+            try:
+                results.append(
+                    self.call_function(
+                        function_name, event, timeout=timeout, **call_options
+                    )
+                )
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    def map_function(
+        self, function_name, events, max_concurrency=16, timeout=None, **call_options
+    ):
+        return self.call_functions(
+            [(function_name, event) for event in events],
+            max_concurrency=max_concurrency,
+            timeout=timeout,
+            **call_options
+        )
+
+    async def call_functions_async(
+        self, calls, max_concurrency=16, timeout=None, **call_options
+    ):
+        results = []
+        for function_name, event in calls:
+            try:
+                results.append(
+                    await self.call_function_async(
+                        function_name, event, timeout=timeout, **call_options
+                    )
+                )
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    async def map_function_async(
+        self, function_name, events, max_concurrency=16, timeout=None, **call_options
+    ):
+        return await self.call_functions_async(
+            [(function_name, event) for event in events],
+            max_concurrency=max_concurrency,
+            timeout=timeout,
+            **call_options
+        )
+
+    def track_event(self, event):
+        return self._in_flight_registry.track(event)
+
+    def get_in_flight_stats(self):
+        in_flight_stats = self._in_flight_registry.get_stats()
+        in_flight_stats["offsets_in_flight"] = 0
+        return in_flight_stats
+
+    async def drain(self, timeout=None, poll_interval=0.01):
+
+        # handlers called through the mock complete before returning, there is nothing to wait for
+        in_flight_stats = self.get_in_flight_stats()
+        in_flight_stats.update(
+            drained=in_flight_stats["in_flight"] == 0,
+            in_flight_at_start=in_flight_stats["in_flight"],
+            offsets_in_flight_at_start=0,
+            wait_duration=0,
+        )
+        return in_flight_stats
+
     def get_call_function_call_args(self, index):
         return self._call_function_mock.call_args_list[index][0]
 
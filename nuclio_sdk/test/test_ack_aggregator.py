@@ -0,0 +1,161 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+
+import nuclio_sdk
+import nuclio_sdk.ack_aggregator
+import nuclio_sdk.test
+
+
+class TestAckAggregator(nuclio_sdk.test.TestCase):
+    def setUp(self):
+        super(TestAckAggregator, self).setUp()
+        self._messages = []
+
+    def test_coalesce(self):
+        async def _ack():
+            ack_aggregator = self._create_ack_aggregator()
+            for partition, offsets in [(0, [3, 1, 5, 4]), (1, [10, 11])]:
+                for offset in offsets:
+                    await ack_aggregator.add(
+                        nuclio_sdk.QualifiedOffset("topic", partition, offset)
+                    )
+            self.assertEqual(ack_aggregator.num_pending_acks, 6)
+            await ack_aggregator.flush()
+            await ack_aggregator.flush()
+
+        asyncio.run(_ack())
+        self.assertEqual(
+            self._messages,
+            [
+                {
+                    "kind": "streamMessageAckBatch",
+                    "attributes": {
+                        "acks": [
+                            {"topic": "topic", "partition": 0, "offset": 5},
+                            {"topic": "topic", "partition": 1, "offset": 11},
+                        ]
+                    },
+                }
+            ],
+        )
+
+    def test_batch_size(self):
+        async def _ack():
+            ack_aggregator = self._create_ack_aggregator(max_batch_size=3)
+            for offset in range(7):
+                await ack_aggregator.add(nuclio_sdk.QualifiedOffset("topic", 0, offset))
+            return ack_aggregator.num_pending_acks
+
+        self.assertEqual(asyncio.run(_ack()), 1)
+        self.assertEqual(self._get_acked_offsets(), [[2], [5]])
+
+    def test_batch_delay(self):
+        async def _ack():
+            ack_aggregator = self._create_ack_aggregator(max_batch_delay=0.01)
+            await ack_aggregator.add(nuclio_sdk.QualifiedOffset("topic", 0, 1))
+            self.assertEqual(self._messages, [])
+            await asyncio.sleep(0.1)
+
+        asyncio.run(_ack())
+        self.assertEqual(self._get_acked_offsets(), [[1]])
+
+    def test_flush_soon_from_other_thread(self):
+        async def _ack():
+            ack_aggregator = self._create_ack_aggregator()
+            await ack_aggregator.add(nuclio_sdk.QualifiedOffset("topic", 0, 1))
+            thread = threading.Thread(target=ack_aggregator.flush_soon)
+            thread.start()
+            thread.join()
+            await asyncio.sleep(0.05)
+
+        asyncio.run(_ack())
+        self.assertEqual(self._get_acked_offsets(), [[1]])
+
+    def test_platform_explicit_ack(self):
+        async def _ack(platform):
+            for offset in range(3):
+                await platform.explicit_ack(
+                    nuclio_sdk.QualifiedOffset("topic", 0, offset)
+                )
+
+        # every ack is sent as is by default
+        asyncio.run(_ack(nuclio_sdk.Platform("test", on_control_callback=self._send)))
+        self.assertEqual(
+            [message["kind"] for message in self._messages], ["streamMessageAck"] * 3
+        )
+
+    def test_platform_explicit_ack_coalesced(self):
+        platform = nuclio_sdk.Platform(
+            "test",
+            on_control_callback=self._send,
+            explicit_ack_batch_size=100,
+            explicit_ack_batch_delay=60,
+        )
+
+        async def _ack_and_drain():
+            for offset in range(3):
+                await platform.explicit_ack(
+                    nuclio_sdk.QualifiedOffset("topic", 0, offset)
+                )
+            self.assertEqual(self._messages, [])
+
+            # acks are sent by the time termination signal handling completes
+            await platform._on_signal(callback_type="termination")
+            self.assertEqual(self._get_acked_offsets(), [[2]])
+
+        asyncio.run(_ack_and_drain())
+
+    def test_failed_send_keeps_acks_pending(self):
+        errors = []
+
+        async def _send(message):
+            if not errors:
+                raise ConnectionError("channel closed")
+            self._messages.append(message)
+
+        async def _ack():
+            asyncio.get_running_loop().set_exception_handler(
+                lambda loop, context: errors.append(context["exception"])
+            )
+            ack_aggregator = nuclio_sdk.ack_aggregator.AckAggregator(_send)
+            await ack_aggregator.add(nuclio_sdk.QualifiedOffset("topic", 0, 1))
+
+            # the failure is reported rather than lost in an unretrieved task
+            with self.assertRaises(ConnectionError):
+                await ack_aggregator.flush_soon()
+            self.assertIsInstance(errors[0], ConnectionError)
+
+            await ack_aggregator.add(nuclio_sdk.QualifiedOffset("topic", 1, 5))
+            self.assertEqual(ack_aggregator.num_pending_acks, 2)
+            await ack_aggregator.flush()
+
+        asyncio.run(_ack())
+        self.assertEqual(self._get_acked_offsets(), [[1, 5]])
+
+    def _create_ack_aggregator(self, max_batch_size=100, max_batch_delay=60):
+        return nuclio_sdk.ack_aggregator.AckAggregator(
+            self._send, max_batch_size=max_batch_size, max_batch_delay=max_batch_delay
+        )
+
+    async def _send(self, message):
+        self._messages.append(message)
+
+    def _get_acked_offsets(self):
+        return [
+            [ack["offset"] for ack in message["attributes"]["acks"]]
+            for message in self._messages
+        ]
@@ -0,0 +1,89 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import contextlib
+import http.client
+
+import nuclio_sdk.async_connection
+import nuclio_sdk.call_policy
+import nuclio_sdk.test
+
+
+class TestAsyncConnection(nuclio_sdk.test.TestCase):
+    def test_invalid_request(self):
+        async def _request(requests, path="/", headers=None):
+            response = b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n"
+            async with self._serve(response, requests) as connection:
+                try:
+                    await connection.request("POST", path, b"", headers)
+                finally:
+                    connection.close()
+
+        requests = []
+        for path, headers in [
+            ("/", {"X-A": "v\r\nX-Injected: 1"}),
+            ("/", {"X-A\r\nX-Injected": "1"}),
+            ("/", {"X-A:": "v"}),
+            ("/ HTTP/1.1\r\nX-Injected: 1\r\n", None),
+        ]:
+            with self.assertRaises(ValueError):
+                asyncio.run(_request(requests, path, headers))
+
+        # nothing was sent
+        self.assertEqual(requests, [])
+        asyncio.run(_request(requests, headers={"X-A": "v"}))
+        self.assertEqual(requests, [b"POST"])
+
+    def test_incomplete_body(self):
+        async def _request():
+            response = b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\npartial"
+            async with self._serve(response, []) as connection:
+                try:
+                    await connection.request("POST", "/", b"")
+                finally:
+                    connection.close()
+
+        with self.assertRaises(http.client.IncompleteRead) as context:
+            asyncio.run(_request())
+        self.assertEqual(context.exception.partial, b"partial")
+        self.assertIsInstance(context.exception, nuclio_sdk.call_policy.call_errors)
+
+    @staticmethod
+    @contextlib.asynccontextmanager
+    async def _serve(response, requests):
+        """
+        Serve connections, responding to each with the given bytes and closing it. The method of each
+        request received is appended to requests
+
+        :return: a connection to the server
+        """
+
+        async def _handle(reader, writer):
+            request_line = await reader.readline()
+            if request_line:
+                requests.append(request_line.split()[0])
+                writer.write(response)
+                await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(_handle, "127.0.0.1", 0)
+        try:
+            port = server.sockets[0].getsockname()[1]
+            yield nuclio_sdk.async_connection.AsyncConnection(
+                "127.0.0.1:{0}".format(port)
+            )
+        finally:
+            server.close()
+            await server.wait_closed()
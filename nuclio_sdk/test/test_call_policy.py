@@ -0,0 +1,149 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+import nuclio_sdk
+import nuclio_sdk.call_policy
+import nuclio_sdk.test
+
+
+class TestRetryPolicy(nuclio_sdk.test.TestCase):
+    def test_get_delay(self):
+        retry_policy = nuclio_sdk.RetryPolicy(backoff=0.1, max_backoff=0.3)
+        for attempt, max_delay in [(0, 0.1), (1, 0.2), (2, 0.3), (10, 0.3)]:
+            delay = retry_policy.get_delay(attempt)
+            self.assertGreaterEqual(delay, max_delay / 2)
+            self.assertLessEqual(delay, max_delay)
+
+
+class TestCircuitBreaker(nuclio_sdk.test.TestCase):
+    def setUp(self):
+        super(TestCircuitBreaker, self).setUp()
+        self._circuit_breaker = nuclio_sdk.call_policy.CircuitBreaker(
+            "target", failure_threshold=2, reset_timeout=0.05
+        )
+
+    def test_opens_on_consecutive_failures(self):
+        self._circuit_breaker.record_failure()
+        self._circuit_breaker.record_success()
+        self._circuit_breaker.record_failure()
+        self._circuit_breaker.check()
+
+        self._circuit_breaker.record_failure()
+        with self.assertRaises(nuclio_sdk.CircuitOpenError) as context:
+            self._circuit_breaker.check()
+        self.assertEqual(context.exception.target, "target")
+
+    def test_half_open_probe(self):
+        self._open()
+        time.sleep(0.06)
+
+        # a single probe is let through
+        self._circuit_breaker.check()
+        self.assertEqual(self._circuit_breaker.state, "half_open")
+        with self.assertRaises(nuclio_sdk.CircuitOpenError):
+            self._circuit_breaker.check()
+
+        # probe succeeded
+        self._circuit_breaker.record_success()
+        self.assertEqual(self._circuit_breaker.state, "closed")
+        self._circuit_breaker.check()
+
+    def test_half_open_probe_failed(self):
+        self._open()
+        time.sleep(0.06)
+        self._circuit_breaker.check()
+        self._circuit_breaker.record_failure()
+        self.assertEqual(self._circuit_breaker.state, "open")
+        with self.assertRaises(nuclio_sdk.CircuitOpenError):
+            self._circuit_breaker.check()
+
+    def test_half_open_probe_lost(self):
+        self._open()
+        time.sleep(0.06)
+        self._circuit_breaker.check()
+
+        # the probe's outcome was never recorded
+        with self.assertRaises(nuclio_sdk.CircuitOpenError):
+            self._circuit_breaker.check()
+        time.sleep(0.06)
+        self._circuit_breaker.check()
+        self.assertEqual(self._circuit_breaker.state, "half_open")
+
+    def test_half_open_probe_released(self):
+        self._open()
+        time.sleep(0.06)
+        self._circuit_breaker.check()
+        self._circuit_breaker.release_probe()
+        self._circuit_breaker.check()
+        self.assertEqual(self._circuit_breaker.state, "half_open")
+
+    def _open(self):
+        for _ in range(2):
+            self._circuit_breaker.record_failure()
+        self.assertEqual(self._circuit_breaker.state, "open")
+
+
+class TestCallAttempts(nuclio_sdk.test.TestCase):
+    def test_record(self):
+        circuit_breaker = nuclio_sdk.call_policy.CircuitBreaker(
+            "target", failure_threshold=2
+        )
+        call_attempts = nuclio_sdk.call_policy.CallAttempts(
+            nuclio_sdk.RetryPolicy(max_attempts=2), circuit_breaker
+        )
+        self.assertEqual(call_attempts.max_attempts, 2)
+
+        # retried until the last attempt
+        self.assertTrue(call_attempts.record_status(503, 0))
+        self.assertFalse(call_attempts.record_status(503, 1))
+        self.assertEqual(circuit_breaker.state, "open")
+        circuit_breaker.record_success()
+
+        self.assertTrue(call_attempts.record_error(ConnectionResetError(), 0))
+        self.assertFalse(call_attempts.record_error(ConnectionResetError(), 1))
+        self.assertFalse(call_attempts.record_error(RuntimeError(), 0))
+        self.assertEqual(circuit_breaker.state, "open")
+        circuit_breaker.record_success()
+
+        # client errors are neither retried nor counted
+        self.assertFalse(call_attempts.record_error(ValueError(), 0))
+        self.assertFalse(call_attempts.record_status(400, 0))
+        self.assertEqual(circuit_breaker.state, "closed")
+
+    def test_no_policies(self):
+        call_attempts = nuclio_sdk.call_policy.CallAttempts()
+        self.assertEqual(call_attempts.max_attempts, 1)
+        call_attempts.check()
+        self.assertFalse(call_attempts.record_status(503, 0))
+        self.assertFalse(call_attempts.record_error(ConnectionResetError(), 0))
+
+
+class TestLatencyTracker(nuclio_sdk.test.TestCase):
+    def test_get_percentile(self):
+        latency_tracker = nuclio_sdk.call_policy.LatencyTracker(
+            window_size=100, min_samples=10
+        )
+        for latency in range(9):
+            latency_tracker.record(latency)
+        self.assertIsNone(latency_tracker.get_percentile(50))
+
+        for latency in range(9, 200):
+            latency_tracker.record(latency)
+
+        # only the most recent window is kept
+        self.assertEqual(latency_tracker.get_percentile(0), 100)
+        self.assertEqual(latency_tracker.get_percentile(50), 150)
+        self.assertEqual(latency_tracker.get_percentile(100), 199)
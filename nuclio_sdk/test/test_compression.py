@@ -0,0 +1,47 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import nuclio_sdk.compression
+import nuclio_sdk.test
+
+
+class TestCompression(nuclio_sdk.test.TestCase):
+    def test_round_trip(self):
+        data = b'{"key": "value"}' * 100
+        for encoding in nuclio_sdk.compression.get_encodings():
+            compressed = nuclio_sdk.compression.compress(encoding, data)
+            self.assertLess(len(compressed), len(data))
+            self.assertEqual(
+                nuclio_sdk.compression.decompress(encoding, compressed), data
+            )
+
+    def test_accept_encoding(self):
+        self.assertIn("gzip", nuclio_sdk.compression.accept_encoding)
+        self.assertIn("deflate", nuclio_sdk.compression.accept_encoding)
+
+    def test_decompress_header_value(self):
+        compressed = nuclio_sdk.compression.compress("gzip", b"data")
+        self.assertEqual(
+            nuclio_sdk.compression.decompress(" GZIP ", compressed), b"data"
+        )
+
+    def test_decompress_identity(self):
+        self.assertEqual(
+            nuclio_sdk.compression.decompress("identity", b"data"), b"data"
+        )
+        self.assertEqual(nuclio_sdk.compression.decompress("br", b"data"), b"data")
+
+    def test_compress_unsupported(self):
+        with self.assertRaises(ValueError):
+            nuclio_sdk.compression.compress("br", b"data")
@@ -13,6 +13,7 @@
 # limitations under the License.
 import datetime
 import json
+import pickle
 
 import nuclio_sdk.test
 import nuclio_sdk.helpers
@@ -20,6 +21,22 @@ import nuclio_sdk.json_encoder
 
 
 class TestEvent:
+    def test_pickle(self):
+        event = self._deserialize_event(
+            nuclio_sdk.Event(
+                body="body",
+                trigger=nuclio_sdk.TriggerInfo(kind="http", name="my-http-trigger"),
+                headers={"Header": "value"},
+                offset=10,
+            )
+        )
+        event.body
+        unpickled_event = pickle.loads(pickle.dumps(event))
+        self.assertEqual(unpickled_event.body, event.body)
+        self.assertEqual(unpickled_event.offset, 10)
+        self.assertEqual(unpickled_event.trigger.name, "my-http-trigger")
+        self.assertEqual(unpickled_event.get_header("header"), "value")
+
     def test_event_to_json_bytes_body(self):
         event = nuclio_sdk.Event(
             body=b"bytes-body",
@@ -92,6 +109,59 @@ class TestEvent:
         self.assertEqual(request_body, serialized_event.body)
         self.assertEqual(topic, serialized_event.topic)
 
+    def test_get_header(self):
+        event = nuclio_sdk.Event(headers={"Content-Type": "text/plain", "X-Key": "v"})
+        serialized_event = self._deserialize_event(event)
+        self.assertEqual(serialized_event.get_header("content-type"), "text/plain")
+        self.assertEqual(serialized_event.get_header("X-KEY"), "v")
+        self.assertEqual(serialized_event.get_header(b"x-key"), "v")
+        self.assertIsNone(serialized_event.get_header("missing"))
+        self.assertEqual(
+            serialized_event.headers_ci, {"content-type": "text/plain", "x-key": "v"}
+        )
+
+    def test_get_header_after_change(self):
+        event = nuclio_sdk.Event(headers={"X-Key": "a"})
+        self.assertEqual(event.get_header("x-key"), "a")
+
+        # overwritten in place
+        event.headers["X-Key"] = "b"
+        self.assertEqual(event.get_header("x-key"), "b")
+        self.assertEqual(event.headers_ci, {"x-key": "b"})
+
+        # removed and another one added (same size)
+        del event.headers["X-Key"]
+        event.headers["X-Other"] = "other"
+        self.assertIsNone(event.get_header("x-key"))
+        self.assertEqual(event.get_header("x-other"), "other")
+
+        # re-added with another case
+        event.headers["x-KEY"] = "c"
+        self.assertEqual(event.get_header("X-Key"), "c")
+
+        event.headers = {"X-Key": "new"}
+        self.assertEqual(event.get_header("x-key"), "new")
+
+    def test_header_index_reused(self):
+        event = nuclio_sdk.Event(headers={"X-Key": "v"})
+        headers_ci = event.headers_ci
+        self.assertIs(event.headers_ci, headers_ci)
+        self.assertEqual(headers_ci["X-KEY"], "v")
+        self.assertIn(b"x-key", headers_ci)
+
+        # misses do not rebuild the index
+        headers_index = event._headers_index
+        self.assertIsNone(event.get_header("missing"))
+        self.assertIs(event._headers_index, headers_index)
+
+        # values are read live
+        event.headers["X-Key"] = "other"
+        self.assertEqual(headers_ci["x-key"], "other")
+        self.assertIs(event.headers_ci, headers_ci)
+
+        event.headers["X-Added"] = "added"
+        self.assertEqual(event.headers_ci, {"x-key": "other", "x-added": "added"})
+
     def test_print_event(self):
         """
         Test that printing an event doesn't raise an exception
@@ -103,33 +173,28 @@ class TestEvent:
         raise NotImplementedError
 
 
-class TestEventMsgPack(nuclio_sdk.test.TestCase, TestEvent):
-    def _deserialize_event(self, event):
-        if isinstance(event, list):
-            event_json = [
-                {k: v for k, v in json.loads(item.to_json()).items()} for item in event
-            ]
-        else:
-            event_json = {k: v for k, v in json.loads(event.to_json()).items()}
-        return nuclio_sdk.event.Event.deserialize(
-            event_json, nuclio_sdk.event.EventDeserializerKinds.msgpack
-        )
+class _TestEventMsgPack(TestEvent):
+    """
+    TestEvent over the msgpack deserializer kind of the test class
+    """
+
+    _deserializer_kind = None
 
+    # whether the kind deserializes raw messages (bytes keys)
+    _raw = False
 
-class TestEventMsgPackRaw(nuclio_sdk.test.TestCase, TestEvent):
     def _deserialize_event(self, event):
         if isinstance(event, list):
-            event_json = [
-                {k: v for k, v in json.loads(item.to_json()).items()} for item in event
-            ]
-            for item in event_json:
-                self._event_keys_to_byte_string(item)
+            event_json = [self._compile_event_message(item) for item in event]
         else:
-            event_json = {k: v for k, v in json.loads(event.to_json()).items()}
+            event_json = self._compile_event_message(event)
+        return nuclio_sdk.event.Event.deserialize(event_json, self._deserializer_kind)
+
+    def _compile_event_message(self, event):
+        event_json = json.loads(event.to_json())
+        if self._raw:
             self._event_keys_to_byte_string(event_json)
-        return nuclio_sdk.event.Event.deserialize(
-            event_json, nuclio_sdk.event.EventDeserializerKinds.msgpack_raw
-        )
+        return event_json
 
     def _event_keys_to_byte_string(self, d):
         for k, v in list(d.items()):
@@ -140,6 +205,293 @@ class TestEventMsgPackRaw(nuclio_sdk.test.TestCase, TestEvent):
                 self._event_keys_to_byte_string(v)
 
 
+class TestEventMsgPack(nuclio_sdk.test.TestCase, _TestEventMsgPack):
+    _deserializer_kind = nuclio_sdk.event.EventDeserializerKinds.msgpack
+
+
+class TestEventMsgPackRaw(nuclio_sdk.test.TestCase, _TestEventMsgPack):
+    _deserializer_kind = nuclio_sdk.event.EventDeserializerKinds.msgpack_raw
+    _raw = True
+
+    def test_body_from_bytes(self):
+        event_json = json.loads(nuclio_sdk.Event().to_json())
+        self._event_keys_to_byte_string(event_json)
+        kinds = nuclio_sdk.event.EventDeserializerKinds
+        for kind in [
+            kinds.msgpack_raw,
+            kinds.msgpack_raw_lazy,
+            kinds.msgpack_raw_compiled,
+            kinds.msgpack_raw_recycled,
+        ]:
+            with self.subTest(kind=kind.name):
+                # json bodies are parsed from the bytes, other bodies are kept as bytes
+                event_json[b"body"] = b'{"key": "value"}'
+                event_json[b"content_type"] = b"application/json"
+                event = nuclio_sdk.Event.deserialize(event_json, kind)
+                self.assertEqual(event.body, {"key": "value"})
+
+                event_json[b"body"] = b"\x80binary-body"
+                event_json[b"content_type"] = b"application/octet-stream"
+                event = nuclio_sdk.Event.deserialize(event_json, kind)
+                self.assertEqual(event.body, b"\x80binary-body")
+
+
+class TestEventMsgPackLazy(nuclio_sdk.test.TestCase, _TestEventMsgPack):
+    _deserializer_kind = nuclio_sdk.event.EventDeserializerKinds.msgpack_lazy
+
+    def test_attributes_resolved_on_access(self):
+        event_json = json.loads(
+            nuclio_sdk.Event(
+                content_type="application/json",
+                headers={"Header": "value"},
+            ).to_json()
+        )
+        event_json["body"] = b'{"key": "value"}'
+        event_json["timestamp"] = 1640995200
+        event = nuclio_sdk.event.Event.deserialize(event_json, self._deserializer_kind)
+        self.assertIsInstance(event, nuclio_sdk.Event)
+        self.assertNotIn("body", vars(event))
+        self.assertNotIn("timestamp", vars(event))
+
+        self.assertEqual(event.body, {"key": "value"})
+        self.assertEqual(event.get_header("header"), "value")
+        self.assertIn("body", vars(event))
+        self.assertIn("headers", vars(event))
+        self.assertNotIn("timestamp", vars(event))
+
+        self.assertEqual(event.timestamp, datetime.datetime(2022, 1, 1))
+        self.assertIs(event.timestamp, event.timestamp)
+
+        # pickles lazily, keeping the attributes resolved so far
+        unpickled_event = pickle.loads(pickle.dumps(event))
+        self.assertIn("timestamp", vars(unpickled_event))
+        self.assertNotIn("id", vars(unpickled_event))
+        self.assertEqual(unpickled_event.to_json(), event.to_json())
+
+        # attributes can still be overridden
+        event.path = "/other"
+        self.assertEqual(event.path, "/other")
+        self.assertEqual(json.loads(event.to_json())["path"], "/other")
+
+        with self.assertRaises(AttributeError):
+            event.not_an_attribute
+
+
+class TestEventMsgPackRawLazy(TestEventMsgPackRaw):
+    _deserializer_kind = nuclio_sdk.event.EventDeserializerKinds.msgpack_raw_lazy
+
+
+class TestEventMsgPackColumnar(nuclio_sdk.test.TestCase, _TestEventMsgPack):
+    _deserializer_kind = nuclio_sdk.event.EventDeserializerKinds.msgpack_columnar
+
+    def test_batch_columns(self):
+        event_batch = []
+        for index in range(3):
+            event_json = json.loads(
+                nuclio_sdk.Event(_id=str(index), offset=index * 10).to_json()
+            )
+            event_json.update(body=b"body-%d" % index, shard_id=index, timestamp=index)
+            event_batch.append(event_json)
+
+        batch = nuclio_sdk.event.Event.deserialize(
+            event_batch, nuclio_sdk.event.EventDeserializerKinds.msgpack_columnar
+        )
+        self.assertIsInstance(batch, nuclio_sdk.event.EventBatch)
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch.ids, ["0", "1", "2"])
+        self.assertEqual(list(batch.offsets), [0, 10, 20])
+        self.assertEqual(list(batch.shard_ids), [0, 1, 2])
+        self.assertEqual(list(batch.timestamps), [0.0, 1.0, 2.0])
+        self.assertEqual(batch.bodies, [b"body-0", b"body-1", b"body-2"])
+
+        # events are built on access, and then cached
+        self.assertEqual(batch._events, [None, None, None])
+        self.assertEqual(batch[1].offset, 10)
+        self.assertIs(batch[1], batch[1])
+        self.assertIsNone(batch._events[0])
+        self.assertEqual([event.id for event in batch], ["0", "1", "2"])
+        self.assertEqual([event.id for event in batch[1:]], ["1", "2"])
+        self.assertEqual(batch[2].timestamp, datetime.datetime.utcfromtimestamp(2))
+
+        unpickled_batch = pickle.loads(pickle.dumps(batch))
+        self.assertEqual(list(unpickled_batch.offsets), [0, 10, 20])
+        self.assertEqual([event.id for event in unpickled_batch], ["0", "1", "2"])
+
+
+class TestEventMsgPackCompiled(nuclio_sdk.test.TestCase, _TestEventMsgPack):
+    _deserializer_kind = nuclio_sdk.event.EventDeserializerKinds.msgpack_compiled
+
+    def test_decoder_per_shape(self):
+        kind = self._deserializer_kind
+        decoders = kind.value._event_decoder._decoders
+        decoders.clear()
+
+        event_json = json.loads(nuclio_sdk.Event(offset=3, topic="topic").to_json())
+        event_json["timestamp"] = 0
+        self.assertEqual(nuclio_sdk.Event.deserialize(event_json, kind).offset, 3)
+        self.assertEqual(nuclio_sdk.Event.deserialize(event_json, kind).topic, "topic")
+        self.assertEqual(len(decoders), 1)
+
+        # a message without the optional keys gets its own decoder
+        del event_json["offset"]
+        del event_json["topic"]
+        event = nuclio_sdk.Event.deserialize(event_json, kind)
+        self.assertEqual(event.offset, 0)
+        self.assertIsNone(event.topic)
+        self.assertEqual(len(decoders), 2)
+
+        # missing mandatory keys fail like the non compiled deserializer
+        del event_json["body"]
+        with self.assertRaises(KeyError):
+            nuclio_sdk.Event.deserialize(event_json, kind)
+
+
+class TestEventMsgPackRawCompiled(TestEventMsgPackRaw):
+    _deserializer_kind = nuclio_sdk.event.EventDeserializerKinds.msgpack_raw_compiled
+
+    def test_same_as_non_compiled(self):
+        event_json = json.loads(
+            nuclio_sdk.Event(
+                body="body", headers={"Header": "value"}, offset=7, shard_id=2
+            ).to_json()
+        )
+        event_json["timestamp"] = 1640995200
+        self._event_keys_to_byte_string(event_json)
+        compiled_event, event = [
+            nuclio_sdk.Event.deserialize(event_json, kind)
+            for kind in [
+                nuclio_sdk.event.EventDeserializerKinds.msgpack_raw_compiled,
+                nuclio_sdk.event.EventDeserializerKinds.msgpack_raw,
+            ]
+        ]
+        self.assertEqual(
+            vars(compiled_event.trigger),
+            vars(event.trigger),
+        )
+        compiled_event.trigger = event.trigger
+        self.assertEqual(vars(compiled_event), vars(event))
+        self.assertEqual(list(vars(compiled_event)), list(vars(event)))
+
+
+class TestEventMsgPackRawRecycled(TestEventMsgPackRaw):
+    _deserializer_kind = nuclio_sdk.event.EventDeserializerKinds.msgpack_raw_recycled
+
+    def test_event_recycled(self):
+        first_event = self._deserialize_event(
+            nuclio_sdk.Event(
+                body="first", headers={"X-Key": "first"}, offset=1, topic="topic"
+            )
+        )
+        self.assertEqual(first_event.get_header("x-key"), "first")
+        first_trigger = first_event.trigger
+
+        second_event = self._deserialize_event(
+            nuclio_sdk.Event(
+                body="second",
+                headers={"X-Key": "second"},
+                trigger=nuclio_sdk.TriggerInfo(kind="http", name="my-http-trigger"),
+            )
+        )
+        self.assertIs(second_event, first_event)
+        self.assertIs(second_event.trigger, first_trigger)
+        self.assertEqual(second_event.body, "second")
+        self.assertEqual(second_event.get_header("x-key"), "second")
+        self.assertEqual(second_event.offset, 0)
+        self.assertIsNone(second_event.topic)
+        self.assertEqual(
+            vars(second_event.trigger), {"kind": "http", "name": "my-http-trigger"}
+        )
+
+    def test_batch_recycled(self):
+        batch = self._deserialize_event(
+            [nuclio_sdk.Event(body=str(index)) for index in range(3)]
+        )
+        events = list(batch)
+
+        # smaller batches reuse the first pooled events (and the same list)
+        smaller_batch = self._deserialize_event(
+            [nuclio_sdk.Event(body="smaller-{0}".format(index)) for index in range(2)]
+        )
+        self.assertIs(smaller_batch, batch)
+        self.assertEqual(len(smaller_batch), 2)
+        self.assertIs(smaller_batch[1], events[1])
+        self.assertEqual(
+            [event.body for event in smaller_batch], ["smaller-0", "smaller-1"]
+        )
+
+        # single events reuse the first one
+        self.assertIs(self._deserialize_event(nuclio_sdk.Event()), events[0])
+
+    def test_same_as_non_recycled(self):
+        event_json = json.loads(
+            nuclio_sdk.Event(
+                body="body", headers={"Header": "value"}, offset=7, shard_id=2
+            ).to_json()
+        )
+        event_json["timestamp"] = 1640995200
+        self._event_keys_to_byte_string(event_json)
+        recycled_event, event = [
+            nuclio_sdk.Event.deserialize(event_json, kind)
+            for kind in [
+                nuclio_sdk.event.EventDeserializerKinds.msgpack_raw_recycled,
+                nuclio_sdk.event.EventDeserializerKinds.msgpack_raw,
+            ]
+        ]
+        self.assertEqual(vars(recycled_event.trigger), vars(event.trigger))
+        recycled_event.trigger = event.trigger
+        self.assertEqual(
+            recycled_event._get_public_fields(), event._get_public_fields()
+        )
+
+
+class TestCompactEvent(nuclio_sdk.test.TestCase):
+    _event_keys_to_byte_string = TestEventMsgPackRaw._event_keys_to_byte_string
+
+    def test_to_json(self):
+        event = nuclio_sdk.CompactEvent(
+            body=b"bytes-body",
+            headers={"Header": "value"},
+            trigger=nuclio_sdk.CompactTriggerInfo(kind="http", name="my-http-trigger"),
+            timestamp=datetime.datetime(2022, 1, 1),
+        )
+        self.assertFalse(hasattr(event, "__dict__"))
+        self.assertFalse(hasattr(event.trigger, "__dict__"))
+        self.assertEqual(
+            json.loads(event.to_json()), json.loads(self._to_event(event).to_json())
+        )
+        self.assertEqual(repr(event), event.to_json())
+        self.assertEqual(event.get_header("header"), "value")
+
+    def test_defaults(self):
+        event = nuclio_sdk.CompactEvent()
+        self.assertIsInstance(event.trigger, nuclio_sdk.CompactTriggerInfo)
+        self.assertEqual(event.path, "/")
+        self.assertIsNone(event.get_header("header"))
+
+    def test_deserialize(self):
+        event_json = json.loads(nuclio_sdk.Event(body="body", offset=5).to_json())
+        event = nuclio_sdk.Event.deserialize(
+            event_json, nuclio_sdk.EventDeserializerKinds.msgpack_compact
+        )
+        self.assertIsInstance(event, nuclio_sdk.CompactEvent)
+        self.assertIsInstance(event.trigger, nuclio_sdk.CompactTriggerInfo)
+        self.assertEqual(event.body, "body")
+        self.assertEqual(event.offset, 5)
+
+        self._event_keys_to_byte_string(event_json)
+        event = nuclio_sdk.Event.deserialize(
+            event_json, nuclio_sdk.EventDeserializerKinds.msgpack_raw_compact
+        )
+        self.assertIsInstance(event, nuclio_sdk.CompactEvent)
+        self.assertEqual(event.offset, 5)
+
+    def _to_event(self, compact_event):
+        event = nuclio_sdk.Event()
+        for field_name in compact_event._get_public_fields():
+            setattr(event, field_name, getattr(compact_event, field_name))
+        return event
+
+
 class TestEventJson(nuclio_sdk.test.TestCase, TestEvent):
     def _deserialize_event(self, event):
         if isinstance(event, list):
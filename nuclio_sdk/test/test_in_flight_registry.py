@@ -0,0 +1,153 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+
+import nuclio_sdk
+import nuclio_sdk.in_flight_registry
+import nuclio_sdk.test
+
+
+class TestInFlightRegistry(nuclio_sdk.test.TestCase):
+    def test_track(self):
+        in_flight_registry = nuclio_sdk.in_flight_registry.InFlightRegistry()
+        first_event = nuclio_sdk.Event(body="first")
+        second_event = nuclio_sdk.Event(body="second")
+
+        with in_flight_registry.track(first_event):
+            token = in_flight_registry.register(second_event)
+            self.assertEqual(
+                in_flight_registry.get_events(), [first_event, second_event]
+            )
+            self.assertEqual(in_flight_registry.get_stats()["in_flight"], 2)
+
+        in_flight_registry.unregister(token)
+        in_flight_stats = in_flight_registry.get_stats()
+        self.assertEqual(len(in_flight_registry), 0)
+        self.assertEqual(in_flight_stats["in_flight"], 0)
+        self.assertEqual(in_flight_stats["oldest_age"], 0)
+        self.assertEqual(in_flight_stats["completed"], 2)
+
+    def test_unregistered_on_error(self):
+        in_flight_registry = nuclio_sdk.in_flight_registry.InFlightRegistry()
+        with self.assertRaises(RuntimeError):
+            with in_flight_registry.track(nuclio_sdk.Event()):
+                raise RuntimeError("handler failed")
+        self.assertEqual(len(in_flight_registry), 0)
+
+    def test_mock_platform(self):
+        def _handler(context, event):
+            with context.track_event(event):
+                in_flight_stats = context.platform.get_in_flight_stats()
+                self.assertEqual(in_flight_stats["in_flight"], 1)
+            return "done"
+
+        self.assertEqual(
+            self._platform.call_handler(_handler, nuclio_sdk.Event()), "done"
+        )
+        in_flight_stats = asyncio.run(self._platform.drain(timeout=1))
+        self.assertTrue(in_flight_stats["drained"])
+        self.assertEqual(in_flight_stats["completed"], 1)
+
+
+class TestPlatformDrain(nuclio_sdk.test.TestCase):
+    def setUp(self):
+        super(TestPlatformDrain, self).setUp()
+        self._messages = []
+        self._platform = nuclio_sdk.Platform(
+            "test",
+            on_control_callback=self._send,
+            explicit_ack_batch_size=100,
+            explicit_ack_batch_delay=60,
+        )
+
+    def test_drain_waits_for_events(self):
+        event_done = threading.Event()
+
+        def _handle(event):
+            with self._platform.track_event(event):
+                event_done.wait()
+
+        thread = threading.Thread(target=_handle, args=(nuclio_sdk.Event(),))
+        thread.start()
+
+        async def _drain():
+            drain_task = asyncio.ensure_future(self._platform.drain(timeout=5))
+            await asyncio.sleep(0.05)
+            self.assertFalse(drain_task.done())
+            event_done.set()
+            return await drain_task
+
+        in_flight_stats = asyncio.run(_drain())
+        thread.join()
+        self.assertTrue(in_flight_stats["drained"])
+        self.assertEqual(in_flight_stats["in_flight_at_start"], 1)
+        self.assertEqual(in_flight_stats["in_flight"], 0)
+        self.assertEqual(in_flight_stats["completed"], 1)
+
+    def test_drain_timeout(self):
+        async def _drain():
+            with self._platform.track_event(nuclio_sdk.Event()):
+                return await self._platform.drain(timeout=0.05)
+
+        in_flight_stats = asyncio.run(_drain())
+        self.assertFalse(in_flight_stats["drained"])
+        self.assertEqual(in_flight_stats["in_flight"], 1)
+        self.assertGreaterEqual(in_flight_stats["wait_duration"], 0.05)
+
+    def test_drain_waits_for_offsets_and_flushes_acks(self):
+        qualified_offsets = [
+            nuclio_sdk.QualifiedOffset("topic", 0, offset) for offset in range(3)
+        ]
+
+        async def _handle(qualified_offset, delay):
+            await asyncio.sleep(delay)
+            await self._platform.complete_offset(qualified_offset)
+
+        async def _drain():
+            for qualified_offset in qualified_offsets:
+                self._platform.track_offset(qualified_offset)
+            handle_tasks = [
+                asyncio.ensure_future(_handle(qualified_offset, 0.05 - index * 0.01))
+                for index, qualified_offset in enumerate(qualified_offsets)
+            ]
+            in_flight_stats = await self._platform.drain(timeout=5)
+            await asyncio.gather(*handle_tasks)
+            return in_flight_stats
+
+        in_flight_stats = asyncio.run(_drain())
+        self.assertTrue(in_flight_stats["drained"])
+        self.assertEqual(in_flight_stats["offsets_in_flight_at_start"], 3)
+        self.assertEqual(in_flight_stats["offsets_in_flight"], 0)
+        self.assertEqual(
+            self._messages,
+            [
+                {
+                    "kind": "streamMessageAckBatch",
+                    "attributes": {
+                        "acks": [{"topic": "topic", "partition": 0, "offset": 2}]
+                    },
+                }
+            ],
+        )
+
+    def test_context_track_event(self):
+        context = nuclio_sdk.Context(platform=self._platform)
+        with context.track_event(nuclio_sdk.Event()):
+            self.assertEqual(self._platform.get_in_flight_stats()["in_flight"], 1)
+        self.assertEqual(self._platform.get_in_flight_stats()["in_flight"], 0)
+
+    async def _send(self, message):
+        self._messages.append(message)
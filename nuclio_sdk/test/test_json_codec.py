@@ -0,0 +1,126 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import json
+import math
+import os
+
+import nuclio_sdk.test
+import nuclio_sdk.json_codec
+
+
+class TestJSONCodec(nuclio_sdk.test.TestCase):
+    def setUp(self):
+        super(TestJSONCodec, self).setUp()
+        self._selected_codec = nuclio_sdk.json_codec.codec
+        self._codec_classes = nuclio_sdk.json_codec._codec_classes
+        self._codecs = []
+        for codec_class in [
+            nuclio_sdk.json_codec.JSONCodec,
+            nuclio_sdk.json_codec.OrjsonCodec,
+            nuclio_sdk.json_codec.UjsonCodec,
+            nuclio_sdk.json_codec.RapidjsonCodec,
+        ]:
+            try:
+                self._codecs.append(codec_class())
+            except ImportError:
+                continue
+
+    def tearDown(self):
+        super(TestJSONCodec, self).tearDown()
+        nuclio_sdk.json_codec._codec_classes = self._codec_classes
+        nuclio_sdk.json_codec.use_codec(self._selected_codec.name)
+
+    def test_round_trip(self):
+        obj = {"str": "value", "unicode": "שלום", "list": [1, 2.5, True, None]}
+        for codec in self._codecs:
+            with self.subTest(codec=codec.name):
+                self.assertEqual(codec.loads(codec.dumps(obj)), obj)
+                self.assertEqual(json.loads(codec.dumps(obj)), obj)
+                self.assertEqual(codec.loads(json.dumps(obj).encode()), obj)
+
+    def test_nan(self):
+        obj = {"nan": float("nan"), "inf": float("inf"), "-inf": float("-inf")}
+        for codec in self._codecs:
+            with self.subTest(codec=codec.name):
+                encoded = codec.dumps(obj)
+                for literal in ["NaN", "Infinity", "-Infinity"]:
+                    self.assertIn(literal, encoded)
+                decoded = codec.loads(encoded)
+                self.assertTrue(math.isnan(decoded["nan"]))
+                self.assertEqual(decoded["inf"], float("inf"))
+                self.assertEqual(decoded["-inf"], float("-inf"))
+
+    def test_nan_among_nulls(self):
+        obj = {"null": None, "str": "nullable", "nested": [{"nan": float("nan")}]}
+        for codec in self._codecs:
+            with self.subTest(codec=codec.name):
+                encoded = codec.dumps(obj)
+                self.assertIn("NaN", encoded)
+                self.assertIsNone(json.loads(encoded)["null"])
+
+    def test_contains_non_finite_float(self):
+        contains_non_finite_float = nuclio_sdk.json_codec._contains_non_finite_float
+        for obj in [None, "null", [None, 1.5, True], {"a": ({"b": None},)}]:
+            self.assertFalse(contains_non_finite_float(obj))
+        for obj in [
+            float("nan"),
+            [None, float("-inf")],
+            {"a": [{"b": float("inf")}]},
+            {"a": datetime.datetime(2022, 1, 1)},
+        ]:
+            self.assertTrue(contains_non_finite_float(obj))
+
+    def test_non_native_types(self):
+        for codec in self._codecs:
+            with self.subTest(codec=codec.name):
+                for value in [b"bytes", datetime.datetime(2022, 1, 1)]:
+                    with self.assertRaises(TypeError):
+                        codec.dumps({"value": value})
+                    self.assertEqual(
+                        json.loads(codec.dumps({"value": value}, default=str)),
+                        {"value": str(value)},
+                    )
+
+    def test_invalid_json(self):
+        for codec in self._codecs:
+            with self.subTest(codec=codec.name):
+                with self.assertRaises(ValueError):
+                    codec.loads(b"{not json")
+
+    def test_use_codec(self):
+        codec = nuclio_sdk.json_codec.use_codec("json")
+        self.assertIsInstance(codec, nuclio_sdk.json_codec.JSONCodec)
+        self.assertEqual(nuclio_sdk.json_codec.dumps({"a": 1}), '{"a": 1}')
+
+        os.environ[nuclio_sdk.json_codec.CODEC_ENV_VAR] = "json"
+        self.assertEqual(nuclio_sdk.json_codec.use_codec().name, "json")
+
+        with self.assertRaises(ValueError):
+            nuclio_sdk.json_codec.use_codec("not-a-codec")
+
+    def test_register_codec(self):
+        class UpperCodec(nuclio_sdk.json_codec.JSONCodec):
+            name = "upper"
+
+            def dumps(self, obj, default=None):
+                return super(UpperCodec, self).dumps(obj, default).upper()
+
+        nuclio_sdk.json_codec.register_codec(UpperCodec)
+        nuclio_sdk.json_codec.use_codec("upper")
+        response = nuclio_sdk.Response.from_entrypoint_output(
+            json.dumps, nuclio_sdk.Response(body={"key": "value"})
+        )
+        self.assertEqual(response["body"], '{"KEY": "VALUE"}')
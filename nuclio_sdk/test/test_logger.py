@@ -12,12 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import logging
 import datetime
 import io
+import json
+import threading
+import time
 
 import nuclio_sdk.test
 import nuclio_sdk.helpers
+import nuclio_sdk.json_encoder
 
 
 class TestLogger(nuclio_sdk.test.TestCase):
@@ -89,6 +94,39 @@ class TestLogger(nuclio_sdk.test.TestCase):
             self._io.getvalue(),
         )
 
+    def test_log_nan_nested_in_custom_object(self):
+        class SomeObject(object):
+            def __log__(self):
+                return {"values": [1.5, float("NaN")]}
+
+        self._logger.info_with(self._testMethodName, some_instance=SomeObject())
+        self.assertIn(
+            '"with": {"some_instance": {"values": [1.5, "NaN"]}}',
+            self._io.getvalue(),
+        )
+
+    def test_fast_path_matches_custom_encoder(self):
+        formatter = nuclio_sdk.logger.JSONFormatter()
+        record = logging.LogRecord(
+            "test", logging.INFO, "", 0, "Message %s", ("arg",), None
+        )
+        setattr(
+            record,
+            "with",
+            {
+                "unicode": "\u05e9\u05dc\u05d5\u05dd",
+                "numbers": [1, 1.5, -0.0, 10**20],
+                "nested": {"none": None, "bool": True},
+                "date": datetime.datetime(2020, 10, 1),
+            },
+        )
+        self.assertEqual(
+            formatter.format(record),
+            nuclio_sdk.json_encoder.Encoder().encode(
+                formatter._get_formatted_record_dict(record)
+            ),
+        )
+
     def test_fail_to_log(self):
         """
         Do not fail logging when an object is not log-able
@@ -111,6 +149,32 @@ class TestLogger(nuclio_sdk.test.TestCase):
             self._io.getvalue(),
         )
 
+    def test_log_below_level(self):
+        self._logger._logger.setLevel(logging.INFO)
+        evaluated = []
+
+        self._logger.debug_with(
+            "TestE", value=nuclio_sdk.logger.LazyValue(evaluated.append)
+        )
+        self._logger.debug("TestF")
+        self.assertEqual(self._io.getvalue(), "")
+        self.assertEqual(evaluated, [])
+
+        # level changes are picked up
+        self._logger._logger.setLevel(logging.DEBUG)
+        self._logger.debug("TestF")
+        self.assertIn("TestF", self._io.getvalue())
+
+    def test_log_lazy_value(self):
+        self._logger.bind(bound=nuclio_sdk.logger.LazyValue(lambda: "bound value"))
+        self._logger.info_with(
+            "TestG", value=nuclio_sdk.logger.LazyValue(lambda: {"key": "value"})
+        )
+        self.assertIn(
+            '"with": {"value": {"key": "value"}, "bound": "bound value"}',
+            self._io.getvalue(),
+        )
+
     def test_redundant_logger_creation(self):
 
         # create 3 loggers with the same name
@@ -128,3 +192,314 @@ class TestLogger(nuclio_sdk.test.TestCase):
         assert self._io.getvalue().count('"level": "info", "message": "2"') == 1
         logger3.info("3")
         assert self._io.getvalue().count('"level": "info", "message": "3"') == 1
+
+
+class TestBackgroundLogger(nuclio_sdk.test.TestCase):
+    def setUp(self):
+        super(TestBackgroundLogger, self).setUp()
+        self._io = io.StringIO()
+        self._logger = nuclio_sdk.Logger(logging.DEBUG, self._testMethodName)
+
+    def tearDown(self):
+        self._logger.set_handler("default", io.StringIO(), logging.Formatter())
+        super(TestBackgroundLogger, self).tearDown()
+
+    def test_log(self):
+        self._set_handler()
+        for index in range(100):
+            self._logger.info_with("Message", index=index)
+        self._logger.flush()
+
+        lines = self._io.getvalue().splitlines()
+        self.assertEqual(len(lines), 100)
+        self.assertIn('"with": {"index": 99}', lines[-1])
+
+    def test_drop_on_full_queue(self):
+        stream = _BlockingStream()
+        self._set_handler(stream, max_queue_size=2)
+        for _ in range(10):
+            self._logger.info("Message")
+
+        # logging didn't block on the writer
+        handler = self._logger._logger.handlers[0]
+        self.assertGreater(handler.num_dropped, 0)
+
+        stream.unblock()
+        self._logger.flush()
+        self.assertEqual(len(stream.getvalue().splitlines()), 10 - handler.num_dropped)
+
+    def test_block_on_full_queue(self):
+        self._set_handler(max_queue_size=2, overflow_policy="block")
+        for _ in range(100):
+            self._logger.info("Message")
+        self._logger.flush()
+        self.assertEqual(len(self._io.getvalue().splitlines()), 100)
+
+    def test_flush_timeout(self):
+        stream = _BlockingStream()
+        self._set_handler(stream)
+        self._logger.info("Message")
+        self.assertFalse(self._logger._logger.handlers[0].flush(timeout=0.05))
+        stream.unblock()
+        self.assertTrue(self._logger._logger.handlers[0].flush(timeout=1))
+
+    def test_flush_on_termination(self):
+        self._set_handler()
+        platform = nuclio_sdk.Platform("test")
+        platform.add_signal_hook(self._logger.flush)
+        self._logger.info("Message")
+        platform._on_signal()
+        self.assertIn('"message": "Message"', self._io.getvalue())
+
+    def test_flush_after_async_termination_callback(self):
+        calls = []
+        platform = nuclio_sdk.Platform("test")
+        platform.add_signal_hook(lambda: calls.append("flush"))
+
+        async def _terminate():
+            await asyncio.sleep(0)
+            calls.append("terminate")
+            return "terminated"
+
+        platform.set_termination_callback(_terminate)
+        self.assertEqual(asyncio.run(platform._on_signal()), "terminated")
+        self.assertEqual(calls, ["terminate", "flush"])
+
+    def test_values_logged_as_emitted(self):
+        stream = _BlockingStream()
+        self._set_handler(stream)
+        state = {"step": 1}
+        self._logger.info_with("Message", state=state)
+        state["step"] = 2
+        stream.unblock()
+        self._logger.flush()
+        self.assertIn('"with": {"state": {"step": 1}}', stream.getvalue())
+
+    def test_replace_handler(self):
+        self._set_handler()
+        handler = self._logger._logger.handlers[0]
+        self._logger.info("Message")
+        self._set_handler()
+
+        # replaced handler wrote its queue and stopped
+        self.assertIn('"message": "Message"', self._io.getvalue())
+        self.assertFalse(handler._writer_thread.is_alive())
+
+    def _set_handler(self, stream=None, **kwargs):
+        self._logger.set_handler(
+            "default",
+            stream or self._io,
+            nuclio_sdk.logger.JSONFormatter(),
+            background=True,
+            **kwargs
+        )
+
+
+class _BlockingStream(io.StringIO):
+    def __init__(self):
+        super(_BlockingStream, self).__init__()
+        self._unblocked = threading.Event()
+
+    def write(self, data):
+        self._unblocked.wait()
+        return super(_BlockingStream, self).write(data)
+
+    def unblock(self):
+        self._unblocked.set()
+
+
+class TestFormatterTime(nuclio_sdk.test.TestCase):
+    def test_format_time(self):
+        formatter = nuclio_sdk.logger.JSONFormatter()
+        reference_formatter = logging.Formatter()
+        for created in [1601510400.0, 1601510400.999, 1601510401.5, 1601510400.25]:
+            record = self._create_record(created)
+            self.assertEqual(
+                formatter.formatTime(record), reference_formatter.formatTime(record)
+            )
+            self.assertEqual(
+                formatter.formatTime(record, "%Y"),
+                reference_formatter.formatTime(record, "%Y"),
+            )
+
+    def test_epoch_nanos(self):
+        record = self._create_record(1601510400.5)
+        json_formatter = nuclio_sdk.logger.JSONFormatter(epoch_nanos=True)
+        self.assertIn('"datetime": 1601510400500000000', json_formatter.format(record))
+
+        human_readable_formatter = nuclio_sdk.logger.HumanReadableFormatter(
+            epoch_nanos=True
+        )
+        self.assertTrue(
+            human_readable_formatter.format(record).startswith(
+                "Python> 1601510400500000000 [info]"
+            )
+        )
+
+    @staticmethod
+    def _create_record(created):
+        record = logging.LogRecord("test", logging.INFO, "", 0, "Message", (), None)
+        record.created = created
+        record.msecs = (created - int(created)) * 1000
+        return record
+
+
+class TestLogBatchHandler(nuclio_sdk.test.TestCase):
+    def setUp(self):
+        super(TestLogBatchHandler, self).setUp()
+        self._messages = []
+        self._logger = nuclio_sdk.Logger(logging.DEBUG, self._testMethodName)
+
+    def tearDown(self):
+        self._logger.set_handler("default", io.StringIO(), logging.Formatter())
+        super(TestLogBatchHandler, self).tearDown()
+
+    def test_batch_size(self):
+        self._set_handler(max_batch_size=3, max_batch_delay=60)
+        for index in range(7):
+            self._logger.info_with("Message", index=index)
+
+        self.assertEqual(
+            [len(message["attributes"]["logs"]) for message in self._get_messages()],
+            [3, 3],
+        )
+
+        # end of event
+        self._logger.flush()
+        messages = self._get_messages()
+        self.assertEqual(len(messages), 3)
+        self.assertEqual(messages[0]["kind"], "logBatch")
+        self.assertEqual(
+            [
+                log["with"]["index"]
+                for message in messages
+                for log in message["attributes"]["logs"]
+            ],
+            list(range(7)),
+        )
+        self.assertEqual(messages[2]["attributes"]["logs"][0]["level"], "info")
+
+    def test_batch_delay(self):
+        self._set_handler(max_batch_size=100, max_batch_delay=0.05)
+        self._logger.info("First")
+        self._logger.info("Second")
+        self.assertEqual(self._messages, [])
+
+        self._wait_for_messages()
+        messages = self._get_messages()
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(
+            [log["message"] for log in messages[0]["attributes"]["logs"]],
+            ["First", "Second"],
+        )
+
+    def test_values_formatted_when_logged(self):
+        self._set_handler(max_batch_size=100, max_batch_delay=60)
+        values = [1]
+        self._logger.info_with("Message", values=values)
+        values.append(2)
+        self._logger.flush()
+        self.assertEqual(
+            self._get_messages()[0]["attributes"]["logs"][0]["with"], {"values": [1]}
+        )
+
+    def test_formatter_not_encoding_batches(self):
+        with self.assertRaises(ValueError):
+            self._logger.set_log_batch_handler(
+                "default",
+                self._messages.append,
+                nuclio_sdk.logger.HumanReadableFormatter(),
+            )
+        self.assertEqual(self._logger._logger.handlers, [])
+
+        handler = nuclio_sdk.logger.LogBatchHandler(self._messages.append)
+        self.addCleanup(handler.close)
+        with self.assertRaises(ValueError):
+            handler.setFormatter(logging.Formatter())
+
+    def test_send_logs(self):
+        def _send(message):
+            self._messages.append(message)
+            self._logger.debug("Sent")
+
+        self._logger.set_log_batch_handler(
+            "default",
+            _send,
+            nuclio_sdk.logger.JSONFormatter(),
+            max_batch_size=2,
+            max_batch_delay=60,
+        )
+
+        # a record logged by send (while the handler sends) doesn't deadlock
+        thread = threading.Thread(
+            target=lambda: [self._logger.info("Message") for _ in range(4)]
+        )
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self._logger.flush()
+        self.assertEqual(
+            [
+                log["message"]
+                for message in self._get_messages()
+                for log in message["attributes"]["logs"]
+            ],
+            ["Message", "Message", "Sent", "Message", "Sent", "Message", "Sent"],
+        )
+
+    def test_send_lock(self):
+        send_lock = threading.Lock()
+
+        def _send(message):
+            self.assertTrue(send_lock.locked())
+            self._messages.append(message)
+
+        self._logger.set_log_batch_handler(
+            "default",
+            _send,
+            nuclio_sdk.logger.JSONFormatter(),
+            max_batch_delay=0.01,
+            send_lock=send_lock,
+        )
+        self._logger.info("Message")
+        self._wait_for_messages()
+        self.assertEqual(len(self._get_messages()), 1)
+
+    def test_delayed_batch_sent_from_loop(self):
+        send_threads = []
+
+        def _send(message):
+            send_threads.append(threading.current_thread())
+            self._messages.append(message)
+
+        async def _log():
+            self._logger.set_log_batch_handler(
+                "default",
+                _send,
+                nuclio_sdk.logger.JSONFormatter(),
+                max_batch_delay=0.01,
+                loop=asyncio.get_running_loop(),
+            )
+            self._logger.info("Message")
+            deadline = time.monotonic() + 2
+            while not self._messages and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+
+        asyncio.run(_log())
+        self.assertEqual(send_threads, [threading.current_thread()])
+
+    def _wait_for_messages(self):
+        deadline = time.monotonic() + 2
+        while not self._messages and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _set_handler(self, **kwargs):
+        self._logger.set_log_batch_handler(
+            "default",
+            self._messages.append,
+            nuclio_sdk.logger.JSONFormatter(),
+            **kwargs
+        )
+
+    def _get_messages(self):
+        return [json.loads(message) for message in self._messages]
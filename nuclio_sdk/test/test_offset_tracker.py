@@ -0,0 +1,124 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import random
+
+import nuclio_sdk
+import nuclio_sdk.offset_tracker
+import nuclio_sdk.test
+
+
+class TestOffsetTracker(nuclio_sdk.test.TestCase):
+    def setUp(self):
+        super(TestOffsetTracker, self).setUp()
+        self._offset_tracker = nuclio_sdk.offset_tracker.OffsetTracker()
+
+    def test_in_order(self):
+        for offset in range(3):
+            self._start(0, offset)
+        for offset in range(3):
+            self.assertEqual(self._complete(0, offset), offset)
+        self.assertEqual(self._offset_tracker.num_in_flight, 0)
+
+    def test_out_of_order(self):
+        for offset in [10, 11, 13, 14]:
+            self._start(0, offset)
+        self._start(1, 10)
+
+        self.assertIsNone(self._complete(0, 13))
+        self.assertIsNone(self._complete(0, 11))
+        self.assertEqual(self._offset_tracker.num_in_flight, 3)
+
+        # other partitions are independent
+        self.assertEqual(self._complete(1, 10), 10)
+
+        # oldest offset completed - watermark skips past the completed ones after it
+        self.assertEqual(self._complete(0, 10), 13)
+        self.assertEqual(self._complete(0, 14), 14)
+        self.assertEqual(self._offset_tracker.num_in_flight, 0)
+
+    def test_random_order(self):
+        offsets = list(range(1000))
+        for offset in offsets:
+            self._start(0, offset)
+        random.shuffle(offsets)
+
+        watermarks = []
+        completed = set()
+        for offset in offsets:
+            completed.add(offset)
+            watermark = self._complete(0, offset)
+            if watermark is not None:
+                watermarks.append(watermark)
+
+                # every offset up to the watermark completed
+                self.assertTrue(
+                    all(previous in completed for previous in range(watermark))
+                )
+
+        self.assertEqual(watermarks, sorted(watermarks))
+        self.assertEqual(watermarks[-1], 999)
+
+    def test_complete_untracked_offset(self):
+        self._start(0, 1)
+        for partition, offset in [(0, 2), (1, 1)]:
+            with self.assertRaises(ValueError):
+                self._complete(partition, offset)
+
+        self._complete(0, 1)
+        with self.assertRaises(ValueError):
+            self._complete(0, 1)
+
+    def test_platform_complete_offset(self):
+        messages = []
+
+        async def _send(message):
+            messages.append(message)
+
+        platform = nuclio_sdk.Platform("test", on_control_callback=_send)
+
+        async def _process(offset, duration):
+            await asyncio.sleep(duration)
+            await platform.complete_offset(
+                nuclio_sdk.QualifiedOffset("topic", 0, offset)
+            )
+
+        async def _process_concurrently():
+            tasks = []
+            for offset, duration in [(0, 0.03), (1, 0.01), (2, 0.05)]:
+                platform.track_offset(nuclio_sdk.QualifiedOffset("topic", 0, offset))
+                tasks.append(_process(offset, duration))
+            await asyncio.gather(*tasks)
+
+        asyncio.run(_process_concurrently())
+
+        # offset 1 completed first, but is acked along with 0
+        self.assertEqual(
+            [message["attributes"]["offset"] for message in messages], [1, 2]
+        )
+
+    def _start(self, partition, offset):
+        self._offset_tracker.start(
+            nuclio_sdk.QualifiedOffset("topic", partition, offset)
+        )
+
+    def _complete(self, partition, offset):
+        watermark = self._offset_tracker.complete(
+            nuclio_sdk.QualifiedOffset("topic", partition, offset)
+        )
+        if watermark is None:
+            return None
+        self.assertEqual((watermark.topic, watermark.partition), ("topic", partition))
+        return watermark.offset
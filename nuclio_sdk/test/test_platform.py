@@ -0,0 +1,650 @@
+# Copyright 2017 The Nuclio Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import http.client
+import http.server
+import sys
+import threading
+import time
+import unittest.mock
+
+import nuclio_sdk.compression
+import nuclio_sdk.test
+
+
+class _FunctionRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super(_FunctionRequestHandler, self).setup()
+        with self.server.lock:
+            self.server.num_connections += 1
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.requests.append((self.command, self.path, self.headers, body))
+        response = self.server.respond(self, body)
+
+        # drop the connection without responding
+        if response is None:
+            self.close_connection = True
+            return
+
+        status_code, headers, response_body = response
+
+        self.send_response(status_code)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(response_body)))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FunctionServer(http.server.ThreadingHTTPServer):
+    """
+    Local HTTP server standing in for a function. respond(request_handler, body) returns a
+    tuple of (status code, headers, body), or None to drop the connection. Defaults to echoing
+    the request body
+    """
+
+    daemon_threads = True
+
+    # many concurrent connections are opened by async tests
+    request_queue_size = 128
+
+    def __init__(self, respond=None):
+        super(FunctionServer, self).__init__(("127.0.0.1", 0), _FunctionRequestHandler)
+        self.respond = respond or self._echo
+        self.lock = threading.Lock()
+        self.num_connections = 0
+        self.requests = []
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def connection_provider(self, url, timeout=None):
+        return http.client.HTTPConnection("127.0.0.1", self.port, timeout=timeout)
+
+    def async_connection_provider(self, url):
+        return nuclio_sdk.async_connection.AsyncConnection(
+            "127.0.0.1:{0}".format(self.port)
+        )
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address):
+        # clients that timed out close the connection before the response is written
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super(FunctionServer, self).handle_error(request, client_address)
+
+    @staticmethod
+    def _echo(request_handler, body):
+        return (
+            200,
+            {"Content-Type": request_handler.headers.get("Content-Type")},
+            body,
+        )
+
+
+class TestPlatform(nuclio_sdk.test.TestCase):
+    def setUp(self):
+        super(TestPlatform, self).setUp()
+        self._server = FunctionServer()
+        self.addCleanup(self._server.stop)
+        self._platform = self._create_platform()
+        self.addCleanup(lambda: self._platform.close_connections())
+
+    def test_call_function(self):
+        response = self._platform.call_function(
+            "my-function",
+            nuclio_sdk.Event(body={"key": "value"}, method="POST", path="/path"),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, "application/json")
+        self.assertEqual(response.body, {"key": "value"})
+
+        method, path, headers, _ = self._server.requests[0]
+        self.assertEqual(method, "POST")
+        self.assertEqual(path, "/path")
+        self.assertEqual(headers["X-Nuclio-Target"], "my-function")
+
+    def test_event_headers(self):
+        event_headers = {
+            "X-Nuclio-Target": "other-function",
+            "Content-Length": "1000",
+            "X-Custom": "value",
+        }
+        event = nuclio_sdk.Event(body="body", method="POST", headers=event_headers)
+        for _ in range(2):
+            self._call("my-function", event)
+
+        for _, _, headers, _ in self._server.requests:
+            self.assertEqual(headers["X-Nuclio-Target"], "other-function")
+            self.assertEqual(headers["X-Custom"], "value")
+            self.assertEqual(headers["Content-Length"], "4")
+            self.assertEqual(headers["Content-Type"], "text/plain")
+
+        # caller's headers are left untouched
+        self.assertEqual(
+            event_headers,
+            {
+                "X-Nuclio-Target": "other-function",
+                "Content-Length": "1000",
+                "X-Custom": "value",
+            },
+        )
+
+    def test_call_plan_invalidated_on_namespace_change(self):
+        self.assertEqual(
+            self._platform._get_call_plan("my-function")[0],
+            "nuclio-default-my-function:8080",
+        )
+        self._platform.namespace = "other"
+        self.assertEqual(
+            self._platform._get_call_plan("my-function")[0],
+            "nuclio-other-my-function:8080",
+        )
+        self.assertEqual(
+            self._platform._get_call_plan("my-function", "my-service")[0],
+            "my-service:8080",
+        )
+
+    def test_compression(self):
+        def _respond_compressed(request_handler, body):
+            body = nuclio_sdk.compression.decompress(
+                request_handler.headers.get("Content-Encoding", "identity"), body
+            )
+            headers = {"Content-Type": "application/json"}
+            if "gzip" in request_handler.headers.get("Accept-Encoding", ""):
+                body = nuclio_sdk.compression.compress("gzip", body)
+                headers["Content-Encoding"] = "gzip"
+            return 200, headers, body
+
+        self._server.respond = _respond_compressed
+        self._platform = self._create_platform(
+            compression="deflate", compression_min_size=100
+        )
+
+        large_body = {"key": "value" * 100}
+        for body in [{"key": "value"}, large_body]:
+            response = self._call(
+                "my-function", nuclio_sdk.Event(body=body, method="POST")
+            )
+            self.assertEqual(response.body, body)
+            self.assertNotIn("content-encoding", response.headers)
+            self.assertNotIn("content-length", response.headers)
+
+        # only the large body is compressed, and both responses are
+        small_request, large_request = self._server.requests
+        self.assertNotIn("Content-Encoding", small_request[2])
+        self.assertEqual(large_request[2]["Content-Encoding"], "deflate")
+        self.assertLess(len(large_request[3]), 100)
+        for request in self._server.requests:
+            self.assertEqual(
+                request[2]["Accept-Encoding"], nuclio_sdk.compression.accept_encoding
+            )
+
+    def test_compression_disabled(self):
+        response = self._call(
+            "my-function",
+            nuclio_sdk.Event(body={"key": "value" * 1000}, method="POST"),
+        )
+        self.assertEqual(response.body, {"key": "value" * 1000})
+
+        _, _, headers, _ = self._server.requests[0]
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertEqual(headers.get("Accept-Encoding", "identity"), "identity")
+
+    def test_unsupported_compression(self):
+        with self.assertRaises(ValueError):
+            nuclio_sdk.Platform("local", compression="br")
+
+    def test_retry(self):
+        self._server.respond = self._flaky_respond([503, 503, None])
+        response = self._call(
+            "my-function",
+            nuclio_sdk.Event(body="body", method="POST"),
+            retry_policy=nuclio_sdk.RetryPolicy(max_attempts=4, backoff=0.001),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.body, b"body")
+        self.assertEqual(len(self._server.requests), 4)
+
+    def test_retry_exhausted(self):
+        self._server.respond = self._flaky_respond([503] * 3)
+        self._platform = self._create_platform(
+            retry_policy=nuclio_sdk.RetryPolicy(max_attempts=2, backoff=0.001)
+        )
+        self.assertEqual(self._call_function("body").status_code, 503)
+        self.assertEqual(len(self._server.requests), 2)
+
+        # dropped connections raise once retries are exhausted (the first drop of the kept-alive
+        # connection is retried on a new connection regardless)
+        self._server.respond = self._flaky_respond([None] * 3)
+        with self.assertRaises(ConnectionError):
+            self._call_function("body")
+
+    def test_retry_not_on_client_error(self):
+        self._server.respond = self._flaky_respond([400])
+        response = self._call(
+            "my-function",
+            nuclio_sdk.Event(body="body", method="POST"),
+            retry_policy=nuclio_sdk.RetryPolicy(backoff=0.001),
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(self._server.requests), 1)
+
+    def test_circuit_breaker(self):
+        self._server.respond = self._flaky_respond([503, None, None])
+        self._platform = self._create_platform(
+            circuit_breaker_failure_threshold=2, circuit_breaker_reset_timeout=0.1
+        )
+        self.assertEqual(self._call_function("body").status_code, 503)
+        with self.assertRaises(ConnectionError):
+            self._call_function("body")
+
+        # fails fast, without calling the function
+        with self.assertRaises(nuclio_sdk.CircuitOpenError):
+            self._call_function("body")
+        self.assertEqual(len(self._server.requests), 3)
+
+        # probe after the reset timeout closes the circuit
+        time.sleep(0.15)
+        for _ in range(2):
+            self.assertEqual(self._call_function("body").status_code, 200)
+
+    def test_circuit_breaker_probe_failed_unexpectedly(self):
+        self._server.respond = self._flaky_respond([503])
+        self._platform = self._create_platform(
+            circuit_breaker_failure_threshold=1, circuit_breaker_reset_timeout=0.1
+        )
+        self.assertEqual(self._call_function("body").status_code, 503)
+        time.sleep(0.15)
+
+        # the probe fails with an error other than the call errors
+        with unittest.mock.patch.object(
+            self._platform, "_attempt", side_effect=RuntimeError
+        ), unittest.mock.patch.object(
+            self._platform, "_attempt_async", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self._call_function("body")
+
+        # which counts as a failed probe rather than leaving the circuit half open
+        with self.assertRaises(nuclio_sdk.CircuitOpenError):
+            self._call_function("body")
+        time.sleep(0.15)
+        self.assertEqual(self._call_function("body").status_code, 200)
+
+    def test_circuit_breaker_client_error(self):
+        self._server.respond = self._flaky_respond([503])
+        self._platform = self._create_platform(
+            circuit_breaker_failure_threshold=1, circuit_breaker_reset_timeout=0.1
+        )
+        invalid_event = nuclio_sdk.Event(
+            body="body", method="POST", headers={"X-Invalid": "a\nb"}
+        )
+
+        # rejected before reaching the function, which does not count as a failure
+        with self.assertRaises(ValueError):
+            self._call("my-function", invalid_event)
+        self.assertEqual(self._call_function("body").status_code, 503)
+
+        # nor as a probe
+        time.sleep(0.15)
+        with self.assertRaises(ValueError):
+            self._call("my-function", invalid_event)
+        self.assertEqual(self._call_function("body").status_code, 200)
+        self.assertEqual(len(self._server.requests), 2)
+
+    def test_hedging(self):
+        slow_response_sent = threading.Event()
+
+        def _respond_slowly_once(request_handler, body):
+            if body == b"slow" and not slow_response_sent.is_set():
+                slow_response_sent.set()
+                time.sleep(0.5)
+            return 200, {"Content-Type": "text/plain"}, body
+
+        self._server.respond = _respond_slowly_once
+        self._platform = self._create_platform(hedge_percentile=90)
+
+        # gather latencies
+        for _ in range(20):
+            self._call_function("fast")
+
+        started_at = time.monotonic()
+        self.assertEqual(self._call_function("slow").body, b"slow")
+        self.assertLess(time.monotonic() - started_at, 0.4)
+
+        # both attempts reached the function
+        slow_bodies = [
+            body for _, _, _, body in self._server.requests if body == b"slow"
+        ]
+        self.assertEqual(len(slow_bodies), 2)
+
+        # let the losing attempt complete
+        time.sleep(0.5)
+
+    def test_connection_reused(self):
+        for index in range(5):
+            response = self._call_function(str(index))
+            self.assertEqual(response.body, str(index).encode())
+        self.assertEqual(self._server.num_connections, 1)
+
+    def test_connection_pooling_disabled(self):
+        self._platform = self._create_platform(connection_pool_size=0)
+        for index in range(3):
+            self._call_function(str(index))
+        self.assertEqual(self._server.num_connections, 3)
+
+    def test_reconnect_on_stale_connection(self):
+        def _respond_and_drop_connection(request_handler, body):
+            # close without announcing it, leaving the client with a stale connection
+            request_handler.close_connection = True
+            return 200, {"Content-Type": "text/plain"}, body
+
+        self._server.respond = _respond_and_drop_connection
+        for index in range(3):
+            self.assertEqual(self._call_function(str(index)).body, str(index).encode())
+        self.assertEqual(self._server.num_connections, 3)
+
+    def test_idle_connection_evicted(self):
+        self._platform = self._create_platform(connection_idle_timeout=0.05)
+        self._call_function("first")
+        time.sleep(0.1)
+        self._call_function("second")
+        self.assertEqual(self._server.num_connections, 2)
+
+    def test_concurrent_calls(self):
+        def _call_functions():
+            for index in range(20):
+                self.assertEqual(
+                    self._call_function(str(index)).body, str(index).encode()
+                )
+
+        threads = [threading.Thread(target=_call_functions) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self._server.requests), 80)
+        self.assertLessEqual(self._server.num_connections, 4)
+
+    def test_call_functions(self):
+        def _respond(request_handler, body):
+            if body == b"fail":
+                return 500, {"Content-Type": "application/json"}, b"not json"
+
+            # responses complete out of order
+            time.sleep(0.01 * (5 - len(body)))
+            return 200, {"Content-Type": "text/plain"}, body
+
+        self._server.respond = _respond
+        results = self._call_functions(
+            [
+                ("my-function", nuclio_sdk.Event(body=body, method="POST"))
+                for body in ["a", "bb", "fail", "dddd"]
+            ],
+            max_concurrency=4,
+        )
+
+        self.assertEqual(results[0].body, b"a")
+        self.assertEqual(results[1].body, b"bb")
+        self.assertIsInstance(results[2], ValueError)
+        self.assertEqual(results[3].body, b"dddd")
+        self.assertEqual(self._server.num_connections, 4)
+
+    def test_map_function(self):
+        results = self._map_function(
+            "my-function",
+            [nuclio_sdk.Event(body=str(index), method="POST") for index in range(10)],
+            max_concurrency=2,
+        )
+        self.assertEqual(
+            [result.body for result in results],
+            [str(index).encode() for index in range(10)],
+        )
+        self.assertLessEqual(self._server.num_connections, 2)
+
+    def test_call_functions_timeout(self):
+        def _respond(request_handler, body):
+            if body == b"slow":
+                time.sleep(0.5)
+            return 200, {"Content-Type": "text/plain"}, body
+
+        self._server.respond = _respond
+        results = self._map_function(
+            "my-function",
+            [nuclio_sdk.Event(body=body, method="POST") for body in ["slow", "fast"]],
+            timeout=0.1,
+        )
+        self.assertIsInstance(results[0], (TimeoutError, asyncio.TimeoutError))
+        self.assertEqual(results[1].body, b"fast")
+
+    def test_call_functions_timeout_includes_retries(self):
+        def _respond(request_handler, body):
+            time.sleep(0.05)
+            return 503, {"Content-Type": "text/plain"}, b"unavailable"
+
+        self._server.respond = _respond
+        started_at = time.monotonic()
+        results = self._map_function(
+            "my-function",
+            [nuclio_sdk.Event(body="body", method="POST")],
+            timeout=0.2,
+            retry_policy=nuclio_sdk.RetryPolicy(max_attempts=10, backoff=0.05),
+        )
+        self.assertIsInstance(results[0], (TimeoutError, asyncio.TimeoutError))
+        self.assertLess(time.monotonic() - started_at, 0.4)
+
+    def _call_function(self, body):
+        return self._call("my-function", nuclio_sdk.Event(body=body, method="POST"))
+
+    def _call(self, function_name, event, **kwargs):
+        return self._platform.call_function(function_name, event, **kwargs)
+
+    def _call_functions(self, calls, **kwargs):
+        return self._platform.call_functions(calls, **kwargs)
+
+    def _map_function(self, function_name, events, **kwargs):
+        return self._platform.map_function(function_name, events, **kwargs)
+
+    @staticmethod
+    def _flaky_respond(failures):
+        """
+        Respond with each of the failures (a status code, or None to drop the connection) and
+        then echo
+        """
+        failures = list(failures)
+
+        def _respond(request_handler, body):
+            if not failures:
+                return FunctionServer._echo(request_handler, body)
+
+            failure = failures.pop(0)
+            if failure is None:
+                return None
+            return failure, {"Content-Type": "text/plain"}, b"failed"
+
+        return _respond
+
+    def _create_platform(self, **kwargs):
+        # replacing a platform created by a previous call (rather than the test case's mock platform)
+        if isinstance(self._platform, nuclio_sdk.Platform):
+            self._platform.close_connections()
+        return nuclio_sdk.Platform(
+            "local",
+            connection_provider=self._server.connection_provider,
+            async_connection_provider=self._server.async_connection_provider,
+            **kwargs
+        )
+
+
+class TestMockPlatform(nuclio_sdk.test.TestCase):
+    def setUp(self):
+        super(TestMockPlatform, self).setUp()
+
+        def _call_function(function_name, event, *args):
+            if event.body == "fail":
+                raise ValueError("call failed")
+            return nuclio_sdk.Response(body=function_name + ":" + event.body)
+
+        self._platform.call_function_mock.side_effect = _call_function
+
+    def test_call_functions(self):
+        calls = [
+            ("first", nuclio_sdk.Event(body="a")),
+            ("second", nuclio_sdk.Event(body="fail")),
+            ("first", nuclio_sdk.Event(body="b")),
+        ]
+        for results in [
+            self._platform.call_functions(calls),
+            asyncio.run(self._platform.call_functions_async(calls)),
+        ]:
+            self.assertEqual(results[0].body, "first:a")
+            self.assertIsInstance(results[1], ValueError)
+            self.assertEqual(results[2].body, "first:b")
+
+        self.assertEqual(self._platform.get_call_function_call_args(1)[0], "second")
+
+    def test_map_function(self):
+        events = [nuclio_sdk.Event(body=str(index)) for index in range(3)]
+        for results in [
+            self._platform.map_function("my-function", events, timeout=1),
+            asyncio.run(self._platform.map_function_async("my-function", events)),
+        ]:
+            self.assertEqual(
+                [result.body for result in results],
+                ["my-function:0", "my-function:1", "my-function:2"],
+            )
+        self.assertEqual(self._platform.get_call_function_call_args(0)[3], 1)
+
+
+class TestPlatformAsync(TestPlatform):
+    def setUp(self):
+        super(TestPlatformAsync, self).setUp()
+
+        # a single event loop for all calls in a test, so connections are reused across calls
+        self._loop = asyncio.new_event_loop()
+        self.addCleanup(self._close_loop)
+
+    def test_call_function(self):
+        async def _call_function():
+            return await self._platform.call_function_async(
+                "my-function",
+                nuclio_sdk.Event(body={"key": "válue"}, method="POST", path="/path"),
+            )
+
+        response = self._run(_call_function())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, "application/json")
+        self.assertEqual(response.body, {"key": "válue"})
+
+        method, path, headers, body = self._server.requests[0]
+        self.assertEqual(method, "POST")
+        self.assertEqual(path, "/path")
+        self.assertEqual(headers["X-Nuclio-Target"], "my-function")
+        self.assertIn("válue".encode("utf-8"), body)
+
+    def test_context_call_function_async(self):
+        context = nuclio_sdk.Context(platform=self._platform)
+        response = self._run(
+            context.call_function_async(
+                "my-function", nuclio_sdk.Event(body="body", method="POST")
+            )
+        )
+        self.assertEqual(response.body, b"body")
+
+    def test_concurrent_calls(self):
+        async def _call_functions():
+            return await asyncio.gather(
+                *[
+                    self._platform.call_function_async(
+                        "my-function", nuclio_sdk.Event(body=str(index), method="POST")
+                    )
+                    for index in range(100)
+                ]
+            )
+
+        responses = self._run(_call_functions())
+        self.assertEqual(
+            [response.body for response in responses],
+            [str(index).encode() for index in range(100)],
+        )
+
+        # served concurrently, over more than a single connection
+        self.assertEqual(len(self._server.requests), 100)
+        self.assertGreater(self._server.num_connections, 1)
+
+    def test_timeout(self):
+        def _respond_slowly(request_handler, body):
+            time.sleep(0.5)
+            return 200, {"Content-Type": "text/plain"}, body
+
+        self._server.respond = _respond_slowly
+
+        async def _call_function():
+            return await self._platform.call_function_async(
+                "my-function", nuclio_sdk.Event(body="body", method="POST"), timeout=0.1
+            )
+
+        with self.assertRaises(asyncio.TimeoutError):
+            self._run(_call_function())
+
+    def _call(self, function_name, event, **kwargs):
+        return self._run(
+            self._platform.call_function_async(function_name, event, **kwargs)
+        )
+
+    def _call_functions(self, calls, **kwargs):
+        return self._run(self._platform.call_functions_async(calls, **kwargs))
+
+    def _map_function(self, function_name, events, **kwargs):
+        return self._run(
+            self._platform.map_function_async(function_name, events, **kwargs)
+        )
+
+    def _run(self, coroutine):
+        return self._loop.run_until_complete(coroutine)
+
+    def _close_loop(self):
+        async def _close_connections():
+            self._platform.close_connections()
+
+            # let the transports close
+            await asyncio.sleep(0)
+
+        self._run(_close_connections())
+        self._loop.close()
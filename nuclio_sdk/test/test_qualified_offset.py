@@ -9,6 +9,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
+import pickle
+
 import nuclio_sdk.test
 
 
@@ -44,6 +47,53 @@ class TestQualifiedOffset(nuclio_sdk.test.TestCase):
         actual_explicit_ack_message = qualified_offset.compile_explicit_ack_message()
         self.assertEqual(expected_explicit_ack_message, actual_explicit_ack_message)
 
+    def test_event_compile_explicit_ack_message(self):
+        event = nuclio_sdk.Event(path="path", shard_id=1, offset=2)
+        self.assertEqual(
+            event.compile_explicit_ack_message(),
+            nuclio_sdk.QualifiedOffset("path", 1, 2).compile_explicit_ack_message(),
+        )
+
+    def test_immutable(self):
+        qualified_offset = nuclio_sdk.QualifiedOffset("topic", 0, 1)
+        message = qualified_offset.compile_explicit_ack_message()
+        self.assertIs(qualified_offset.compile_explicit_ack_message(), message)
+        for name in ["topic", "partition", "offset", "_explicit_ack_message"]:
+            with self.assertRaises(AttributeError):
+                setattr(qualified_offset, name, 2)
+        self.assertEqual(message["attributes"]["offset"], 1)
+
+        # copies and pickles are built from the value
+        unpickled_qualified_offset = pickle.loads(pickle.dumps(qualified_offset))
+        self.assertEqual(unpickled_qualified_offset, qualified_offset)
+        self.assertEqual(copy.copy(qualified_offset), qualified_offset)
+
+    def test_hash_and_order(self):
+        first = nuclio_sdk.QualifiedOffset("topic", 0, 5)
+        second = nuclio_sdk.QualifiedOffset("topic", 1, 2)
+        third = nuclio_sdk.QualifiedOffset("topic", 1, 3)
+
+        self.assertEqual(first, nuclio_sdk.QualifiedOffset("topic", 0, 5))
+        self.assertNotEqual(first, second)
+        self.assertEqual(
+            {first: "first", second: "second"}[
+                nuclio_sdk.QualifiedOffset("topic", 0, 5)
+            ],
+            "first",
+        )
+        self.assertEqual(sorted([third, first, second]), [first, second, third])
+        self.assertLess(second, third)
+        self.assertGreaterEqual(third, second)
+        self.assertEqual(tuple(first), ("topic", 0, 5))
+
+    def test_topic_interned(self):
+        topic = "".join(["to", "pic"])
+        self.assertIsNot(topic, "topic")
+        self.assertIs(
+            nuclio_sdk.QualifiedOffset(topic, 0, 0).topic,
+            nuclio_sdk.QualifiedOffset("topic", 0, 0).topic,
+        )
+
     def _check_equal_qualified_offsets(self, expected, actual):
         self.assertEqual(expected.topic, actual.topic)
         self.assertEqual(expected.partition, actual.partition)
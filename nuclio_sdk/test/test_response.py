@@ -12,7 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import datetime
+import io
+import json
 
 import nuclio_sdk.test
 import nuclio_sdk.json_encoder
@@ -45,6 +48,47 @@ class TestResponse(nuclio_sdk.test.TestCase):
         )
         self._validate_response(handler_return, expected_response)
 
+    def test_memoryview(self):
+        handler_return = memoryview(b"test")
+        expected_response = self._compile_output_response(
+            body="dGVzdA==", body_encoding="base64"  # base64 value for 'test'
+        )
+        self._validate_response(handler_return, expected_response)
+
+    def test_bytes_raw_encoding(self):
+        response = nuclio_sdk.Response.from_entrypoint_output(
+            self._encoder.encode, b"\x80test", binary_body_encoding="raw"
+        )
+        self.assertDictEqual(
+            response,
+            self._compile_output_response(body=b"\x80test", body_encoding="raw"),
+        )
+
+        # per function default
+        self.addCleanup(setattr, nuclio_sdk.Response, "binary_body_encoding", "base64")
+        nuclio_sdk.Response.binary_body_encoding = "raw"
+        response = self._get_response(nuclio_sdk.Response(body=b"test"))
+        self.assertEqual(response["body"], b"test")
+        self.assertEqual(response["body_encoding"], "raw")
+
+        # text bodies are not affected
+        self._validate_response("test", self._compile_output_response(body="test"))
+        self.assertEqual(
+            list(self._get_response(iter([b"test"]))["body"]),
+            [{"body": b"test", "body_encoding": "raw"}],
+        )
+
+    def test_unsupported_binary_body_encoding(self):
+        with self.assertRaises(ValueError):
+            nuclio_sdk.Response.from_entrypoint_output(
+                self._encoder.encode, b"test", binary_body_encoding="Raw"
+            )
+
+        self.addCleanup(setattr, nuclio_sdk.Response, "binary_body_encoding", "base64")
+        nuclio_sdk.Response.binary_body_encoding = "hex"
+        with self.assertRaises(ValueError):
+            self._get_response("test")
+
     def test_dict(self):
         handler_return = {"json": True}
         expected_response = self._compile_output_response(
@@ -97,6 +141,95 @@ class TestResponse(nuclio_sdk.test.TestCase):
         expected_response = self._compile_output_response(body="test", event_id="1337")
         self._validate_response(handler_return, expected_response)
 
+    def test_recycled_response(self):
+        response = nuclio_sdk.Response.from_entrypoint_output(
+            self._encoder.encode,
+            nuclio_sdk.Response(
+                body=b"body", headers={"X-Key": "value"}, event_id="1337"
+            ),
+        )
+        headers = response["headers"]
+
+        recycled_response = nuclio_sdk.Response.from_entrypoint_output(
+            self._encoder.encode, "test", response=response
+        )
+        self.assertIs(recycled_response, response)
+        self.assertEqual(recycled_response, self._compile_output_response(body="test"))
+
+        # the handler's headers are replaced, not cleared
+        self.assertEqual(headers, {"X-Key": "value"})
+
+    def test_compact_response(self):
+        handler_return = nuclio_sdk.CompactResponse(
+            body={"json": True}, status_code=201, event_id="1337"
+        )
+        self.assertFalse(hasattr(handler_return, "__dict__"))
+        self.assertEqual(
+            repr(handler_return),
+            "CompactResponse(headers={}, body={'json': True}, status_code=201, "
+            "content_type='text/plain', event_id='1337')",
+        )
+        response = nuclio_sdk.Response.from_entrypoint_output(
+            self._encoder.encode, handler_return
+        )
+        self.assertEqual(json.loads(response["body"]), {"json": True})
+        self.assertEqual(response["status_code"], 201)
+        self.assertEqual(response["content_type"], "application/json")
+        self.assertEqual(response["event_id"], "1337")
+
+    def test_generator(self):
+        def handler_return():
+            yield "first"
+            yield b"\x80second"
+
+        response = self._get_response(handler_return())
+        self.assertEqual(response["body_encoding"], "chunked")
+        self.assertEqual(
+            list(response["body"]),
+            [
+                {"body": "first", "body_encoding": "text"},
+                {"body": "gHNlY29uZA==", "body_encoding": "base64"},
+            ],
+        )
+
+    def test_async_generator(self):
+        async def handler_return():
+            for chunk in ["first", "second"]:
+                yield chunk
+
+        async def collect_chunks(chunks):
+            return [chunk async for chunk in chunks]
+
+        response = self._get_response((201, handler_return()))
+        self.assertEqual(response["status_code"], 201)
+        self.assertEqual(response["body_encoding"], "chunked")
+        self.assertEqual(
+            asyncio.run(collect_chunks(response["body"])),
+            [
+                {"body": "first", "body_encoding": "text"},
+                {"body": "second", "body_encoding": "text"},
+            ],
+        )
+
+    def test_file_like(self):
+        handler_return = io.StringIO("a" * 10)
+        self.addCleanup(setattr, nuclio_sdk.Response, "stream_chunk_size", 64 * 1024)
+        nuclio_sdk.Response.stream_chunk_size = 4
+
+        response = self._get_response(
+            nuclio_sdk.Response(body=handler_return, content_type="text/csv")
+        )
+        self.assertEqual(response["content_type"], "text/csv")
+        self.assertEqual(
+            [chunk["body"] for chunk in response["body"]], ["aaaa", "aaaa", "aa"]
+        )
+        self.assertTrue(handler_return.closed)
+
+    def _get_response(self, handler_return):
+        return nuclio_sdk.Response.from_entrypoint_output(
+            self._encoder.encode, handler_return
+        )
+
     def _validate_response(self, handler_return, expected_response):
         response = nuclio_sdk.Response.from_entrypoint_output(
             self._encoder.encode, handler_return